@@ -0,0 +1,60 @@
+"""
+Benchmark de memoria de la fase de extraccion: AudioModel vs ConversationRecord
+
+Uso:
+    python -m benchmarks.bench_conversation_memory [cantidad]
+"""
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+from src.repository.models.audio_model import AudioModel
+from src.repository.models.conversation_record import ConversationRecord
+
+
+def build_audio_models(count: int) -> list:
+    start = datetime(2024, 1, 1)
+    return [
+        AudioModel(
+            id_conversation=f"{index:08d}-aaaa-bbbb-cccc-dddddddddddd",
+            status="PENDING",
+            creation_date=datetime.now(),
+            call_date=start + timedelta(seconds=index),
+            call_duration=120000
+        )
+        for index in range(count)
+    ]
+
+
+def build_records(count: int) -> list:
+    start = datetime(2024, 1, 1)
+    return [
+        ConversationRecord(
+            id_conversation=f"{index:08d}-aaaa-bbbb-cccc-dddddddddddd",
+            call_date=start + timedelta(seconds=index),
+            call_duration=120000
+        )
+        for index in range(count)
+    ]
+
+
+def measure(builder, count: int) -> int:
+    tracemalloc.start()
+    items = builder(count)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return peak
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    before = measure(build_audio_models, count)
+    after = measure(build_records, count)
+    print(f"Conversaciones: {count}")
+    print(f"AudioModel:         {before / 1024 / 1024:8.1f} MiB")
+    print(f"ConversationRecord: {after / 1024 / 1024:8.1f} MiB")
+    print(f"Reduccion:          {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
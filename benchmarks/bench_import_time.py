@@ -0,0 +1,59 @@
+"""
+Benchmark del tiempo de importacion del proceso (arranque en frio del contenedor)
+
+Ejecuta `python -X importtime -c "import main"` en un proceso nuevo, muestra los modulos
+mas costosos y falla (codigo de salida 1) si el total supera el presupuesto.
+
+Uso:
+    python -m benchmarks.bench_import_time [presupuesto_ms] [modulo]
+"""
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_BUDGET_MS = 1000
+DEFAULT_MODULE = "main"
+
+
+def measure_import_time(module: str = DEFAULT_MODULE) -> Dict[str, int]:
+    """Devuelve el tiempo acumulado en microsegundos de cada modulo importado."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR, capture_output=True, text=True, check=True
+    )
+    return parse_importtime(result.stderr)
+
+
+def parse_importtime(output: str) -> Dict[str, int]:
+    cumulative = {}
+    for line in output.splitlines():
+        # Formato: "import time: <self us> | <cumulative us> | <modulo indentado>"
+        parts = line[len("import time:"):].split("|")
+        if not line.startswith("import time:") or len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        cumulative[parts[2].strip()] = int(parts[1])
+    return cumulative
+
+
+def main():
+    budget_ms = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BUDGET_MS
+    module = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_MODULE
+
+    cumulative = measure_import_time(module)
+    total_ms = cumulative.get(module, 0) / 1000
+
+    print(f"Modulos mas costosos al importar {module}:")
+    for name, microseconds in sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[:15]:
+        print(f"  {microseconds / 1000:8.1f} ms  {name}")
+    print(f"Total:       {total_ms:8.1f} ms")
+    print(f"Presupuesto: {budget_ms:8.1f} ms")
+
+    if total_ms > budget_ms:
+        print("El tiempo de importacion supera el presupuesto")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
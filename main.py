@@ -1,3 +1,4 @@
+import argparse
 from src.service.audio_extract import AudioExtractService
 import pytz
 from src.utils.logger import logger
@@ -10,9 +11,37 @@ from src.utils.logger import logger
  * @author Gianella 
 '''
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extraccion de audios SAC desde Genesys")
+    parser.add_argument("--resume", type=int, metavar="JOB_ID",
+                        help="Reanuda un job interrumpido desde su ultimo checkpoint")
+    parser.add_argument("--worker", action="store_true",
+                        help="Procesa las tareas de la cola (work_task) en lugar de extraer conversaciones")
+    parser.add_argument("--poll-batches", action="store_true",
+                        help="Sigue los batches en PENDING GENESYS hasta que Genesys los termine")
+    parser.add_argument("--download-batches", action="store_true",
+                        help="Descarga las grabaciones de los batches en PENDING DOWNLOAD")
+    parser.add_argument("--extract-features", action="store_true",
+                        help="Calcula las caracteristicas de audio de las grabaciones descargadas")
+    parser.add_argument("--trim-silences", action="store_true",
+                        help="Genera la version sin silencios largos de las grabaciones del almacen local")
+    args = parser.parse_args(argv)
+
     audio_service = AudioExtractService()
-    audio_service.execute()
+    if args.trim_silences:
+        audio_service.trim_silences()
+    elif args.extract_features:
+        audio_service.extract_features()
+    elif args.download_batches:
+        audio_service.download_batches()
+    elif args.poll_batches:
+        audio_service.poll_batches()
+    elif args.worker:
+        audio_service.run_worker()
+    elif args.resume is not None:
+        audio_service.resume(args.resume)
+    else:
+        audio_service.execute()
     
 
 if __name__ == "__main__":
@@ -0,0 +1,9 @@
+-- Llave unica sobre id_conversation para que las re-ejecuciones no dupliquen audios.
+-- Antes de crear el indice se eliminan los duplicados existentes, conservando el registro mas antiguo.
+DELETE FROM audios_sac.audio a
+USING audios_sac.audio b
+WHERE a.id_conversation = b.id_conversation
+  AND a.id > b.id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS audio_id_conversation_key
+    ON audios_sac.audio (id_conversation);
@@ -0,0 +1,18 @@
+-- Indices para las consultas frecuentes que hoy terminan en sequential scan.
+-- batch: BatchRepository.update_status filtra por gemini_batch_id; el seguimiento de descargas por genesys_batch_id.
+CREATE INDEX IF NOT EXISTS ix_audios_sac_batch_gemini_batch_id
+    ON audios_sac.batch (gemini_batch_id);
+
+CREATE INDEX IF NOT EXISTS ix_audios_sac_batch_genesys_batch_id
+    ON audios_sac.batch (genesys_batch_id);
+
+CREATE INDEX IF NOT EXISTS ix_audios_sac_batch_job_id
+    ON audios_sac.batch (job_id);
+
+-- audio: las etapas siguientes recorren los audios de un batch por estado, o todos los de un estado.
+-- La busqueda por id_conversation ya la cubre audio_id_conversation_key (migracion 001).
+CREATE INDEX IF NOT EXISTS ix_audios_sac_audio_batch_id_status
+    ON audios_sac.audio (batch_id, status);
+
+CREATE INDEX IF NOT EXISTS ix_audios_sac_audio_status
+    ON audios_sac.audio (status);
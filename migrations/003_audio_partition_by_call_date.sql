@@ -0,0 +1,60 @@
+-- Particiona audios_sac.audio por rango mensual de call_date.
+-- En una tabla particionada toda llave unica debe incluir la columna de particion, por eso
+-- la llave primaria pasa a ser (id, call_date) y la llave unica a (id_conversation, call_date).
+-- Una conversacion siempre tiene el mismo call_date (conversationStart), asi que la unicidad se mantiene.
+
+-- Crea las particiones mensuales que falten entre from_month y to_month (ambos inclusive).
+-- La llama la migracion y, en cada ejecucion, PartitionRepository.ensure_audio_partitions.
+CREATE OR REPLACE FUNCTION audios_sac.create_audio_partitions(from_month date, to_month date)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    month_start date := date_trunc('month', from_month)::date;
+    last_month date := date_trunc('month', to_month)::date;
+    partition_name text;
+    created integer := 0;
+BEGIN
+    WHILE month_start <= last_month LOOP
+        partition_name := 'audio_' || to_char(month_start, 'YYYY_MM');
+        IF to_regclass('audios_sac.' || partition_name) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE audios_sac.%I PARTITION OF audios_sac.audio FOR VALUES FROM (%L) TO (%L)',
+                partition_name, month_start, (month_start + interval '1 month')::date
+            );
+            created := created + 1;
+        END IF;
+        month_start := (month_start + interval '1 month')::date;
+    END LOOP;
+    RETURN created;
+END;
+$$;
+
+ALTER TABLE audios_sac.audio RENAME TO audio_unpartitioned;
+
+CREATE TABLE audios_sac.audio (LIKE audios_sac.audio_unpartitioned INCLUDING DEFAULTS)
+    PARTITION BY RANGE (call_date);
+
+SELECT audios_sac.create_audio_partitions(
+    COALESCE((SELECT min(call_date) FROM audios_sac.audio_unpartitioned), now())::date,
+    (now() + interval '2 months')::date
+);
+
+INSERT INTO audios_sac.audio SELECT * FROM audios_sac.audio_unpartitioned;
+
+-- La secuencia del id (serial) pertenece a la tabla anterior; se transfiere antes de eliminarla
+ALTER SEQUENCE audios_sac.audio_id_seq OWNED BY audios_sac.audio.id;
+DROP TABLE audios_sac.audio_unpartitioned;
+
+ALTER TABLE audios_sac.audio ADD CONSTRAINT audio_pkey PRIMARY KEY (id, call_date);
+ALTER TABLE audios_sac.audio ADD CONSTRAINT audio_batch_id_fkey
+    FOREIGN KEY (batch_id) REFERENCES audios_sac.batch (id);
+
+CREATE UNIQUE INDEX audio_id_conversation_key
+    ON audios_sac.audio (id_conversation, call_date);
+
+CREATE INDEX ix_audios_sac_audio_batch_id_status
+    ON audios_sac.audio (batch_id, status);
+
+CREATE INDEX ix_audios_sac_audio_status
+    ON audios_sac.audio (status);
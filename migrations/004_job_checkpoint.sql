@@ -0,0 +1,18 @@
+-- Estado de extraccion de cada job para poder reanudarlo con --resume <job_id>.
+CREATE TABLE IF NOT EXISTS audios_sac.job_checkpoint (
+    job_id integer PRIMARY KEY REFERENCES audios_sac.job (id),
+    interval varchar NOT NULL,
+    stage varchar NOT NULL,
+    completed_shards jsonb NOT NULL DEFAULT '[]'::jsonb,
+    last_page integer NOT NULL DEFAULT 0,
+    updated_at timestamp NOT NULL DEFAULT now()
+);
+
+-- Conversaciones ya obtenidas de analytics; se eliminan cuando el job termina de enviar sus batches.
+CREATE TABLE IF NOT EXISTS audios_sac.job_conversation (
+    job_id integer NOT NULL REFERENCES audios_sac.job_checkpoint (job_id) ON DELETE CASCADE,
+    id_conversation varchar NOT NULL,
+    call_date timestamp,
+    call_duration integer NOT NULL,
+    PRIMARY KEY (job_id, id_conversation)
+);
@@ -0,0 +1,23 @@
+-- Cola de tareas para varios workers: cada tarea se reclama con FOR UPDATE SKIP LOCKED y
+-- queda asignada a un worker hasta lease_expires_at (el worker la renueva con heartbeats).
+CREATE TABLE IF NOT EXISTS audios_sac.work_task (
+    id serial PRIMARY KEY,
+    kind varchar NOT NULL,
+    job_id integer REFERENCES audios_sac.job (id),
+    payload jsonb NOT NULL,
+    status varchar NOT NULL DEFAULT 'PENDING',
+    attempts integer NOT NULL DEFAULT 0,
+    max_attempts integer NOT NULL,
+    available_at timestamp NOT NULL DEFAULT now(),
+    lease_owner varchar,
+    lease_expires_at timestamp,
+    last_error varchar,
+    created_at timestamp NOT NULL DEFAULT now(),
+    updated_at timestamp NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS ix_audios_sac_work_task_pending
+    ON audios_sac.work_task (kind, available_at) WHERE status = 'PENDING';
+
+CREATE INDEX IF NOT EXISTS ix_audios_sac_work_task_running
+    ON audios_sac.work_task (lease_expires_at) WHERE status = 'RUNNING';
@@ -0,0 +1,14 @@
+-- Indice del almacen de grabaciones direccionado por contenido (AUDIO_STORE_DIR/blobs/<sha[:2]>/<sha256>).
+-- Varias grabaciones con el mismo contenido apuntan al mismo sha256.
+CREATE TABLE IF NOT EXISTS audios_sac.recording_blob (
+    id_conversation varchar NOT NULL,
+    recording_id varchar NOT NULL,
+    sha256 char(64) NOT NULL,
+    size bigint NOT NULL,
+    content_type varchar,
+    created_at timestamp NOT NULL DEFAULT now(),
+    PRIMARY KEY (id_conversation, recording_id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_audios_sac_recording_blob_sha256
+    ON audios_sac.recording_blob (sha256);
@@ -0,0 +1,8 @@
+-- Caracteristicas de audio calculadas sobre las grabaciones descargadas (--extract-features).
+-- En una tabla particionada ADD COLUMN se propaga a todas las particiones.
+ALTER TABLE audios_sac.audio ADD COLUMN IF NOT EXISTS audio_duration_ms integer;
+ALTER TABLE audios_sac.audio ADD COLUMN IF NOT EXISTS silence_ratio double precision;
+ALTER TABLE audios_sac.audio ADD COLUMN IF NOT EXISTS rms_dbfs double precision;
+ALTER TABLE audios_sac.audio ADD COLUMN IF NOT EXISTS clipping_ratio double precision;
+ALTER TABLE audios_sac.audio ADD COLUMN IF NOT EXISTS channel_talk_ms json;
+ALTER TABLE audios_sac.audio ADD COLUMN IF NOT EXISTS features_error varchar;
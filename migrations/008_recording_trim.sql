@@ -0,0 +1,11 @@
+-- Version recortada (sin silencios largos) de cada blob del almacen (--trim-silences).
+-- Las grabaciones con el mismo sha256 comparten el mismo recorte.
+ALTER TABLE audios_sac.recording_blob ADD COLUMN IF NOT EXISTS trimmed_sha256 char(64);
+ALTER TABLE audios_sac.recording_blob ADD COLUMN IF NOT EXISTS trimmed_size bigint;
+ALTER TABLE audios_sac.recording_blob ADD COLUMN IF NOT EXISTS trim_bytes_saved bigint;
+ALTER TABLE audios_sac.recording_blob ADD COLUMN IF NOT EXISTS trim_offsets json;
+ALTER TABLE audios_sac.recording_blob ADD COLUMN IF NOT EXISTS trim_error varchar;
+
+-- Blobs pendientes de recortar
+CREATE INDEX IF NOT EXISTS ix_audios_sac_recording_blob_untrimmed
+    ON audios_sac.recording_blob (sha256) WHERE trimmed_sha256 IS NULL AND trim_error IS NULL;
@@ -0,0 +1,85 @@
+import time
+from typing import Callable, Iterator, List
+from src.utils.lazy_import import lazy_import
+from src.utils.logger import logger
+
+sdk_models = lazy_import("PureCloudPlatformClientV2.models")
+
+FULFILLED = "FULFILLED"
+FAILED_STATES = ("FAILED", "CANCELLED", "EXPIRED")
+
+
+class AsyncJobError(Exception):
+    pass
+
+
+class ConversationDetailsJobExtractor:
+    """Extrae conversaciones mediante los jobs asincronos de analytics de Genesys.
+
+    analytics_api solo necesita exponer post_analytics_conversations_details_jobs,
+    get_analytics_conversations_details_job y get_analytics_conversations_details_job_results,
+    por lo que puede ser el AnalyticsApi del SDK o un fake local.
+    """
+
+    def __init__(self, analytics_api, poll_interval: float = 2, max_poll_interval: float = 30,
+                 timeout: float = 1800, page_size: int = 1000, sleep: Callable[[float], None] = time.sleep):
+        self.analytics_api = analytics_api
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.timeout = timeout
+        self.page_size = page_size
+        self.sleep = sleep
+
+    def submit(self, interval: str, segment_filters: list) -> str:
+        query = sdk_models.AsyncConversationQuery()
+        query.interval = interval
+        query.order = "asc"
+        query.order_by = "conversationStart"
+        query.segment_filters = segment_filters
+
+        response = self.analytics_api.post_analytics_conversations_details_jobs(query)
+        logger.info(f"[Genesys async jobs] Job {response.job_id} enviado para el intervalo {interval}")
+        return response.job_id
+
+    def wait_until_fulfilled(self, job_id: str) -> None:
+        # Backoff exponencial entre consultas de estado hasta el maximo configurado
+        delay = self.poll_interval
+        waited = 0.0
+        while True:
+            status = self.analytics_api.get_analytics_conversations_details_job(job_id)
+            if status.state == FULFILLED:
+                logger.info(f"[Genesys async jobs] Job {job_id} completado")
+                return
+            if status.state in FAILED_STATES:
+                raise AsyncJobError(f"El job {job_id} termino en estado {status.state}: {status.error_message}")
+            if waited >= self.timeout:
+                raise AsyncJobError(f"El job {job_id} no termino en {self.timeout}s (estado {status.state})")
+
+            logger.debug(f"[Genesys async jobs] Job {job_id} en estado {status.state}, siguiente consulta en {delay}s")
+            self.sleep(delay)
+            waited += delay
+            delay = min(delay * 2, self.max_poll_interval)
+
+    def iter_pages(self, job_id: str) -> Iterator[List]:
+        cursor = None
+        page_number = 1
+        while True:
+            kwargs = {"page_size": self.page_size}
+            if cursor:
+                kwargs["cursor"] = cursor
+            response = self.analytics_api.get_analytics_conversations_details_job_results(job_id, **kwargs)
+
+            conversations = response.conversations or []
+            logger.info(f"[Genesys async jobs] Job {job_id} pagina {page_number}: {len(conversations)} conversaciones")
+            if conversations:
+                yield conversations
+
+            cursor = response.cursor
+            if not cursor:
+                return
+            page_number += 1
+
+    def extract(self, interval: str, segment_filters: list) -> Iterator[List]:
+        job_id = self.submit(interval, segment_filters)
+        self.wait_until_fulfilled(job_id)
+        yield from self.iter_pages(job_id)
@@ -1,18 +1,32 @@
 import os
 from src.utils.logger import logger
-import PureCloudPlatformClientV2 as genesys_sdk
-from PureCloudPlatformClientV2.rest import ApiException
 import src.utils.environment as env
 from src.repository.models.job_model import JobModel
 from src.repository.models.batch_model import BatchModel
 from src.repository.batch_repository import BatchRepository
 from src.repository.audio_repository import AudioRepository
 from src.repository.models.audio_model import AudioModel
-from PureCloudPlatformClientV2.models import BatchDownloadRequest, BatchDownloadJobSubmission
-from typing import List
+from src.repository.models.conversation_record import ConversationRecord
+from src.utils.threads import execute_bounded
+from src.integrations.genesys_token_manager import GenesysTokenManager
+from src.integrations.genesys_rate_limiter import create_scheduler, ANALYTICS, RECORDING, CONVERSATIONS
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+from src.utils.lazy_import import lazy_import
 import time
 from datetime import datetime
 
+if TYPE_CHECKING:
+    from PureCloudPlatformClientV2.models import BatchDownloadRequest, BatchDownloadJobSubmission
+
+# El SDK se importa en el primer uso (authenticate) para no pagar su carga al importar el modulo
+genesys_sdk = lazy_import("PureCloudPlatformClientV2")
+sdk_models = lazy_import("PureCloudPlatformClientV2.models")
+sdk_rest = lazy_import("PureCloudPlatformClientV2.rest")
+
+
+class BatchSubmitError(Exception):
+    """El batch no quedo enviado a Genesys y registrado en la base; el envio se debe reintentar."""
+
 class GenesysIntegration:
     
     def __init__(self):
@@ -21,6 +35,8 @@ class GenesysIntegration:
         self.conversation_api = None
         self.recording_api = None
         self.analytics_api = None
+        self.scheduler = create_scheduler()
+        self.token_manager = None
         self.batch_db = BatchRepository()
         self.audio_db = AudioRepository()
 
@@ -28,14 +44,27 @@ class GenesysIntegration:
         api_client = genesys_sdk.ApiClient()
 
         try:
-            api_client.get_client_credentials_token(self.client_id, self.client_secret)
-            self.conversation_api = genesys_sdk.ConversationsApi(api_client)
-            self.recording_api = genesys_sdk.RecordingApi(api_client)
-            self.analytics_api = genesys_sdk.AnalyticsApi(api_client)
+            # El token se reutiliza desde cache y se renueva en segundo plano antes de expirar
+            self.token_manager = GenesysTokenManager(
+                api_client,
+                self.client_id,
+                self.client_secret,
+                cache_path=env.GENESYS_TOKEN_CACHE_PATH,
+                ttl_seconds=env.GENESYS_TOKEN_TTL_SECONDS,
+                refresh_margin=env.GENESYS_TOKEN_REFRESH_MARGIN_SECONDS
+            )
+            self.token_manager.ensure_token()
+            self.token_manager.start_background_refresh()
+            self.scheduler.on_unauthorized = self.token_manager.handle_unauthorized
+
+            # Todas las llamadas a las APIs pasan por el scheduler de limite de peticiones
+            self.conversation_api = self.scheduler.wrap(genesys_sdk.ConversationsApi(api_client), CONVERSATIONS)
+            self.recording_api = self.scheduler.wrap(genesys_sdk.RecordingApi(api_client), RECORDING)
+            self.analytics_api = self.scheduler.wrap(genesys_sdk.AnalyticsApi(api_client), ANALYTICS)
             
             logger.info(f"[Genesys integration] Autenticacion exitosa con genesys")
             
-        except ApiException as e:
+        except sdk_rest.ApiException as e:
             logger.error(f"[Genesys integration] Error en autenticacion: {e}")
 
     def get_recording_metadata(self, conversation_id):
@@ -43,11 +72,11 @@ class GenesysIntegration:
             response = self.recording_api.get_conversation_recordings(conversation_id)
 
             return response
-        except ApiException as e:
+        except sdk_rest.ApiException as e:
             logger.error(f"[Genesys integration] Error al obtener metadatos de grabaciones: {e}")
             return None
         
-    def init_batch_download(self, conversations: List[AudioModel], job: JobModel, start_date: str) -> None:
+    def init_batch_download(self, conversations: List[ConversationRecord], job: JobModel, start_date: str) -> None:
         batch_size = env.BATCH_SIZE
 
         if not conversations:
@@ -56,62 +85,110 @@ class GenesysIntegration:
         
         logger.info(f"[Genesys integration]Se encontraron {len(conversations)} conversaciones") 
 
+        conversations = self.exclude_known_conversations(conversations)
+
         for i in range(0, len(conversations), batch_size):
-            batch = conversations[i: i + batch_size]
-            logger.info(f"[Genesys integration] Procesando batch con {len(batch)} grabaciones")
+            self.submit_batch(conversations[i: i + batch_size], job, start_date)
+                
+    def submit_batch(self, batch: List[ConversationRecord], job: JobModel, start_date: str,
+                     before_submit: Optional[Callable[[], None]] = None) -> Optional[BatchModel]:
+        """Envia el batch a Genesys y lo registra con sus audios.
 
-            final_batch_submission = BatchDownloadJobSubmission()
-            final_batch_submission.batch_download_request_list = []
+        Devuelve None solo si ninguna conversacion tiene grabaciones descargables; si Genesys no
+        devuelve el batch o no se puede registrar, lanza BatchSubmitError. before_submit se llama
+        justo antes del envio y puede lanzar una excepcion para cancelarlo.
+        """
+        logger.info(f"[Genesys integration] Procesando batch con {len(batch)} grabaciones")
 
-            for conversation in batch:
-                # Extraer conversation_id del objeto AudioModel
-                conversation_id = conversation.id_conversation
-                batch_submission = self.add_conversation_to_batch(conversation_id)
-                
-                if batch_submission and batch_submission.batch_download_request_list:                 
-                    first_recording = batch_submission.batch_download_request_list[0]
-                    final_batch_submission.batch_download_request_list.append(first_recording)
+        # Se resuelven en paralelo los recording ids de todo el batch
+        batch_requests, failures = self.resolve_recordings([c.id_conversation for c in batch])
+        batch = [conversation for conversation in batch if conversation.id_conversation not in failures]
 
-            if not final_batch_submission.batch_download_request_list:
-                logger.warning("[Genesys integration] No hay conversaciones validas en este batch")
-                continue
+        if failures:
+            logger.warning(f"[Genesys integration] {len(failures)} conversaciones sin grabaciones en este batch: {failures}")
 
-            batch_process_result = self.recording_api.post_recording_batchrequests(final_batch_submission)
+        final_batch_submission = sdk_models.BatchDownloadJobSubmission()
+        final_batch_submission.batch_download_request_list = batch_requests
 
-            if not batch_process_result:
-                return
+        if not final_batch_submission.batch_download_request_list:
+            logger.warning("[Genesys integration] No hay conversaciones validas en este batch")
+            return None
 
-            logger.info(f"[Genesys integration] Inicia insercion a base de datos")
-            
-            process_date = datetime.strptime(start_date, "%Y-%m-%dT%H:%M:%S")
-            
-            new_batch = BatchModel(
-                genesys_batch_id=batch_process_result.id,
-                audios_count=len(batch),
-                start_date=time.asctime(time.localtime()),
-                process_date=process_date,
-                status='PENDING GENESYS',
-                job_id=job.id
-            )
-            
-            result = self.batch_db.insert(new_batch)
+        if before_submit:
+            before_submit()
+        batch_process_result = self.recording_api.post_recording_batchrequests(final_batch_submission)
 
-            for conversation in batch:
-                conversation.batch_id = result.genesys_batch_id
-                self.audio_db.insert(conversation)
-            
-            if result:
-                logger.debug(f"[Genesys integration] Se inserto el batch correctamente")
-                
-    def add_conversation_to_batch(self, conversation_id: str) -> BatchDownloadJobSubmission:
-        batch_list: List[BatchDownloadRequest] = []
+        if not batch_process_result:
+            logger.error("[Genesys integration] Genesys no devolvio resultado para el batch")
+            raise BatchSubmitError("Genesys no devolvio resultado para el batch")
+
+        logger.info(f"[Genesys integration] Inicia insercion a base de datos")
+        
+        process_date = datetime.strptime(start_date, "%Y-%m-%dT%H:%M:%S")
+        
+        new_batch = BatchModel(
+            genesys_batch_id=batch_process_result.id,
+            audios_count=len(batch),
+            start_date=time.asctime(time.localtime()),
+            process_date=process_date,
+            status='PENDING GENESYS',
+            job_id=job.id
+        )
+        
+        # El batch y sus audios se guardan juntos en una sola transaccion
+        try:
+            result = self.batch_db.insert_with_audios(new_batch, batch)
+        except Exception as e:
+            # El batch ya existe en Genesys; un reintento lo vuelve a enviar con las conversaciones sin registrar
+            logger.error(f"[Genesys integration] No se pudo insertar el batch {batch_process_result.id}: {e}")
+            raise BatchSubmitError(f"No se pudo registrar el batch {batch_process_result.id}: {e}") from e
+        
+        logger.debug(f"[Genesys integration] Se inserto el batch correctamente")
+        return result
+
+    def exclude_known_conversations(self, conversations: List[ConversationRecord]) -> List[ConversationRecord]:
+        # Las conversaciones ya registradas no se vuelven a pedir a Genesys (re-ejecuciones del mismo dia)
+        known_ids = self.audio_db.get_existing_ids([c.id_conversation for c in conversations])
+        if known_ids:
+            logger.info(f"[Genesys integration] {len(known_ids)} conversaciones ya registradas, se omiten")
+        return [conversation for conversation in conversations if conversation.id_conversation not in known_ids]
+
+    def resolve_recordings(self, conversation_ids: List[str]) -> Tuple[List["BatchDownloadRequest"], Dict[str, str]]:
+        """Obtiene la primera grabacion de cada conversacion con concurrencia acotada.
+
+        Devuelve las solicitudes en el mismo orden que conversation_ids y un diccionario
+        conversation_id -> motivo para las conversaciones que no se pudieron resolver.
+        """
+        results = execute_bounded(
+            self.add_conversation_to_batch,
+            conversation_ids,
+            max_workers=env.GENESYS_METADATA_WORKERS,
+            timeout=env.GENESYS_METADATA_TIMEOUT
+        )
+
+        batch_requests: List["BatchDownloadRequest"] = []
+        failures: Dict[str, str] = {}
+        for result in results:
+            if not result.ok:
+                failures[result.item] = str(result.error)
+                continue
+
+            if result.value and result.value.batch_download_request_list:
+                batch_requests.append(result.value.batch_download_request_list[0])
+            else:
+                failures[result.item] = "Sin grabaciones"
+
+        return batch_requests, failures
+
+    def add_conversation_to_batch(self, conversation_id: str) -> "BatchDownloadJobSubmission":
+        batch_list: List["BatchDownloadRequest"] = []
         try:
-            batch_submission = BatchDownloadJobSubmission()
+            batch_submission = sdk_models.BatchDownloadJobSubmission()
             recordings_data = self.recording_api.get_conversation_recordingmetadata(conversation_id)
 
             if recordings_data:
                 for recording in recordings_data:
-                    batch_req = BatchDownloadRequest()
+                    batch_req = sdk_models.BatchDownloadRequest()
                     batch_req.conversation_id = recording.conversation_id
                     batch_req.recording_id = recording.id
                     batch_list.append(batch_req) 
@@ -122,7 +199,7 @@ class GenesysIntegration:
                 logger.debug(f"[Genesys integration] No se encontraron grabaciones para la conversacion: {conversation_id}")
                 raise ValueError(f"No se encontraron grabaciones para la conversacion: {conversation_id}")
 
-        except ApiException as e:
+        except sdk_rest.ApiException as e:
             logger.error(f"[Genesys integration] Error al obtener metadata de grabaciones: {e}")
             raise
         
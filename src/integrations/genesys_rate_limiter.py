@@ -0,0 +1,166 @@
+import random
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Optional
+from src.utils.lazy_import import lazy_import
+from src.utils.logger import logger
+import src.utils.environment as env
+
+if TYPE_CHECKING:
+    from PureCloudPlatformClientV2.rest import ApiException
+
+sdk_rest = lazy_import("PureCloudPlatformClientV2.rest")
+
+ANALYTICS = "analytics"
+RECORDING = "recording"
+CONVERSATIONS = "conversations"
+
+
+class TokenBucket:
+    """Token bucket thread-safe; rate <= 0 desactiva el limite (salvo pausas por Retry-After)"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = self.clock()
+                wait = self.paused_until - now
+                if wait <= 0:
+                    if self.rate <= 0:
+                        return
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            self.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        # Bloquea a todos los hilos de la familia, por ejemplo ante un 429 con Retry-After
+        with self.lock:
+            self.paused_until = max(self.paused_until, self.clock() + seconds)
+
+
+class GenesysRequestScheduler:
+    """Pasa cada llamada al SDK por el token bucket de su familia y reintenta 429/5xx"""
+
+    def __init__(self, rates: Dict[str, float], max_retries: int = 5, backoff_base: float = 1,
+                 backoff_max: float = 60, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep, jitter: Callable[[float, float], float] = random.uniform):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.clock = clock
+        self.sleep = sleep
+        self.jitter = jitter
+        self.buckets = {family: TokenBucket(rate, clock=clock, sleep=sleep) for family, rate in rates.items()}
+        self.lock = threading.Lock()
+        # Callback para renovar el token ante un 401; se reintenta una sola vez por llamada
+        self.on_unauthorized: Optional[Callable[[], None]] = None
+
+    def bucket(self, family: str) -> TokenBucket:
+        with self.lock:
+            if family not in self.buckets:
+                self.buckets[family] = TokenBucket(0, clock=self.clock, sleep=self.sleep)
+            return self.buckets[family]
+
+    def call(self, family: str, func: Callable, *args, **kwargs):
+        return self.execute(family, func, args, kwargs)
+
+    def execute(self, family: str, func: Callable, args: tuple = (), kwargs: Optional[dict] = None,
+                retry_server_errors: bool = True):
+        # retry_server_errors=False para operaciones que crean recursos: un 5xx puede llegar
+        # despues de que Genesys ya creo el recurso, asi que solo se reintenta el 429
+        kwargs = kwargs or {}
+        bucket = self.bucket(family)
+        attempt = 0
+        reauthenticated = False
+        while True:
+            bucket.acquire()
+            try:
+                return func(*args, **kwargs)
+            except sdk_rest.ApiException as e:
+                if e.status == 401 and self.on_unauthorized and not reauthenticated:
+                    reauthenticated = True
+                    self.on_unauthorized()
+                    continue
+                if not is_retryable(e, retry_server_errors) or attempt >= self.max_retries:
+                    raise
+
+                # Backoff exponencial con jitter completo
+                delay = self.jitter(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                retry_after = get_retry_after(e)
+                attempt += 1
+                if retry_after is not None:
+                    logger.warning(f"[Genesys scheduler] {family}: HTTP {e.status}, Retry-After {retry_after}s (intento {attempt}/{self.max_retries})")
+                    bucket.pause(retry_after + delay)
+                else:
+                    logger.warning(f"[Genesys scheduler] {family}: HTTP {e.status}, reintento en {delay:.2f}s (intento {attempt}/{self.max_retries})")
+                    self.sleep(delay)
+
+    def wrap(self, api, family: str) -> "RateLimitedApi":
+        return RateLimitedApi(api, self, family)
+
+
+class RateLimitedApi:
+    """Proxy de una API del SDK cuyos metodos pasan por el scheduler"""
+
+    def __init__(self, api, scheduler: GenesysRequestScheduler, family: str):
+        self._api = api
+        self._scheduler = scheduler
+        self._family = family
+
+    def __getattr__(self, name):
+        attribute = getattr(self._api, name)
+        if not callable(attribute) or name.startswith("_"):
+            return attribute
+
+        def scheduled(*args, **kwargs):
+            return self._scheduler.execute(self._family, attribute, args, kwargs,
+                                           retry_server_errors=is_idempotent(name))
+
+        return scheduled
+
+
+def is_retryable(error: "ApiException", retry_server_errors: bool = True) -> bool:
+    status = error.status or 0
+    return status == 429 or (retry_server_errors and status >= 500)
+
+
+def is_idempotent(method_name: str) -> bool:
+    # Los post_ del SDK crean recursos, salvo las consultas (post_..._query)
+    return not method_name.startswith("post_") or method_name.endswith("_query")
+
+
+def get_retry_after(error: "ApiException") -> Optional[float]:
+    if not error.headers:
+        return None
+    value = error.headers.get("Retry-After") or error.headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def create_scheduler() -> GenesysRequestScheduler:
+    return GenesysRequestScheduler(
+        rates={
+            ANALYTICS: env.GENESYS_ANALYTICS_RATE_PER_SECOND,
+            RECORDING: env.GENESYS_RECORDING_RATE_PER_SECOND,
+            CONVERSATIONS: env.GENESYS_CONVERSATIONS_RATE_PER_SECOND,
+        },
+        max_retries=env.GENESYS_MAX_RETRIES,
+        backoff_base=env.GENESYS_BACKOFF_BASE_SECONDS,
+        backoff_max=env.GENESYS_BACKOFF_MAX_SECONDS
+    )
@@ -0,0 +1,129 @@
+import json
+import os
+import threading
+import time
+from typing import Callable, Optional
+from src.utils.logger import logger
+
+
+class GenesysTokenManager:
+    """Administra el token client-credentials de Genesys compartido por todas las APIs.
+
+    El token se guarda con su expiracion en cache_path para reutilizarlo entre ejecuciones
+    y se renueva en segundo plano refresh_margin segundos antes de expirar. Como todas las
+    APIs comparten el mismo ApiClient, el token renovado aplica a todos los hilos.
+    """
+
+    def __init__(self, api_client, client_id: str, client_secret: str, cache_path: str = "",
+                 ttl_seconds: float = 86400, refresh_margin: float = 600,
+                 clock: Callable[[], float] = time.time):
+        self.api_client = api_client
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.cache_path = cache_path
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin = refresh_margin
+        self.clock = clock
+        self.expires_at = 0.0
+        self.requested_at = 0.0
+        self.lock = threading.Lock()
+        self.timer: Optional[threading.Timer] = None
+
+    def is_valid(self) -> bool:
+        return bool(self.api_client.access_token) and self.clock() < self.expires_at - self.refresh_margin
+
+    def ensure_token(self) -> None:
+        with self.lock:
+            if self.is_valid():
+                return
+            if self.load_cache():
+                logger.info("[Genesys token] Se reutiliza el token almacenado en cache")
+                return
+            self.request_token()
+
+    def refresh(self) -> None:
+        with self.lock:
+            self.request_token()
+
+    def handle_unauthorized(self) -> None:
+        """Ante un 401 descarta la cache (token revocado o secreto rotado) y pide un token nuevo"""
+        with self.lock:
+            # Si otro hilo acaba de renovar el token no se vuelve a pedir
+            if self.clock() - self.requested_at < 10:
+                return
+            logger.warning("[Genesys token] Token rechazado por Genesys, se descarta la cache")
+            self.clear_cache()
+            self.request_token()
+
+    def clear_cache(self) -> None:
+        self.expires_at = 0.0
+        if self.cache_path and os.path.exists(self.cache_path):
+            try:
+                os.remove(self.cache_path)
+            except OSError as e:
+                logger.warning(f"[Genesys token] No se pudo eliminar la cache del token: {e}")
+
+    def request_token(self) -> None:
+        self.api_client.get_client_credentials_token(self.client_id, self.client_secret)
+        self.requested_at = self.clock()
+        self.expires_at = self.requested_at + self.ttl_seconds
+        logger.info("[Genesys token] Nuevo token obtenido")
+        self.save_cache()
+
+    def load_cache(self) -> bool:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return False
+        try:
+            with open(self.cache_path) as f:
+                cached = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"[Genesys token] No se pudo leer la cache del token: {e}")
+            return False
+
+        if cached.get("client_id") != self.client_id:
+            return False
+        if self.clock() >= cached.get("expires_at", 0) - self.refresh_margin:
+            return False
+
+        self.api_client.access_token = cached["access_token"]
+        self.expires_at = cached["expires_at"]
+        return True
+
+    def save_cache(self) -> None:
+        if not self.cache_path:
+            return
+        try:
+            # El archivo solo debe ser legible por el usuario del proceso
+            fd = os.open(self.cache_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump({
+                    "client_id": self.client_id,
+                    "access_token": self.api_client.access_token,
+                    "expires_at": self.expires_at
+                }, f)
+        except (OSError, TypeError) as e:
+            logger.warning(f"[Genesys token] No se pudo guardar la cache del token: {e}")
+
+    def start_background_refresh(self) -> None:
+        self.stop()
+        delay = max(0.0, self.expires_at - self.refresh_margin - self.clock())
+        self.timer = threading.Timer(delay, self.background_refresh)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def background_refresh(self) -> None:
+        try:
+            self.refresh()
+        except Exception as e:
+            # Si falla se reintenta en un minuto; el token actual sigue vigente durante el margen
+            logger.error(f"[Genesys token] Error al renovar el token: {e}")
+            self.timer = threading.Timer(60, self.background_refresh)
+            self.timer.daemon = True
+            self.timer.start()
+            return
+        self.start_background_refresh()
+
+    def stop(self) -> None:
+        if self.timer:
+            self.timer.cancel()
+            self.timer = None
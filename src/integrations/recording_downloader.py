@@ -0,0 +1,133 @@
+import hashlib
+import os
+from typing import List, NamedTuple, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from src.utils.logger import logger
+from src.utils.threads import execute_bounded, TaskResult
+
+PART_SUFFIX = ".part"
+
+
+class DownloadItem(NamedTuple):
+    url: str
+    path: str
+    expected_size: Optional[int] = None
+    expected_sha256: Optional[str] = None
+
+
+class DownloadResult(NamedTuple):
+    path: str
+    size: int
+    sha256: str
+    resumed_from: int = 0
+
+
+class DownloadError(Exception):
+    pass
+
+
+def create_session(pool_size: int) -> requests.Session:
+    # Una conexion por worker; las descargas al mismo host reutilizan conexiones keep-alive
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def file_sha256(path: str, chunk_size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_range_total(response: requests.Response) -> Optional[int]:
+    # "bytes 100-199/1000" o "bytes */1000"
+    content_range = response.headers.get("Content-Range", "")
+    total = content_range.rpartition("/")[2]
+    return int(total) if total.isdigit() else None
+
+
+class RecordingDownloader:
+    """Descarga grabaciones a disco por bloques con una sesion HTTP compartida.
+
+    Cada archivo se escribe en <path>.part y se renombra al verificar tamano y hash, de modo
+    que un archivo con el nombre final siempre esta completo. Si la descarga se corta, el
+    siguiente intento continua el .part con un header Range.
+    """
+
+    def __init__(self, workers: int, chunk_size: int, timeout: float,
+                 session: Optional[requests.Session] = None):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.session = session or create_session(workers)
+
+    def download_all(self, items: List[DownloadItem]) -> List[TaskResult]:
+        """Descarga los items con concurrencia acotada; los errores se devuelven por item."""
+        return execute_bounded(self.download, items, max_workers=self.workers)
+
+    def download(self, item: DownloadItem) -> DownloadResult:
+        if os.path.exists(item.path):
+            # Descargado en una ejecucion anterior (el rename solo ocurre tras verificarlo)
+            return DownloadResult(item.path, os.path.getsize(item.path), file_sha256(item.path, self.chunk_size))
+
+        os.makedirs(os.path.dirname(item.path) or ".", exist_ok=True)
+        part_path = item.path + PART_SUFFIX
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+        with self.session.get(item.url, headers=headers, stream=True, timeout=self.timeout) as response:
+            if response.status_code == 416 and offset:
+                # El .part ya tiene todo el contenido; se verifica con el total que informa el servidor
+                total = content_range_total(response)
+                return self.finalize(item, part_path, hashlib.sha256(), offset, total, resumed_from=offset)
+            response.raise_for_status()
+
+            digest = hashlib.sha256()
+            if response.status_code == 206:
+                total = content_range_total(response)
+                self.hash_existing(part_path, digest)
+                mode, resumed_from = "ab", offset
+            else:
+                # El servidor ignoro el Range: se descarga completo desde el inicio
+                length = response.headers.get("Content-Length")
+                total = int(length) if length and length.isdigit() else None
+                mode, resumed_from = "wb", 0
+
+            size = resumed_from
+            with open(part_path, mode) as file:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    file.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+                file.flush()
+                os.fsync(file.fileno())
+
+        return self.finalize(item, part_path, digest, size, total, resumed_from, hashed=True)
+
+    def hash_existing(self, part_path: str, digest) -> None:
+        with open(part_path, "rb") as file:
+            for chunk in iter(lambda: file.read(self.chunk_size), b""):
+                digest.update(chunk)
+
+    def finalize(self, item: DownloadItem, part_path: str, digest, size: int, total: Optional[int],
+                 resumed_from: int, hashed: bool = False) -> DownloadResult:
+        sha256 = digest.hexdigest() if hashed else file_sha256(part_path, self.chunk_size)
+        expected_size = item.expected_size if item.expected_size is not None else total
+        if expected_size is not None and size != expected_size:
+            # Un .part mas grande que el archivo no se puede continuar; se descarta
+            if size > expected_size:
+                os.remove(part_path)
+            raise DownloadError(f"Tamano de {item.path} inesperado: {size} de {expected_size} bytes")
+        if item.expected_sha256 and sha256 != item.expected_sha256:
+            os.remove(part_path)
+            raise DownloadError(f"Hash de {item.path} no coincide")
+
+        os.replace(part_path, item.path)
+        if resumed_from:
+            logger.info(f"[Recording downloader] {item.path} continuado desde el byte {resumed_from}")
+        return DownloadResult(item.path, size, sha256, resumed_from)
@@ -1,15 +1,67 @@
-from src.utils.database import engine
+from src.utils.database import get_engine
 from src.repository.models.audio_model import AudioModel
+from src.repository.models.batch_model import BatchModel
+from src.repository.models.recording_blob_model import RecordingBlobModel
 from src.utils.logger import logger
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import text, select, bindparam, any_, String
+from sqlalchemy.dialects import postgresql
+from src.utils.copy_stream import CsvCopyStream, copy_statement
+from src.repository.status_transitions import transition_status, ExpectedStatus
+from typing import Iterable, List, Optional, Set
+
+# Columnas del analisis de Gemini que se cargan en bloque desde un archivo de resultados
+ANALYSIS_COLUMNS = (
+    "reason", "reason_short", "summary", "initial_feeling", "final_feeling", "product_type",
+    "category_typification", "typification", "typification_reason",
+)
+RESULTS_STAGE_TABLE = "audio_results_stage"
+RESULTS_STAGE_COLUMNS = ("id_conversation",) + ANALYSIS_COLUMNS + ("status",)
+
+# Tabla temporal de la transaccion; ON COMMIT DROP la elimina al terminar.
+# line numera las filas en el orden del COPY (no esta en el archivo)
+CREATE_RESULTS_STAGE = (
+    f"CREATE TEMP TABLE {RESULTS_STAGE_TABLE} (line bigint GENERATED ALWAYS AS IDENTITY, "
+    + ", ".join(f"{column} varchar" for column in RESULTS_STAGE_COLUMNS)
+    + ") ON COMMIT DROP"
+)
+
+# Un solo UPDATE ... FROM: las columnas ausentes en el archivo (NULL) conservan su valor actual.
+# Si una conversacion aparece varias veces en el archivo se aplica su ultima linea; sin DISTINCT ON
+# el UPDATE tomaria una fila arbitraria del join
+APPLY_RESULTS_STAGE = (
+    "UPDATE audios_sac.audio AS a SET "
+    + ", ".join(f"{column} = COALESCE(s.{column}, a.{column})" for column in ANALYSIS_COLUMNS)
+    + ", status = COALESCE(s.status, %(status)s) "
+    f"FROM (SELECT DISTINCT ON (id_conversation) * FROM {RESULTS_STAGE_TABLE} "
+    "ORDER BY id_conversation, line DESC) AS s WHERE a.id_conversation = s.id_conversation"
+)
+
+# Caracteristicas de audio (--extract-features); se cargan igual que los resultados de analisis
+FEATURE_COLUMNS = (
+    "audio_duration_ms", "silence_ratio", "rms_dbfs", "clipping_ratio", "channel_talk_ms", "features_error",
+)
+FEATURES_STAGE_TABLE = "audio_features_stage"
+FEATURES_STAGE_COLUMNS = ("id_conversation",) + FEATURE_COLUMNS
+
+CREATE_FEATURES_STAGE = (
+    f"CREATE TEMP TABLE {FEATURES_STAGE_TABLE} (id_conversation varchar, audio_duration_ms integer, "
+    "silence_ratio double precision, rms_dbfs double precision, clipping_ratio double precision, "
+    "channel_talk_ms json, features_error varchar) ON COMMIT DROP"
+)
+
+APPLY_FEATURES_STAGE = (
+    "UPDATE audios_sac.audio AS a SET "
+    + ", ".join(f"{column} = s.{column}" for column in FEATURE_COLUMNS)
+    + f" FROM {FEATURES_STAGE_TABLE} AS s WHERE a.id_conversation = s.id_conversation"
+)
 
 class AudioRepository:
 
     def get(self, id_conversation: str) -> AudioModel:
         logger.debug("[Repository] Inicio del metodo get")
         try:
-            with Session(engine) as db:
+            with Session(get_engine()) as db:
                 result = db.query(AudioModel).filter(AudioModel.id_conversation == id_conversation).first()
             return result
         except Exception as e:
@@ -19,7 +71,7 @@ class AudioRepository:
     def insert(self, audio: AudioModel) -> AudioModel:
         logger.debug(f"[Repository] Inicio del metodo insert para el audio:{audio.id_conversation}" )
         try:
-            with Session(engine) as db:
+            with Session(get_engine()) as db:
                 db.add(audio)
                 db.commit()
                 db.refresh(audio)
@@ -29,10 +81,152 @@ class AudioRepository:
             logger.error(f"Error en insertar el registro: {e}")
             raise
 
+    def get_existing_ids(self, ids_conversation: List[str]) -> Set[str]:
+        logger.debug(f"[Repository] Inicio del metodo get_existing_ids para {len(ids_conversation)} conversaciones")
+        if not ids_conversation:
+            return set()
+        try:
+            # Una sola consulta con id_conversation = ANY(array) sin importar la cantidad de ids
+            ids_param = bindparam("ids", value=list(ids_conversation), type_=postgresql.ARRAY(String))
+            with Session(get_engine()) as db:
+                result = db.execute(
+                    select(AudioModel.id_conversation).where(AudioModel.id_conversation == any_(ids_param))
+                )
+                return set(result.scalars())
+        except Exception as e:
+            logger.error(f"Error en obtener los registros existentes: {e}")
+            raise
+
+    def apply_analysis_results(self, results: Iterable[dict], status: str = "SUCCESS") -> int:
+        """Aplica en bloque los resultados del analisis por id_conversation y cambia el estado.
+
+        Los resultados se cargan con COPY en una tabla temporal y se aplican con un unico
+        UPDATE ... FROM, todo en la misma transaccion; si un id_conversation se repite gana su
+        ultima aparicion. Devuelve la cantidad de audios actualizados.
+        """
+        logger.debug("[Repository] Inicio del metodo apply_analysis_results")
+        rows = ([result.get(column) for column in RESULTS_STAGE_COLUMNS] for result in results)
+        stream = CsvCopyStream(rows)
+        try:
+            with Session(get_engine()) as db:
+                # Cursor DBAPI de la conexion de la sesion para usar COPY dentro de la misma transaccion
+                cursor = db.connection().connection.cursor()
+                cursor.execute(CREATE_RESULTS_STAGE)
+                cursor.copy_expert(copy_statement(RESULTS_STAGE_TABLE, RESULTS_STAGE_COLUMNS), stream)
+                cursor.execute(APPLY_RESULTS_STAGE, {"status": status})
+                updated = cursor.rowcount
+                db.commit()
+            logger.info(f"[Repository] {updated} audios actualizados con {stream.row_count} resultados de analisis")
+            return updated
+
+        except Exception as e:
+            logger.error(f"Error en aplicar los resultados de analisis: {e}")
+            raise
+
+    def get_pending_features(self, batch_status: str, limit: int, after: Optional[str] = None) -> List[str]:
+        """Conversaciones de los batches en batch_status sin caracteristicas de audio calculadas.
+
+        Se pagina por id_conversation (after = ultimo id de la pagina anterior), asi una
+        conversacion que no se pudo procesar no se vuelve a leer en la misma ejecucion.
+        """
+        logger.debug(f"[Repository] Consultando audios sin caracteristicas de los batches en '{batch_status}'")
+        try:
+            with Session(get_engine()) as db:
+                query = (
+                    select(AudioModel.id_conversation)
+                    .join(BatchModel, AudioModel.batch_id == BatchModel.id)
+                    .where(BatchModel.status == batch_status,
+                           AudioModel.audio_duration_ms.is_(None),
+                           AudioModel.features_error.is_(None))
+                    .order_by(AudioModel.id_conversation)
+                    .limit(limit)
+                )
+                if after is not None:
+                    query = query.where(AudioModel.id_conversation > after)
+                return list(db.execute(query).scalars())
+        except Exception as e:
+            logger.error(f"Error en obtener los audios sin caracteristicas: {e}")
+            return []
+
+    def get_batches_pending_features(self, sha256s: Iterable[str], batch_status: str) -> List[int]:
+        """Batches en batch_status con audios sin caracteristicas cuyas grabaciones son alguno de los sha256."""
+        sha256s = list(sha256s)
+        if not sha256s:
+            return []
+        logger.debug(f"[Repository] Consultando batches con caracteristicas pendientes de {len(sha256s)} blobs")
+        try:
+            with Session(get_engine()) as db:
+                sha_param = bindparam("sha256s", value=sha256s, type_=postgresql.ARRAY(RecordingBlobModel.sha256.type))
+                query = (
+                    select(AudioModel.batch_id)
+                    .join(BatchModel, AudioModel.batch_id == BatchModel.id)
+                    .join(RecordingBlobModel, RecordingBlobModel.id_conversation == AudioModel.id_conversation)
+                    .where(RecordingBlobModel.sha256 == any_(sha_param),
+                           BatchModel.status == batch_status,
+                           AudioModel.audio_duration_ms.is_(None),
+                           AudioModel.features_error.is_(None))
+                    .distinct()
+                )
+                return list(db.execute(query).scalars())
+        except Exception as e:
+            logger.error(f"Error en obtener los batches con caracteristicas pendientes: {e}")
+            return []
+
+    def apply_features(self, features: Iterable[dict]) -> int:
+        """Guarda en bloque las caracteristicas de audio por id_conversation (COPY + UPDATE ... FROM)."""
+        logger.debug("[Repository] Inicio del metodo apply_features")
+        rows = ([feature.get(column) for column in FEATURES_STAGE_COLUMNS] for feature in features)
+        stream = CsvCopyStream(rows)
+        try:
+            with Session(get_engine()) as db:
+                cursor = db.connection().connection.cursor()
+                cursor.execute(CREATE_FEATURES_STAGE)
+                cursor.copy_expert(copy_statement(FEATURES_STAGE_TABLE, FEATURES_STAGE_COLUMNS), stream)
+                cursor.execute(APPLY_FEATURES_STAGE)
+                updated = cursor.rowcount
+                db.commit()
+            logger.info(f"[Repository] {updated} audios actualizados con {stream.row_count} caracteristicas de audio")
+            return updated
+
+        except Exception as e:
+            logger.error(f"Error en guardar las caracteristicas de audio: {e}")
+            raise
+
+    def transition_status_by_batch(self, batch_ids: Iterable[int], new_status: str,
+                                   expected_status: ExpectedStatus = None) -> List[int]:
+        # Cambia el estado de todos los audios de los batches en un solo UPDATE; devuelve los ids de audio
+        batch_ids = list(batch_ids)
+        logger.debug(f"[Repository] Transicion de los audios de {len(batch_ids)} batches de '{expected_status}' a '{new_status}'")
+        try:
+            with Session(get_engine()) as db:
+                updated = transition_status(db, AudioModel, AudioModel.batch_id, batch_ids, new_status,
+                                            expected_status, returning=AudioModel.id)
+                db.commit()
+            return updated
+
+        except Exception as e:
+            logger.error(f"Error al actualizar el estado de los audios: {e}")
+            return []
+
+    def transition_status(self, ids_conversation: Iterable[str], new_status: str,
+                          expected_status: ExpectedStatus = None) -> List[str]:
+        ids_conversation = list(ids_conversation)
+        logger.debug(f"[Repository] Transicion de {len(ids_conversation)} audios de '{expected_status}' a '{new_status}'")
+        try:
+            with Session(get_engine()) as db:
+                updated = transition_status(db, AudioModel, AudioModel.id_conversation, ids_conversation,
+                                            new_status, expected_status)
+                db.commit()
+            return updated
+
+        except Exception as e:
+            logger.error(f"Error al actualizar el estado de los audios: {e}")
+            return []
+
     def delete(self, audio: AudioModel) -> bool:
         logger.debug("[Repository] Inicio del metodo delete")
         try:
-            with Session(engine) as db:
+            with Session(get_engine()) as db:
                 db.delete(audio)
                 db.commit()
             success = True
@@ -40,3 +234,22 @@ class AudioRepository:
             logger.error(f"Error en eliminar el registro: {e}")
             success = False
         return success
+
+
+def upsert_audios(db: Session, rows: List[dict]) -> List[int]:
+    """Inserta los audios con un solo INSERT multi-fila, ignorando las conversaciones ya registradas.
+
+    Devuelve los ids de las filas insertadas en el mismo orden que rows; las filas omitidas
+    por conflicto no aparecen, asi que el llamador puede comparar len(ids) con len(rows).
+    """
+    if not rows:
+        return []
+    # sort_by_parameter_order no admite filas omitidas por ON CONFLICT (falla al cruzar los
+    # centinelas), por eso el orden se reconstruye a partir de id_conversation
+    statement = (
+        postgresql.insert(AudioModel)
+        .on_conflict_do_nothing(index_elements=[AudioModel.id_conversation, AudioModel.call_date])
+        .returning(AudioModel.id_conversation, AudioModel.id)
+    )
+    inserted = dict(db.execute(statement, rows).all())
+    return [inserted[row["id_conversation"]] for row in rows if row["id_conversation"] in inserted]
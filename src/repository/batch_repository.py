@@ -1,15 +1,19 @@
-from src.utils.database import engine
+from src.utils.database import get_engine
 from src.repository.models.batch_model import BatchModel
 from src.utils.logger import logger
+from src.repository.unit_of_work import UnitOfWork
+from src.repository.status_transitions import transition_status, ExpectedStatus
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+from datetime import datetime
+from typing import Iterable, List, Optional
 
 class BatchRepository:
     
     def get(self,id_conversation):
         logger.debug("[Repository] Inicio del metodo get")
         try:
-            with Session(engine) as db:
+            with Session(get_engine()) as db:
                 result = db.query(BatchModel).filter(id_conversation=id_conversation).first()
             return result
         except Exception as e:
@@ -20,7 +24,7 @@ class BatchRepository:
     def insert(self, batch) -> BatchModel:
         logger.debug("[Repository] Inicio del metodo insert para el batch con id: " + batch.genesys_batch_id)
         try:
-            with Session(engine) as db:
+            with Session(get_engine()) as db:
                 db.add(batch)
                 db.commit()
                 db.refresh(batch)
@@ -30,10 +34,30 @@ class BatchRepository:
             logger.error(f"Error en insertar el registro: {e}")
             return None
 
+    def insert_with_audios(self, batch: BatchModel, audios: List) -> BatchModel:
+        logger.debug(f"[Repository] Inicio del metodo insert_with_audios para el batch con id: {batch.genesys_batch_id}")
+        try:
+            # El batch y sus audios se guardan en una sola transaccion
+            with UnitOfWork() as uow:
+                uow.add(batch)
+                rows = [audio if isinstance(audio, dict) else audio.to_row() for audio in audios]
+                for row in rows:
+                    row["batch_id"] = batch.id
+                ids = uow.add_audios(rows)
+                if len(ids) != len(rows):
+                    # Otra ejecucion registro parte de las conversaciones despues del dedupe previo
+                    logger.warning(f"[Repository] {len(rows) - len(ids)} audios ya existian, no se asocian al batch {batch.genesys_batch_id}")
+                    batch.audios_count = len(ids)
+            return batch
+
+        except Exception as e:
+            logger.error(f"Error en insertar el batch con sus audios: {e}")
+            raise
+
     def update_status(self, gemini_batch_id: str, new_status: str) -> bool:
         logger.debug(f"[Repository] Actualizando estado del batch {gemini_batch_id} a '{new_status}'")
         try:
-            with Session(engine) as db:
+            with Session(get_engine()) as db:
                 batch = db.query(BatchModel).filter(BatchModel.gemini_batch_id == gemini_batch_id).first()
 
                 if not batch:
@@ -49,11 +73,51 @@ class BatchRepository:
             logger.error(f"Error al actualizar el estado del batch {gemini_batch_id}: {e}")
             return False
 
+    def transition_status(self, gemini_batch_ids: Iterable[str], new_status: str,
+                          expected_status: ExpectedStatus = None) -> List[str]:
+        # Un solo UPDATE para todos los batches; devuelve los gemini_batch_id que cambiaron de estado
+        gemini_batch_ids = list(gemini_batch_ids)
+        logger.debug(f"[Repository] Transicion de {len(gemini_batch_ids)} batches de '{expected_status}' a '{new_status}'")
+        try:
+            with Session(get_engine()) as db:
+                updated = transition_status(db, BatchModel, BatchModel.gemini_batch_id, gemini_batch_ids,
+                                            new_status, expected_status)
+                db.commit()
+            return updated
+
+        except Exception as e:
+            logger.error(f"Error al actualizar el estado de los batches: {e}")
+            return []
+
+    def transition_status_by_id(self, batch_ids: Iterable[int], new_status: str,
+                                expected_status: ExpectedStatus = None,
+                                end_date: Optional[datetime] = None) -> List[int]:
+        batch_ids = list(batch_ids)
+        logger.debug(f"[Repository] Transicion de {len(batch_ids)} batches de '{expected_status}' a '{new_status}'")
+        try:
+            with Session(get_engine()) as db:
+                updated = transition_status(db, BatchModel, BatchModel.id, batch_ids, new_status, expected_status,
+                                            values={"end_date": end_date} if end_date else None)
+                db.commit()
+            return updated
+
+        except Exception as e:
+            logger.error(f"Error al actualizar el estado de los batches: {e}")
+            return []
+
+    def get_by_status(self, status: str) -> List[BatchModel]:
+        logger.debug(f"[Repository] Obteniendo batches en estado '{status}'")
+        try:
+            with Session(get_engine(), expire_on_commit=False) as db:
+                return db.query(BatchModel).filter(BatchModel.status == status).order_by(BatchModel.id).all()
+        except Exception as e:
+            logger.error(f"Error al obtener los batches en estado '{status}': {e}")
+            return []
 
     def delete(self, batch: BatchModel) -> bool:
         logger.debug("[Repository] Inicio del metodo delete")
         try:
-            with Session(engine) as db:
+            with Session(get_engine()) as db:
                 db.delete(batch)
                 db.commit()
             success = True
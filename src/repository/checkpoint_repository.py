@@ -0,0 +1,103 @@
+from datetime import datetime
+from src.utils.database import get_engine
+from src.repository.models.job_checkpoint_model import JobCheckpointModel, JobConversationModel
+from src.repository.models.conversation_record import ConversationRecord
+from src.utils.logger import logger
+from sqlalchemy.orm import Session
+from sqlalchemy import select, delete
+from sqlalchemy.dialects import postgresql
+from typing import List, Optional
+
+COLLECTING = "COLLECTING"
+SUBMITTING = "SUBMITTING"
+SUBMITTED = "SUBMITTED"
+
+
+class CheckpointRepository:
+
+    def start(self, job_id: int, interval: str) -> JobCheckpointModel:
+        logger.debug(f"[Repository] Inicio del checkpoint del job {job_id}")
+        checkpoint = JobCheckpointModel(job_id=job_id, interval=interval, stage=COLLECTING,
+                                        completed_shards=[], last_page=0, updated_at=datetime.now())
+        try:
+            with Session(get_engine(), expire_on_commit=False) as db:
+                db.add(checkpoint)
+                db.commit()
+            return checkpoint
+        except Exception as e:
+            logger.error(f"Error en crear el checkpoint del job {job_id}: {e}")
+            raise
+
+    def get(self, job_id: int) -> Optional[JobCheckpointModel]:
+        logger.debug(f"[Repository] Obteniendo el checkpoint del job {job_id}")
+        try:
+            with Session(get_engine(), expire_on_commit=False) as db:
+                return db.get(JobCheckpointModel, job_id)
+        except Exception as e:
+            logger.error(f"Error en obtener el checkpoint del job {job_id}: {e}")
+            raise
+
+    def save_progress(self, job_id: int, conversations: List[ConversationRecord],
+                      shard: Optional[str] = None, last_page: Optional[int] = None) -> None:
+        """Guarda las conversaciones obtenidas y el avance (shard o pagina) en la misma transaccion."""
+        logger.debug(f"[Repository] Checkpoint del job {job_id}: {len(conversations)} conversaciones, shard={shard}, pagina={last_page}")
+        rows = [
+            {"job_id": job_id, "id_conversation": c.id_conversation, "call_date": c.call_date,
+             "call_duration": c.call_duration}
+            for c in conversations
+        ]
+        try:
+            with Session(get_engine()) as db:
+                if rows:
+                    db.execute(
+                        postgresql.insert(JobConversationModel).on_conflict_do_nothing(
+                            index_elements=[JobConversationModel.job_id, JobConversationModel.id_conversation]
+                        ),
+                        rows
+                    )
+                # Bloqueo de la fila: los shards se registran desde varios hilos
+                checkpoint = db.get(JobCheckpointModel, job_id, with_for_update=True)
+                if shard is not None:
+                    checkpoint.completed_shards = list(checkpoint.completed_shards) + [shard]
+                if last_page is not None:
+                    checkpoint.last_page = last_page
+                checkpoint.updated_at = datetime.now()
+                db.commit()
+        except Exception as e:
+            logger.error(f"Error en guardar el checkpoint del job {job_id}: {e}")
+            raise
+
+    def mark_stage(self, job_id: int, stage: str, expected_stage: Optional[str] = None) -> bool:
+        # Con expected_stage solo se cambia si el checkpoint sigue en esa etapa
+        logger.debug(f"[Repository] Checkpoint del job {job_id} pasa a {stage}")
+        try:
+            with Session(get_engine()) as db:
+                checkpoint = db.get(JobCheckpointModel, job_id, with_for_update=True)
+                if checkpoint is None or (expected_stage is not None and checkpoint.stage != expected_stage):
+                    return False
+                checkpoint.stage = stage
+                checkpoint.updated_at = datetime.now()
+                if stage == SUBMITTED:
+                    # Las conversaciones ya estan en audio; la copia del checkpoint ya no hace falta
+                    db.execute(delete(JobConversationModel).where(JobConversationModel.job_id == job_id))
+                db.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Error en actualizar el checkpoint del job {job_id}: {e}")
+            raise
+
+    def load_conversations(self, job_id: int) -> List[ConversationRecord]:
+        logger.debug(f"[Repository] Cargando conversaciones del checkpoint del job {job_id}")
+        try:
+            with Session(get_engine()) as db:
+                result = db.execute(
+                    select(JobConversationModel.id_conversation, JobConversationModel.call_date,
+                           JobConversationModel.call_duration)
+                    .where(JobConversationModel.job_id == job_id)
+                    .order_by(JobConversationModel.call_date, JobConversationModel.id_conversation)
+                )
+                return [ConversationRecord(id_conversation, call_date, call_duration)
+                        for id_conversation, call_date, call_duration in result]
+        except Exception as e:
+            logger.error(f"Error en cargar las conversaciones del job {job_id}: {e}")
+            raise
@@ -1,15 +1,17 @@
-from src.utils.database import engine
+from src.utils.database import get_engine
 from src.repository.models.job_model import JobModel
 from src.utils.logger import logger
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+from src.repository.status_transitions import transition_status, ExpectedStatus
+from typing import Iterable, List
 
 class JobRepository:
         
     def insert(self, job:JobModel) -> JobModel:
         logger.debug("[Repository] Inicio del metodo insert")
         try:
-            with Session(engine) as db:
+            with Session(get_engine()) as db:
                 db.add(job)
                 db.commit()
                 db.refresh(job)
@@ -24,10 +26,19 @@ class JobRepository:
             logger.error(f"Error en insertar el registro: {e}")
             return None
 
+    def get(self, job_id: int) -> JobModel:
+        logger.debug(f"[Repository] Obteniendo el job {job_id}")
+        try:
+            with Session(get_engine(), expire_on_commit=False) as db:
+                return db.get(JobModel, job_id)
+        except Exception as e:
+            logger.error(f"[Repository] Error al obtener el job {job_id}: {e}")
+            return None
+
     def update_status(self, job_id: int, new_status: str) -> bool:
         logger.debug(f"[Repository] Actualizando estado del job {job_id} a {new_status}")
         try:
-            with Session(engine) as db:
+            with Session(get_engine()) as db:
                 job = db.query(JobModel).filter(JobModel.id == job_id).first()
                 if job:
                     job.status = new_status
@@ -39,4 +50,18 @@ class JobRepository:
                     return False
         except Exception as e:
             logger.error(f"[Repository] Error al actualizar el estado del job {job_id}: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    def transition_status(self, job_ids: Iterable[int], new_status: str,
+                          expected_status: ExpectedStatus = None) -> List[int]:
+        # Un solo UPDATE con compare-and-set sobre el estado anterior; devuelve los ids actualizados
+        job_ids = list(job_ids)
+        logger.debug(f"[Repository] Transicion de {len(job_ids)} jobs de '{expected_status}' a '{new_status}'")
+        try:
+            with Session(get_engine()) as db:
+                updated = transition_status(db, JobModel, JobModel.id, job_ids, new_status, expected_status)
+                db.commit()
+            return updated
+        except Exception as e:
+            logger.error(f"[Repository] Error al actualizar el estado de los jobs: {e}")
+            return []
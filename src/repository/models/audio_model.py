@@ -1,9 +1,15 @@
 from src.utils.database import Base
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Index, JSON
 
 class AudioModel(Base):
     __tablename__ = "audio"
-    __table_args__ = {"schema": "audios_sac"}
+    # Tabla particionada por mes de call_date (migracion 003); las llaves unicas incluyen call_date
+    __table_args__ = (
+        Index("audio_id_conversation_key", "id_conversation", "call_date", unique=True),
+        Index("ix_audios_sac_audio_batch_id_status", "batch_id", "status"),
+        Index("ix_audios_sac_audio_status", "status"),
+        {"schema": "audios_sac", "postgresql_partition_by": "RANGE (call_date)"},
+    )
 
     id = Column(Integer, primary_key=True)
     id_conversation = Column(String, nullable=False) #Genesys
@@ -23,5 +29,13 @@ class AudioModel(Base):
     typification = Column(String)
     typification_reason = Column(String) 
 
+    # Caracteristicas calculadas sobre la grabacion descargada (migracion 007)
+    audio_duration_ms = Column(Integer)
+    silence_ratio = Column(Float)
+    rms_dbfs = Column(Float)
+    clipping_ratio = Column(Float)
+    channel_talk_ms = Column(JSON)
+    features_error = Column(String)
+
     batch_id = Column(Integer, ForeignKey("audios_sac.batch.id"))  
 
@@ -14,9 +14,9 @@ class BatchModel(Base):
     status = Column(String, nullable=False)
     error_message = Column(String)
     
-    genesys_batch_id = Column(String)
-    gemini_batch_id = Column(String)
+    genesys_batch_id = Column(String, index=True)
+    gemini_batch_id = Column(String, index=True)
     gemini_category_batch_id = Column(String)
     gemini_typification_batch_id = Column(String)
-    job_id = Column(Integer)
+    job_id = Column(Integer, index=True)
     
\ No newline at end of file
@@ -0,0 +1,49 @@
+from datetime import datetime
+from typing import Optional
+
+
+class ConversationRecord:
+    """Conversacion extraida de Genesys durante la fase de extraccion.
+
+    Solo guarda lo necesario para armar batches; se convierte en una fila para insercion
+    masiva recien al escribir en base de datos.
+    """
+    __slots__ = ("id_conversation", "call_date", "call_duration", "batch_id")
+
+    def __init__(self, id_conversation: str, call_date: Optional[datetime], call_duration: int,
+                 batch_id: Optional[int] = None):
+        self.id_conversation = id_conversation
+        self.call_date = call_date
+        self.call_duration = call_duration
+        self.batch_id = batch_id
+
+    def to_row(self, status: str = "PENDING") -> dict:
+        return {
+            "id_conversation": self.id_conversation,
+            "status": status,
+            "creation_date": datetime.now(),
+            "call_date": self.call_date,
+            "call_duration": self.call_duration,
+            "batch_id": self.batch_id
+        }
+
+    def to_payload(self) -> dict:
+        # Representacion JSON para las tareas de la cola (work_task.payload)
+        return {
+            "id_conversation": self.id_conversation,
+            "call_date": self.call_date.isoformat() if self.call_date else None,
+            "call_duration": self.call_duration
+        }
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "ConversationRecord":
+        call_date = payload.get("call_date")
+        return cls(
+            id_conversation=payload["id_conversation"],
+            call_date=datetime.fromisoformat(call_date) if call_date else None,
+            call_duration=payload["call_duration"]
+        )
+
+    def __repr__(self):
+        return f"ConversationRecord({self.id_conversation!r}, {self.call_date!r}, {self.call_duration!r}, {self.batch_id!r})"
+
@@ -0,0 +1,25 @@
+from src.utils.database import Base
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+
+class JobCheckpointModel(Base):
+    __tablename__ = "job_checkpoint"
+    __table_args__ = {"schema": "audios_sac"}
+
+    job_id = Column(Integer, ForeignKey("audios_sac.job.id"), primary_key=True)
+    interval = Column(String, nullable=False)
+    # COLLECTING -> SUBMITTING -> SUBMITTED
+    stage = Column(String, nullable=False)
+    completed_shards = Column(JSON, nullable=False, default=list)
+    last_page = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False)
+
+
+class JobConversationModel(Base):
+    """Conversaciones ya obtenidas de analytics para un job, para no volver a consultarlas al reanudar"""
+    __tablename__ = "job_conversation"
+    __table_args__ = {"schema": "audios_sac"}
+
+    job_id = Column(Integer, ForeignKey("audios_sac.job_checkpoint.job_id", ondelete="CASCADE"), primary_key=True)
+    id_conversation = Column(String, primary_key=True)
+    call_date = Column(DateTime)
+    call_duration = Column(Integer, nullable=False)
@@ -0,0 +1,21 @@
+from src.utils.database import Base
+from sqlalchemy import Column, String, BigInteger, DateTime, JSON
+
+class RecordingBlobModel(Base):
+    """Indice del almacen de grabaciones: cada grabacion apunta al blob (sha256) con su contenido"""
+    __tablename__ = "recording_blob"
+    __table_args__ = {"schema": "audios_sac"}
+
+    id_conversation = Column(String, primary_key=True)
+    recording_id = Column(String, primary_key=True)
+    sha256 = Column(String(64), nullable=False, index=True)
+    size = Column(BigInteger, nullable=False)
+    content_type = Column(String)
+    created_at = Column(DateTime, nullable=False)
+
+    # Version sin silencios largos (--trim-silences, migracion 008); se calcula una vez por blob
+    trimmed_sha256 = Column(String(64))
+    trimmed_size = Column(BigInteger)
+    trim_bytes_saved = Column(BigInteger)
+    trim_offsets = Column(JSON)
+    trim_error = Column(String)
@@ -0,0 +1,28 @@
+from src.utils.database import Base
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Index, text
+
+class WorkTaskModel(Base):
+    __tablename__ = "work_task"
+    __table_args__ = (
+        # Indices parciales para la consulta de reclamo de tareas
+        Index("ix_audios_sac_work_task_pending", "kind", "available_at", postgresql_where=text("status = 'PENDING'")),
+        Index("ix_audios_sac_work_task_running", "lease_expires_at", postgresql_where=text("status = 'RUNNING'")),
+        {"schema": "audios_sac"},
+    )
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)
+    job_id = Column(Integer)
+    payload = Column(JSON, nullable=False)
+
+    # PENDING -> RUNNING -> DONE | FAILED (vuelve a PENDING mientras queden intentos)
+    status = Column(String, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    available_at = Column(DateTime, nullable=False)
+    lease_owner = Column(String)
+    lease_expires_at = Column(DateTime)
+    last_error = Column(String)
+
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
@@ -0,0 +1,38 @@
+from datetime import date, datetime
+from src.utils.database import get_engine
+from src.utils.logger import logger
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+
+
+def add_months(day: date, months: int) -> date:
+    month_index = day.year * 12 + day.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+class PartitionRepository:
+
+    def ensure_audio_partitions(self, from_date: datetime, months_ahead: int) -> int:
+        """Crea las particiones mensuales de audio desde el mes de from_date hasta months_ahead meses despues.
+
+        Es idempotente: audios_sac.create_audio_partitions (migracion 003) solo crea las que faltan.
+        Un error se propaga: sin la particion del mes, los inserts de audio fallarian despues de
+        haber enviado el batch a Genesys.
+        """
+        from_month = date(from_date.year, from_date.month, 1)
+        to_month = add_months(from_month, months_ahead)
+        logger.debug(f"[Repository] Asegurando particiones de audio entre {from_month} y {to_month}")
+        try:
+            with Session(get_engine()) as db:
+                created = db.execute(
+                    text("SELECT audios_sac.create_audio_partitions(:from_month, :to_month)"),
+                    {"from_month": from_month, "to_month": to_month}
+                ).scalar()
+                db.commit()
+            if created:
+                logger.info(f"[Repository] Se crearon {created} particiones de audio")
+            return created or 0
+
+        except Exception as e:
+            logger.error(f"Error en crear las particiones de audio: {e}")
+            raise
@@ -0,0 +1,135 @@
+from src.utils.database import get_engine
+from src.repository.models.recording_blob_model import RecordingBlobModel
+from src.utils.logger import logger
+from sqlalchemy.orm import Session
+from sqlalchemy import select, update, bindparam, any_, func, null
+from sqlalchemy.dialects import postgresql
+from typing import Dict, Iterable, List, Optional
+
+# Columnas del recorte de silencios, comunes a todas las grabaciones con el mismo sha256
+TRIM_COLUMNS = ("trimmed_sha256", "trimmed_size", "trim_bytes_saved", "trim_offsets", "trim_error")
+
+
+class RecordingBlobRepository:
+
+    def upsert(self, rows: List[dict]) -> int:
+        """Registra (id_conversation, recording_id) -> sha256; una grabacion descargada de nuevo actualiza su blob."""
+        logger.debug(f"[Repository] Registrando {len(rows)} grabaciones en el indice del almacen")
+        if not rows:
+            return 0
+        try:
+            with Session(get_engine()) as db:
+                statement = postgresql.insert(RecordingBlobModel).values(created_at=func.now())
+                statement = statement.on_conflict_do_update(
+                    index_elements=[RecordingBlobModel.id_conversation, RecordingBlobModel.recording_id],
+                    set_={
+                        "sha256": statement.excluded.sha256,
+                        "size": statement.excluded.size,
+                        "content_type": statement.excluded.content_type,
+                    }
+                )
+                db.execute(statement, rows)
+                db.commit()
+            return len(rows)
+        except Exception as e:
+            logger.error(f"[Repository] Error al registrar grabaciones en el indice del almacen: {e}")
+            raise
+
+    def get_by_recording_ids(self, recording_ids: Iterable[str]) -> Dict[str, str]:
+        """Devuelve recording_id -> sha256 de las grabaciones ya registradas."""
+        recording_ids = list(recording_ids)
+        if not recording_ids:
+            return {}
+        try:
+            with Session(get_engine()) as db:
+                ids_param = bindparam("ids", value=recording_ids, type_=postgresql.ARRAY(RecordingBlobModel.recording_id.type))
+                result = db.execute(
+                    select(RecordingBlobModel.recording_id, RecordingBlobModel.sha256)
+                    .where(RecordingBlobModel.recording_id == any_(ids_param))
+                )
+                return {recording_id: sha256 for recording_id, sha256 in result}
+        except Exception as e:
+            logger.error(f"[Repository] Error al consultar el indice del almacen: {e}")
+            return {}
+
+    def get_by_conversations(self, ids_conversation: Iterable[str]) -> Dict[str, List[str]]:
+        """Devuelve id_conversation -> sha256 de sus grabaciones, para leerlas del almacen."""
+        ids_conversation = list(ids_conversation)
+        if not ids_conversation:
+            return {}
+        try:
+            with Session(get_engine()) as db:
+                ids_param = bindparam("ids", value=ids_conversation,
+                                      type_=postgresql.ARRAY(RecordingBlobModel.id_conversation.type))
+                result = db.execute(
+                    select(RecordingBlobModel.id_conversation, RecordingBlobModel.sha256)
+                    .where(RecordingBlobModel.id_conversation == any_(ids_param))
+                    .order_by(RecordingBlobModel.id_conversation, RecordingBlobModel.recording_id)
+                )
+                blobs: Dict[str, List[str]] = {}
+                for id_conversation, sha256 in result:
+                    blobs.setdefault(id_conversation, []).append(sha256)
+                return blobs
+        except Exception as e:
+            logger.error(f"[Repository] Error al consultar el indice del almacen: {e}")
+            return {}
+
+    def get_pending_trim(self, limit: int, after: Optional[str] = None) -> List[str]:
+        """sha256 de los blobs sin recortar, paginados por sha256 (after = ultimo de la pagina anterior)."""
+        logger.debug("[Repository] Consultando blobs sin recortar")
+        try:
+            with Session(get_engine()) as db:
+                query = (
+                    select(RecordingBlobModel.sha256)
+                    .where(RecordingBlobModel.trimmed_sha256.is_(None), RecordingBlobModel.trim_error.is_(None))
+                    .distinct()
+                    .order_by(RecordingBlobModel.sha256)
+                    .limit(limit)
+                )
+                if after is not None:
+                    query = query.where(RecordingBlobModel.sha256 > after)
+                return list(db.execute(query).scalars())
+        except Exception as e:
+            logger.error(f"[Repository] Error al consultar los blobs sin recortar: {e}")
+            return []
+
+    def apply_trim(self, rows: List[dict]) -> int:
+        """Guarda el recorte de cada sha256 en todas sus grabaciones con un UPDATE ejecutado en bloque."""
+        logger.debug(f"[Repository] Registrando el recorte de {len(rows)} blobs")
+        if not rows:
+            return 0
+        table = RecordingBlobModel.__table__
+        params = [{"source_sha256": row["sha256"], **{column: row.get(column) for column in TRIM_COLUMNS}}
+                  for row in rows]
+        try:
+            with Session(get_engine()) as db:
+                # Sentencia Core sobre la tabla: executemany con las columnas de cada fila en el SET
+                result = db.execute(update(table).where(table.c.sha256 == bindparam("source_sha256")), params)
+                db.commit()
+            return result.rowcount
+        except Exception as e:
+            logger.error(f"[Repository] Error al registrar el recorte de los blobs: {e}")
+            raise
+
+    def clear_trim(self, trimmed_sha256s: Iterable[str]) -> int:
+        """Borra el recorte de las grabaciones cuyo blob recortado ya no esta en el almacen; vuelven a
+        quedar pendientes de recortar."""
+        trimmed_sha256s = list(trimmed_sha256s)
+        if not trimmed_sha256s:
+            return 0
+        logger.debug(f"[Repository] Borrando el recorte de {len(trimmed_sha256s)} blobs eliminados")
+        table = RecordingBlobModel.__table__
+        try:
+            with Session(get_engine()) as db:
+                sha_param = bindparam("sha256s", value=trimmed_sha256s, type_=postgresql.ARRAY(table.c.trimmed_sha256.type))
+                # null() y no None: en la columna JSON None se guardaria como el valor JSON null
+                result = db.execute(
+                    update(table)
+                    .where(table.c.trimmed_sha256 == any_(sha_param))
+                    .values({column: null() for column in TRIM_COLUMNS})
+                )
+                db.commit()
+            return result.rowcount
+        except Exception as e:
+            logger.error(f"[Repository] Error al borrar el recorte de los blobs eliminados: {e}")
+            raise
@@ -0,0 +1,35 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+from sqlalchemy import update, bindparam, any_
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+ExpectedStatus = Optional[Union[str, Sequence[str]]]
+
+
+def status_transition_statement(model, key_column, keys: Iterable, new_status: str,
+                                expected_status: ExpectedStatus = None, returning=None,
+                                values: Optional[Dict[str, Any]] = None):
+    """UPDATE ... SET status = new_status WHERE key = ANY(keys) [AND status IN expected] RETURNING ...
+
+    Con expected_status la transicion es compare-and-set: solo cambian las filas que siguen en
+    el estado esperado, asi dos procesos no aplican la misma transicion dos veces. values agrega
+    otras columnas al SET (por ejemplo end_date).
+    """
+    keys_param = bindparam("keys", value=list(keys), type_=postgresql.ARRAY(key_column.type))
+    statement = update(model).where(key_column == any_(keys_param)).values(status=new_status, **(values or {}))
+    if expected_status is not None:
+        expected = [expected_status] if isinstance(expected_status, str) else list(expected_status)
+        statement = statement.where(model.status.in_(expected))
+    # Sin sincronizar la sesion: la sentencia es set-based y no hay objetos cargados que actualizar
+    return statement.returning(returning if returning is not None else key_column) \
+        .execution_options(synchronize_session=False)
+
+
+def transition_status(db: Session, model, key_column, keys: Iterable, new_status: str,
+                      expected_status: ExpectedStatus = None, returning=None,
+                      values: Optional[Dict[str, Any]] = None) -> List:
+    keys = list(keys)
+    if not keys:
+        return []
+    statement = status_transition_statement(model, key_column, keys, new_status, expected_status, returning, values)
+    return list(db.execute(statement).scalars())
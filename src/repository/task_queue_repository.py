@@ -0,0 +1,174 @@
+from datetime import timedelta
+from src.utils.database import get_engine
+from src.repository.models.work_task_model import WorkTaskModel
+from src.utils.logger import logger
+from sqlalchemy.orm import Session
+from sqlalchemy import select, update, insert, and_, or_, case, func
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+PENDING = "PENDING"
+RUNNING = "RUNNING"
+DONE = "DONE"
+FAILED = "FAILED"
+
+
+class ClaimedTask(NamedTuple):
+    id: int
+    kind: str
+    job_id: Optional[int]
+    payload: Dict[str, Any]
+    attempts: int
+
+
+def claim_statement(kinds: List[str], worker_id: str, lease_seconds: float, limit: int):
+    """UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED LIMIT n) RETURNING ...
+
+    Las tareas bloqueadas por otro worker se saltan en lugar de esperar, asi varios workers
+    reclaman tareas distintas sin coordinador. Una tarea RUNNING cuyo lease vencio (worker
+    caido) se puede volver a reclamar.
+    """
+    now = func.now()
+    candidates = (
+        select(WorkTaskModel.id)
+        .where(
+            WorkTaskModel.kind.in_(kinds),
+            WorkTaskModel.attempts < WorkTaskModel.max_attempts,
+            or_(
+                and_(WorkTaskModel.status == PENDING, WorkTaskModel.available_at <= now),
+                and_(WorkTaskModel.status == RUNNING, WorkTaskModel.lease_expires_at < now),
+            )
+        )
+        .order_by(WorkTaskModel.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return (
+        update(WorkTaskModel)
+        .where(WorkTaskModel.id.in_(candidates))
+        .values(
+            status=RUNNING,
+            lease_owner=worker_id,
+            lease_expires_at=now + timedelta(seconds=lease_seconds),
+            attempts=WorkTaskModel.attempts + 1,
+            updated_at=now
+        )
+        .returning(WorkTaskModel.id, WorkTaskModel.kind, WorkTaskModel.job_id,
+                   WorkTaskModel.payload, WorkTaskModel.attempts)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def expire_exhausted_statement(kinds: List[str]):
+    # Tareas de workers caidos que ya usaron todos sus intentos
+    return (
+        update(WorkTaskModel)
+        .where(
+            WorkTaskModel.kind.in_(kinds),
+            WorkTaskModel.status == RUNNING,
+            WorkTaskModel.lease_expires_at < func.now(),
+            WorkTaskModel.attempts >= WorkTaskModel.max_attempts
+        )
+        .values(status=FAILED, lease_owner=None, lease_expires_at=None,
+                last_error="Lease vencido sin intentos restantes", updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def owned_by(task_id: int, worker_id: str):
+    # Solo el worker que tiene el lease vigente puede renovarlo o cerrar la tarea
+    return and_(WorkTaskModel.id == task_id, WorkTaskModel.lease_owner == worker_id,
+                WorkTaskModel.status == RUNNING)
+
+
+class TaskQueueRepository:
+
+    def enqueue(self, kind: str, payloads: Iterable[Dict[str, Any]], max_attempts: int,
+                job_id: Optional[int] = None) -> List[int]:
+        rows = [
+            {"kind": kind, "job_id": job_id, "payload": payload, "status": PENDING, "attempts": 0,
+             "max_attempts": max_attempts}
+            for payload in payloads
+        ]
+        logger.debug(f"[Repository] Encolando {len(rows)} tareas {kind}")
+        if not rows:
+            return []
+        try:
+            with Session(get_engine()) as db:
+                statement = insert(WorkTaskModel).values(available_at=func.now(), created_at=func.now(),
+                                                         updated_at=func.now()).returning(WorkTaskModel.id)
+                task_ids = list(db.execute(statement, rows).scalars())
+                db.commit()
+            return task_ids
+        except Exception as e:
+            logger.error(f"[Repository] Error al encolar tareas {kind}: {e}")
+            raise
+
+    def claim(self, kinds: Iterable[str], worker_id: str, lease_seconds: float, limit: int = 1) -> List[ClaimedTask]:
+        kinds = list(kinds)
+        try:
+            with Session(get_engine()) as db:
+                db.execute(expire_exhausted_statement(kinds))
+                claimed = [ClaimedTask(*row) for row in db.execute(claim_statement(kinds, worker_id, lease_seconds, limit))]
+                db.commit()
+            if claimed:
+                logger.debug(f"[Repository] Worker {worker_id} reclamo las tareas {[task.id for task in claimed]}")
+            return claimed
+        except Exception as e:
+            logger.error(f"[Repository] Error al reclamar tareas: {e}")
+            return []
+
+    def heartbeat(self, task_id: int, worker_id: str, lease_seconds: float) -> bool:
+        """Extiende el lease; devuelve False si la tarea ya no pertenece al worker."""
+        try:
+            with Session(get_engine()) as db:
+                result = db.execute(
+                    update(WorkTaskModel)
+                    .where(owned_by(task_id, worker_id))
+                    .values(lease_expires_at=func.now() + timedelta(seconds=lease_seconds), updated_at=func.now())
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
+            return result.rowcount == 1
+        except Exception as e:
+            logger.error(f"[Repository] Error al renovar el lease de la tarea {task_id}: {e}")
+            return False
+
+    def complete(self, task_id: int, worker_id: str) -> bool:
+        try:
+            with Session(get_engine()) as db:
+                result = db.execute(
+                    update(WorkTaskModel)
+                    .where(owned_by(task_id, worker_id))
+                    .values(status=DONE, lease_owner=None, lease_expires_at=None, updated_at=func.now())
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
+            return result.rowcount == 1
+        except Exception as e:
+            logger.error(f"[Repository] Error al completar la tarea {task_id}: {e}")
+            return False
+
+    def fail(self, task_id: int, worker_id: str, error: str, retry_delay_seconds: float) -> Optional[str]:
+        """Libera la tarea para reintentarla despues de retry_delay_seconds, o la marca FAILED si no
+        quedan intentos. Devuelve el nuevo estado o None si la tarea ya no pertenece al worker."""
+        try:
+            with Session(get_engine()) as db:
+                status = db.execute(
+                    update(WorkTaskModel)
+                    .where(owned_by(task_id, worker_id))
+                    .values(
+                        status=case((WorkTaskModel.attempts >= WorkTaskModel.max_attempts, FAILED), else_=PENDING),
+                        available_at=func.now() + timedelta(seconds=retry_delay_seconds),
+                        lease_owner=None,
+                        lease_expires_at=None,
+                        last_error=error,
+                        updated_at=func.now()
+                    )
+                    .returning(WorkTaskModel.status)
+                    .execution_options(synchronize_session=False)
+                ).scalar()
+                db.commit()
+            return status
+        except Exception as e:
+            logger.error(f"[Repository] Error al liberar la tarea {task_id}: {e}")
+            return None
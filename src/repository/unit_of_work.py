@@ -0,0 +1,51 @@
+from src.utils.database import get_engine
+from src.repository.audio_repository import upsert_audios
+from src.utils.logger import logger
+from sqlalchemy.orm import Session
+from typing import List
+
+
+class UnitOfWork:
+    """Agrupa varias escrituras en una sola transaccion y una sola conexion.
+
+    Uso:
+        with UnitOfWork() as uow:
+            uow.add(batch)
+            uow.add_audios(rows)
+
+    Al salir sin errores se hace un unico commit; ante cualquier excepcion se hace rollback.
+    """
+
+    def __init__(self, flush_size: int = 500):
+        self.flush_size = flush_size
+        self.db = None
+
+    def __enter__(self) -> "UnitOfWork":
+        # expire_on_commit=False evita el refresh de cada objeto despues del commit
+        self.db = Session(get_engine(), expire_on_commit=False)
+        self.db.begin()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        try:
+            if exc_type is None:
+                self.db.commit()
+            else:
+                logger.error(f"[Unit of work] Rollback de la transaccion: {exc_value}")
+                self.db.rollback()
+        finally:
+            self.db.close()
+
+    def add(self, model):
+        # flush para obtener el id generado sin hacer commit
+        self.db.add(model)
+        self.db.flush()
+        return model
+
+    def add_audios(self, audios: List) -> List[int]:
+        # Las conversaciones que ya existen se ignoran (ON CONFLICT DO NOTHING sobre id_conversation, call_date); se devuelven los ids insertados
+        rows = [audio if isinstance(audio, dict) else audio.to_row() for audio in audios]
+        ids = []
+        for start in range(0, len(rows), self.flush_size):
+            ids.extend(upsert_audios(self.db, rows[start: start + self.flush_size]))
+        return ids
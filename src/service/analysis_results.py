@@ -0,0 +1,38 @@
+import csv
+import json
+from pathlib import Path
+from typing import Iterator, Optional
+from src.repository.audio_repository import AudioRepository
+from src.utils.logger import logger
+
+
+def read_analysis_results(path: str) -> Iterator[dict]:
+    """Lee un archivo de resultados por conversacion (.jsonl o .csv con cabecera) fila a fila."""
+    file_path = Path(path)
+    with open(file_path, newline="", encoding="utf-8") as file:
+        if file_path.suffix.lower() == ".csv":
+            for row in csv.DictReader(file):
+                # En el CSV una celda vacia significa que el resultado no trae ese campo
+                yield {key: (value if value != "" else None) for key, value in row.items()}
+        else:
+            for number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Linea {number} de {file_path.name} no es JSON valido: {e}") from e
+
+
+def load_analysis_results(path: str, status: str = "SUCCESS", audio_db: Optional[AudioRepository] = None) -> int:
+    audio_db = audio_db or AudioRepository()
+    logger.info(f"[Analysis results] Cargando resultados desde {path}")
+    return audio_db.apply_analysis_results(read_analysis_results(path), status=status)
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Uso: python -m src.service.analysis_results <archivo.jsonl|archivo.csv> [estado]
+    updated = load_analysis_results(sys.argv[1], *sys.argv[2:3])
+    logger.info(f"[Analysis results] {updated} audios actualizados")
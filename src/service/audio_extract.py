@@ -4,21 +4,58 @@ import pytz
 import requests
 import os
 import io
-from typing import List, Tuple, Dict
+import math
+from typing import Callable, List, Optional, Tuple, Dict
 from src.integrations.genesys_integration import GenesysIntegration
 from src.integrations.email_integration import EmailIntegration
-from PureCloudPlatformClientV2.models import ConversationQuery
-from PureCloudPlatformClientV2.rest import ApiException
+from src.integrations.genesys_async_jobs import ConversationDetailsJobExtractor, AsyncJobError
 from src.repository.models.batch_model import BatchModel
 from src.repository.batch_repository import BatchRepository
 from src.repository.models.job_model import JobModel
 from src.repository.job_repository import JobRepository
 from src.repository.models.audio_model import AudioModel
+from src.repository.models.conversation_record import ConversationRecord
 from src.repository.audio_repository import AudioRepository
+from src.repository.partition_repository import PartitionRepository
+from src.repository.checkpoint_repository import CheckpointRepository, SUBMITTING, SUBMITTED
+from src.repository.task_queue_repository import TaskQueueRepository
 from datetime import datetime, timedelta
 from src.utils.logger import logger
+from src.utils.lazy_import import lazy_import
+from src.utils.threads import execute_bounded
+from src.service.batch_pipeline import BatchPipeline
+from src.service.extraction_checkpoint import ExtractionCheckpoint
+from src.service.task_worker import TaskWorker
+from src.service.batch_status_poller import BatchStatusPoller, PENDING_GENESYS, PENDING_DOWNLOAD
+from src.integrations.recording_downloader import RecordingDownloader, DownloadItem
+from src.repository.recording_blob_repository import RecordingBlobRepository
+from src.utils.content_store import ContentStore
+from src.service.interval_sharding import plan_shards, split_interval, can_split, dedupe_conversations
 import src.utils.environment as env
 
+# El SDK de Genesys se importa en el primer uso; GenesysIntegration.authenticate ya lo carga
+sdk_models = lazy_import("PureCloudPlatformClientV2.models")
+sdk_rest = lazy_import("PureCloudPlatformClientV2.rest")
+# NumPy solo se carga en --extract-features y --trim-silences
+audio_features = lazy_import("src.service.audio_features")
+audio_trimming = lazy_import("src.service.audio_trimming")
+
+PageSink = Optional[Callable[[List[ConversationRecord]], None]]
+
+DOWNLOADED = "DOWNLOADED"
+
+# Extension de archivo segun el content_type de los resultados del batch download
+RECORDING_EXTENSIONS = {"audio/ogg": ".ogg", "audio/opus": ".opus", "audio/webm": ".webm",
+                        "audio/wav": ".wav", "audio/x-wav": ".wav", "audio/mpeg": ".mp3"}
+
+
+def recording_path(directory: str, result) -> str:
+    extension = RECORDING_EXTENSIONS.get((result.content_type or "").split(";")[0], "")
+    return os.path.join(directory, f"{result.conversation_id}_{result.recording_id}{extension}")
+
+# Tipo de tarea de la cola work_task: resolver grabaciones, enviar el batch a Genesys y registrarlo
+SUBMIT_BATCH_TASK = "SUBMIT_BATCH"
+
 class AudioExtractService:
     
     def __init__(self) -> None:
@@ -27,7 +64,15 @@ class AudioExtractService:
         self.batch_db = BatchRepository()
         self.job_db = JobRepository()
         self.audio_db = AudioRepository()
+        self.partition_db = PartitionRepository()
+        self.checkpoint_db = CheckpointRepository()
+        self.task_queue = TaskQueueRepository()
+        self.blob_db = RecordingBlobRepository()
         self.email_integration = EmailIntegration()
+        # Meses (anio, mes) cuyas particiones de audio ya se aseguraron en este proceso
+        self.partition_months = set()
+        # Worker de la cola en ejecucion (--worker); el handler consulta su lease antes de enviar
+        self.worker: Optional[TaskWorker] = None
 
     def execute(self) -> None:
         #Se considera zona horaria Lima
@@ -42,8 +87,65 @@ class AudioExtractService:
 
         start_date = yesterday.strftime("%Y-%m-%dT00:00:00")
         end_date = yesterday.strftime("%Y-%m-%dT23:59:59")
+
+        self.ensure_partitions(yesterday)
+
+        if env.GENESYS_PIPELINE_MODE:
+            self.execute_pipelined(start_date, end_date)
+            return
         
         conversations, job = self.get_audios_ids_by_date_range(start_date, end_date)
+        if conversations is None:
+            return
+        self.submit_conversations(conversations, job, start_date)
+
+    def ensure_partitions(self, day: datetime) -> None:
+        # La tabla audio esta particionada por mes de call_date; se crean por adelantado las que falten.
+        # Si falla, el error se propaga antes de enviar batches a Genesys
+        month = (day.year, day.month)
+        if month not in self.partition_months:
+            self.partition_db.ensure_audio_partitions(day, env.AUDIO_PARTITION_MONTHS_AHEAD)
+            self.partition_months.add(month)
+
+    def resume(self, job_id: int) -> None:
+        """Continua un job interrumpido desde su ultimo checkpoint."""
+        job = self.job_db.get(job_id)
+        checkpoint = ExtractionCheckpoint.load(self.checkpoint_db, job_id) if job else None
+        if checkpoint is None:
+            logger.error(f"[Audio extract] No existe checkpoint para el job {job_id}, no se puede reanudar")
+            return
+        if checkpoint.stage == SUBMITTED:
+            logger.info(f"[Audio extract] El job {job_id} ya envio todos sus batches, no hay nada que reanudar")
+            return
+
+        start_date = checkpoint.interval.split("/")[0]
+        self.ensure_partitions(datetime.strptime(start_date, "%Y-%m-%dT%H:%M:%S"))
+        if checkpoint.stage == SUBMITTING:
+            # La extraccion termino; solo falta enviar los batches que no llegaron a registrarse
+            conversations = checkpoint.conversations()
+        else:
+            logger.info(f"[Audio extract] Reanudando job {job_id}: {len(checkpoint.completed_shards)} shards y {checkpoint.last_page} paginas ya obtenidos")
+            try:
+                conversations = self.collect_conversations(checkpoint.interval, checkpoint=checkpoint)
+            except sdk_rest.ApiException as e:
+                self.collection_failed(job, e, resumable=True)
+                return
+            checkpoint.mark_stage(SUBMITTING)
+
+        logger.info(f"[Audio extract] Job {job_id} reanudado con {len(conversations)} conversaciones")
+        self.submit_conversations(conversations, job, start_date)
+
+    def collection_failed(self, job: JobModel, error: Exception, resumable: bool) -> None:
+        # Sin la lista completa no se envian batches ni el correo. Con checkpoint el job queda en
+        # PROCESSING para continuarlo con --resume; sin checkpoint no se puede retomar y pasa a ERROR
+        if resumable:
+            logger.error(f"[Audio extract] Error al obtener IDs de conversaciones del job {job.id}: {error}. "
+                         f"Continuar con --resume {job.id}")
+            return
+        logger.error(f"[Audio extract] Error al obtener IDs de conversaciones del job {job.id}: {error}. Job marcado como ERROR")
+        self.job_db.update_status(job.id, "ERROR")
+
+    def submit_conversations(self, conversations: List[ConversationRecord], job: JobModel, start_date: str) -> None:
         if len(conversations) == 0:
             # No hay conversaciones, actualizar job a SUCCESS y enviar notificación
             self.job_db.update_status(job.id, "SUCCESS")
@@ -52,14 +154,250 @@ class AudioExtractService:
             
         else:
             logger.info(f"[Audio extract] Se encontraron {len(conversations)} conversaciones para procesar")
-            self.genesys.init_batch_download(conversations, job, start_date)
+            if env.TASK_QUEUE_MODE:
+                self.enqueue_batches(conversations, job, start_date)
+            else:
+                # Los batches ya registrados en un intento anterior se omiten en init_batch_download
+                self.genesys.init_batch_download(conversations, job, start_date)
+
+        if env.JOB_CHECKPOINTS:
+            # Solo si la extraccion termino; un checkpoint aun en COLLECTING queda para --resume
+            self.checkpoint_db.mark_stage(job.id, SUBMITTED, expected_stage=SUBMITTING)
 
     
-    def get_audios_ids_by_date_range(self, start_date: str, end_date: str) -> Tuple[List[str], JobModel]:
+    def enqueue_batches(self, conversations: List[ConversationRecord], job: JobModel, start_date: str) -> List[int]:
+        conversations = self.genesys.exclude_known_conversations(conversations)
+        batch_size = env.BATCH_SIZE
+        payloads = [
+            {
+                "job_id": job.id,
+                "start_date": start_date,
+                "conversations": [c.to_payload() for c in conversations[i: i + batch_size]]
+            }
+            for i in range(0, len(conversations), batch_size)
+        ]
+        task_ids = self.task_queue.enqueue(SUBMIT_BATCH_TASK, payloads, env.TASK_MAX_ATTEMPTS, job_id=job.id)
+        logger.info(f"[Audio extract] Se encolaron {len(task_ids)} batches del job {job.id} para los workers")
+        return task_ids
+
+    def run_worker(self) -> int:
+        worker = self.worker = TaskWorker(
+            self.task_queue,
+            {SUBMIT_BATCH_TASK: self.handle_submit_batch},
+            lease_seconds=env.TASK_LEASE_SECONDS,
+            heartbeat_seconds=env.TASK_HEARTBEAT_SECONDS,
+            retry_delay_seconds=env.TASK_RETRY_DELAY_SECONDS,
+            poll_seconds=env.TASK_POLL_SECONDS
+        )
+        return worker.run(env.TASK_WORKER_MAX_IDLE_POLLS)
+
+    def handle_submit_batch(self, payload: Dict) -> None:
+        self.ensure_partitions(datetime.strptime(payload["start_date"], "%Y-%m-%dT%H:%M:%S"))
+        conversations = [ConversationRecord.from_payload(c) for c in payload["conversations"]]
+        # Si un intento anterior alcanzo a registrar el batch, sus conversaciones ya estan en audio
+        conversations = self.genesys.exclude_known_conversations(conversations)
+        if not conversations:
+            logger.info("[Audio extract] Las conversaciones de la tarea ya estaban registradas")
+            return
+        # Los errores de Genesys o del registro se propagan para que la tarea se reintente; si otro
+        # worker tomo la tarea (lease perdido) el batch no se envia
+        before_submit = self.worker.check_lease if self.worker else None
+        batch = self.genesys.submit_batch(conversations, JobModel(id=payload["job_id"]), payload["start_date"],
+                                          before_submit=before_submit)
+        if batch is None:
+            logger.info("[Audio extract] Las conversaciones de la tarea no tienen grabaciones descargables")
+
+    def poll_batches(self) -> Dict[str, List[int]]:
+        poller = BatchStatusPoller(
+            self.genesys.recording_api,
+            self.batch_db,
+            min_delay=env.GENESYS_BATCH_POLL_MIN_SECONDS,
+            max_delay=env.GENESYS_BATCH_POLL_MAX_SECONDS,
+            age_scale=env.GENESYS_BATCH_POLL_AGE_SCALE_SECONDS,
+            max_age=env.GENESYS_BATCH_MAX_AGE_HOURS * 3600,
+            workers=env.GENESYS_BATCH_POLL_WORKERS
+        )
+        poller.track(self.batch_db.get_by_status(PENDING_GENESYS))
+        return poller.run()
+
+    def download_batches(self) -> List[int]:
+        """Descarga las grabaciones de todos los batches en PENDING DOWNLOAD al almacen local y las
+        registra en recording_blob; devuelve los batches completos."""
+        batches = self.batch_db.get_by_status(PENDING_DOWNLOAD)
+        store = ContentStore(env.AUDIO_STORE_DIR, env.DOWNLOAD_CHUNK_BYTES)
+
+        # Las URLs de resultado vencen, asi que se piden recien al descargar
+        results_by_batch: Dict[int, list] = {}
+        for batch in batches:
+            try:
+                status = self.genesys.recording_api.get_recording_batchrequest(batch.genesys_batch_id)
+            except sdk_rest.ApiException as e:
+                logger.error(f"[Audio extract] Error al obtener los resultados del batch {batch.genesys_batch_id}: {e}")
+                continue
+            results_by_batch[batch.id] = [result for result in status.results or [] if result.result_url]
+
+        # Las grabaciones que ya estan en el almacen de este nodo no se vuelven a descargar
+        known = self.blob_db.get_by_recording_ids(
+            result.recording_id for results in results_by_batch.values() for result in results
+        )
+        items = []
+        pending = {}
+        for batch_id, results in results_by_batch.items():
+            for result in results:
+                sha256 = known.get(result.recording_id)
+                if sha256 and store.contains(sha256):
+                    continue
+                item = DownloadItem(result.result_url, recording_path(store.incoming_dir, result))
+                items.append(item)
+                pending[item.path] = (batch_id, result)
+
+        # Un solo pool para todas las grabaciones, sin esperar a que termine cada batch
+        downloader = RecordingDownloader(env.DOWNLOAD_WORKERS, env.DOWNLOAD_CHUNK_BYTES, env.DOWNLOAD_TIMEOUT_SECONDS)
+        failed_batches = set()
+        rows = []
+        deduplicated = 0
+        for task in downloader.download_all(items):
+            batch_id, result = pending[task.item.path]
+            if not task.ok:
+                logger.warning(f"[Audio extract] No se pudo descargar {task.item.path}: {task.error}")
+                failed_batches.add(batch_id)
+                continue
+            blob = store.put_file(task.value.path, task.value.sha256)
+            deduplicated += blob.deduplicated
+            rows.append({"id_conversation": result.conversation_id, "recording_id": result.recording_id,
+                         "sha256": blob.sha256, "size": blob.size, "content_type": result.content_type})
+        self.blob_db.upsert(rows)
+
+        completed = [batch_id for batch_id in results_by_batch if batch_id not in failed_batches]
+        updated = self.batch_db.transition_status_by_id(completed, DOWNLOADED, expected_status=PENDING_DOWNLOAD)
+        logger.info(f"[Audio extract] {len(rows)} grabaciones descargadas ({deduplicated} con contenido repetido); {len(updated)} batches completos")
+
+        evicted = store.evict(env.AUDIO_STORE_RETENTION_HOURS * 3600, env.AUDIO_STORE_MAX_BYTES)
+        if evicted:
+            logger.info(f"[Audio extract] {len(evicted)} blobs eliminados del almacen local")
+            # Un recorte eliminado deja de estar disponible; su blob original vuelve a quedar pendiente de recortar
+            cleared = self.blob_db.clear_trim(evicted)
+            if cleared:
+                logger.info(f"[Audio extract] {cleared} grabaciones sin su version recortada, quedan pendientes de recortar")
+            # Sin el blob no se pueden calcular las caracteristicas; esos batches se vuelven a descargar
+            requeued = self.batch_db.transition_status_by_id(
+                self.audio_db.get_batches_pending_features(evicted, DOWNLOADED),
+                PENDING_DOWNLOAD, expected_status=DOWNLOADED
+            )
+            if requeued:
+                logger.info(f"[Audio extract] {len(requeued)} batches con caracteristicas pendientes vuelven a {PENDING_DOWNLOAD}")
+        purged = store.purge_incoming(env.AUDIO_STORE_INCOMING_MAX_HOURS * 3600)
+        if purged:
+            logger.info(f"[Audio extract] {len(purged)} archivos abandonados eliminados de incoming/")
+        return updated
+
+    def extract_features(self) -> int:
+        """Calcula duracion, silencio, volumen, clipping y tiempo de habla por canal de las grabaciones
+        de los batches DOWNLOADED y los guarda en audio; devuelve la cantidad de audios actualizados."""
+        store = ContentStore(env.AUDIO_STORE_DIR)
+        params = audio_features.FeatureParams(env.AUDIO_FEATURE_FRAME_MS, env.AUDIO_SILENCE_DBFS, env.AUDIO_CLIP_LEVEL)
+        updated = 0
+        after = None
+        with audio_features.AudioFeatureExtractor(store.root, params, workers=env.AUDIO_FEATURE_WORKERS or None) as extractor:
+            while True:
+                ids_conversation = self.audio_db.get_pending_features(DOWNLOADED, env.AUDIO_FEATURE_BATCH_SIZE, after)
+                if not ids_conversation:
+                    break
+                after = ids_conversation[-1]
+
+                # Solo las conversaciones con todas sus grabaciones en este nodo; el resto queda pendiente
+                recordings = {
+                    id_conversation: blobs
+                    for id_conversation, blobs in self.blob_db.get_by_conversations(ids_conversation).items()
+                    if all(store.contains(sha256) for sha256 in blobs)
+                }
+                rows = []
+                for result in extractor.extract_all(recordings):
+                    if result.ok:
+                        rows.append(result.value.to_row())
+                    elif isinstance(result.error, audio_features.AudioFeatureError):
+                        # Grabacion que no se puede decodificar: se registra para no volver a intentarla
+                        logger.warning(f"[Audio extract] Sin caracteristicas para {result.item}: {result.error}")
+                        rows.append({"id_conversation": result.item, "features_error": str(result.error)})
+                    else:
+                        logger.error(f"[Audio extract] Error al calcular las caracteristicas de {result.item}: {result.error}")
+                if rows:
+                    updated += self.audio_db.apply_features(rows)
+
+        logger.info(f"[Audio extract] {updated} audios con caracteristicas de audio calculadas")
+        return updated
+
+    def trim_silences(self) -> int:
+        """Genera la version sin silencios largos de cada blob del almacen local y registra el mapa de
+        tiempos y los bytes ahorrados; devuelve la cantidad de blobs recortados."""
+        store = ContentStore(env.AUDIO_STORE_DIR)
+        params = audio_trimming.TrimParams(env.AUDIO_FEATURE_FRAME_MS, env.TRIM_SILENCE_DBFS,
+                                           env.TRIM_MIN_SILENCE_MS, env.TRIM_PADDING_MS)
+        trimmed = bytes_saved = 0
+        after = None
+        with audio_trimming.AudioTrimmer(store.root, params, workers=env.AUDIO_FEATURE_WORKERS or None) as trimmer:
+            while True:
+                blobs = self.blob_db.get_pending_trim(env.AUDIO_FEATURE_BATCH_SIZE, after)
+                if not blobs:
+                    break
+                after = blobs[-1]
+
+                rows = []
+                # Los blobs que no estan en este nodo quedan para el nodo que los tenga
+                for result in trimmer.trim_all([sha256 for sha256 in blobs if store.contains(sha256)]):
+                    if result.ok:
+                        rows.append(result.value.to_row())
+                        bytes_saved += result.value.bytes_saved
+                    elif isinstance(result.error, audio_features.AudioFeatureError):
+                        logger.warning(f"[Audio extract] No se pudo recortar el blob {result.item}: {result.error}")
+                        rows.append({"sha256": result.item, "trim_error": str(result.error)})
+                    else:
+                        logger.error(f"[Audio extract] Error al recortar el blob {result.item}: {result.error}")
+                self.blob_db.apply_trim(rows)
+                trimmed += sum(1 for row in rows if row.get("trimmed_sha256"))
+
+        logger.info(f"[Audio extract] {trimmed} blobs recortados; {bytes_saved} bytes de silencio eliminados")
+        return trimmed
+
+    def execute_pipelined(self, start_date: str, end_date: str) -> None:
         interval = f"{start_date}/{end_date}"
-        page_number = 1
-        page_size = env.BATCH_SIZE
+        job = self.create_job()
+
+        # Cada pagina filtrada pasa al pipeline, que envia batches mientras se siguen consultando paginas
+        pipeline = BatchPipeline(
+            lambda batch: self.genesys.submit_batch(batch, job, start_date),
+            batch_size=env.BATCH_SIZE,
+            queue_size=env.GENESYS_PIPELINE_QUEUE_SIZE,
+            exclude_known=self.genesys.exclude_known_conversations
+        )
+        pipeline.start()
+        collection_error = None
+        try:
+            self.collect_conversations(interval, sink=pipeline.put)
+        except Exception as e:
+            # Incluye el error de put() cuando el consumidor ya fallo; close() informa la causa
+            collection_error = e
+
+        try:
+            pipeline.close()
+        except Exception as e:
+            logger.error(f"[Audio extract] Error al enviar los batches del job {job.id}: {e}. Job marcado como ERROR")
+            self.job_db.update_status(job.id, "ERROR")
+            return
+        if collection_error is not None:
+            logger.error(f"[Audio extract] Error al obtener IDs de conversaciones del job {job.id}: {collection_error}. "
+                         f"Job marcado como ERROR tras enviar {pipeline.total} conversaciones")
+            self.job_db.update_status(job.id, "ERROR")
+            return
+
+        if pipeline.total == 0:
+            self.job_db.update_status(job.id, "SUCCESS")
+            logger.info(f"[Audio extract] No se encontraron conversaciones para procesar. Job {job.id} marcado como SUCCESS")
+            self.email_integration.send_email()
+        else:
+            logger.info(f"[Audio extract] Se enviaron {pipeline.total} conversaciones en {pipeline.batches} batches")
 
+    def create_job(self) -> JobModel:
         #Se considera zona horaria Lima y fecha actual
         lima_time_zone = pytz.timezone("America/Lima")
         today = datetime.now(lima_time_zone)
@@ -68,78 +406,261 @@ class AudioExtractService:
             creation_date=today,
             status='PROCESSING'
         )
-        job = self.job_db.insert(job)
-        filtered_conversations = []            
-        while True:
-            query = ConversationQuery()
-            query.interval = interval
-            query.paging = {"pageNumber": page_number, "pageSize": page_size}
-            query.order = "asc"
-            query.order_by = "conversationStart"
-            query.segment_filters = [{
-                "type": "and",
-                "predicates": [
-                    {
-                        "type": "dimension",
-                        "dimension": "queueId",
-                        "operator": "matches",
-                        "value": env.GENESYS_QUEUE_ID
-                    }
-                ]
-            }]
+        return self.job_db.insert(job)
 
-            try:
-                response = self.genesys.analytics_api.post_analytics_conversations_details_query(query)
-                if not response.conversations:
-                    break
-                #Si quieres revisar que campos vienen de genesys, descomenta el siguiente bloque
-                '''
-                for resp in response.conversations:
-                    with open('conversation_response_test.txt', 'a') as f:
-                        f.write(f"\n\nConversation ID: {resp.conversation_id}\n")
-                        f.write(str(resp))
-                        f.write("\n" + "="*50 + "\n")
-                '''
-                # Filtrar conversaciones que tengan al menos un participante "agent" 
-                for conv in response.conversations:
-                    has_agent = False
-                    if conv.participants:
-                        for participant in conv.participants:
-                            if participant.purpose == "agent":
-                                has_agent = True
-                                break
-                    
-                    if has_agent:
-                        #Atributos que se extraen de Genesys
-                        duration_milliseconds = self.genesys.get_call_duration(conv)
-                        call_date = getattr(conv, 'conversation_start', None)
-
-                        audio = AudioModel(
-                            id_conversation=conv.conversation_id,
-                            status='PENDING',
-                            creation_date=datetime.now(),
-                            call_date=call_date,
-                            call_duration=duration_milliseconds
-                        )
-                        filtered_conversations.append(audio)
-                        
-                        
-                        logger.info(f"[Audio extract] Conversacion {conv.conversation_id} incluida (tiene Agent)")
-                    else:
-                        logger.info(f"[Audio extract] Conversacion {conv.conversation_id} excluida (no tiene Agent)")     
-                
-                logger.info(f"[Audio extract] Pagina {page_number}: {len(filtered_conversations)} conversaciones con Agent de {len(response.conversations)} totales")
-                
-                if len(response.conversations) < page_size:
-                    break
-                
-                page_number += 1  
+    def get_audios_ids_by_date_range(self, start_date: str, end_date: str) -> Tuple[Optional[List[ConversationRecord]], JobModel]:
+        """Crea el job y obtiene sus conversaciones; si la consulta a Genesys falla devuelve None."""
+        interval = f"{start_date}/{end_date}"
+        job = self.create_job()
+        checkpoint = ExtractionCheckpoint.start(self.checkpoint_db, job.id, interval) if env.JOB_CHECKPOINTS else None
+
+        try:
+            filtered_conversations = self.collect_conversations(interval, checkpoint=checkpoint)
+        except sdk_rest.ApiException as e:
+            self.collection_failed(job, e, resumable=checkpoint is not None)
+            return None, job
 
-            except ApiException as e:
-                logger.error(f"[Audio extract] Error al obtener IDs de conversaciones: {e}")
-                return [], job
+        if checkpoint:
+            checkpoint.mark_stage(SUBMITTING)
 
         logger.info(f"[Audio extract] Total de conversaciones con 'agent' obtenidas: {len(filtered_conversations)}")
         return filtered_conversations, job
 
-    
\ No newline at end of file
+    # Todos los collect_* aceptan un sink opcional: si se indica, cada pagina filtrada se
+    # entrega al sink apenas llega y no se acumula (se devuelve una lista vacia).
+    # Con checkpoint cada shard o pagina se guarda al obtenerse y al reanudar se omite lo ya guardado;
+    # el resultado se lee del checkpoint porque incluye lo obtenido en ejecuciones anteriores.
+    def collect_conversations(self, interval: str, sink: PageSink = None,
+                              checkpoint: Optional[ExtractionCheckpoint] = None) -> List[ConversationRecord]:
+        if checkpoint is None:
+            return self.collect_from_genesys(interval, sink)
+        if not checkpoint.shard_done(interval):
+            self.collect_from_genesys(interval, checkpoint=checkpoint)
+        return checkpoint.conversations()
+
+    def collect_from_genesys(self, interval: str, sink: PageSink = None,
+                             checkpoint: Optional[ExtractionCheckpoint] = None) -> List[ConversationRecord]:
+        page_size = env.BATCH_SIZE
+        first_page = None
+
+        # Con muchas conversaciones se usa un job asincrono en lugar de paginar la consulta sincrona
+        threshold = env.GENESYS_ASYNC_JOBS_THRESHOLD
+        if threshold:
+            first_page = self.query_conversations_page(interval, 1, page_size)
+            if (first_page.total_hits or 0) > threshold:
+                logger.info(f"[Audio extract] {first_page.total_hits} conversaciones superan el umbral {threshold}, se usa job asincrono")
+                try:
+                    conversations = self.collect_async_job(interval, sink)
+                    if checkpoint:
+                        # El job asincrono no se puede retomar a medias; se guarda completo
+                        checkpoint.record_shard(interval, conversations)
+                    return conversations
+                except AsyncJobError as e:
+                    logger.warning(f"[Audio extract] Fallo el job asincrono, se continua con la consulta sincrona: {e}")
+
+        if env.GENESYS_SHARD_MINUTES:
+            return self.collect_sharded(interval, sink, checkpoint)
+
+        if first_page is None:
+            first_page = self.query_conversations_page(interval, 1, page_size)
+        return self.collect_pages(interval, first_page, page_size, sink, checkpoint)
+
+    def collect_async_job(self, interval: str, sink: PageSink = None) -> List[ConversationRecord]:
+        extractor = ConversationDetailsJobExtractor(
+            self.genesys.analytics_api,
+            poll_interval=env.GENESYS_ASYNC_JOBS_POLL_SECONDS,
+            max_poll_interval=env.GENESYS_ASYNC_JOBS_MAX_POLL_SECONDS,
+            timeout=env.GENESYS_ASYNC_JOBS_TIMEOUT,
+            page_size=env.GENESYS_ASYNC_JOBS_PAGE_SIZE
+        )
+
+        filtered_conversations = []
+        for conversations in extractor.extract(interval, self.build_segment_filters()):
+            page_conversations = self.filter_agent_conversations(conversations)
+            if sink:
+                sink(page_conversations)
+            else:
+                filtered_conversations.extend(page_conversations)
+
+        filtered_conversations.sort(key=lambda audio: (audio.call_date is None, audio.call_date or datetime.min))
+        return filtered_conversations
+
+    def collect_sharded(self, interval: str, sink: PageSink = None,
+                        checkpoint: Optional[ExtractionCheckpoint] = None) -> List[ConversationRecord]:
+        shards = plan_shards(interval, env.GENESYS_SHARD_MINUTES)
+        logger.info(f"[Audio extract] Intervalo {interval} dividido en {len(shards)} shards")
+
+        if checkpoint:
+            pending_shards = [shard for shard in shards if not checkpoint.shard_done(shard)]
+            logger.info(f"[Audio extract] {len(shards) - len(pending_shards)} shards ya obtenidos segun el checkpoint")
+            shards = pending_shards
+
+        def collect_and_record(shard):
+            conversations = self.collect_shard(shard, sink)
+            if checkpoint:
+                checkpoint.record_shard(shard, conversations)
+            return conversations
+
+        results = execute_bounded(collect_and_record, shards,
+                                  max_workers=env.GENESYS_SHARD_WORKERS)
+
+        filtered_conversations = []
+        for result in results:
+            if not result.ok:
+                raise result.error
+            filtered_conversations.extend(result.value)
+
+        if sink:
+            # Con sink los duplicados entre shards los descarta el consumidor
+            return []
+
+        # Una conversacion que cruza el limite entre shards aparece en ambos
+        unique_conversations = dedupe_conversations(filtered_conversations)
+        logger.info(f"[Audio extract] {len(filtered_conversations) - len(unique_conversations)} conversaciones duplicadas entre shards")
+        return unique_conversations
+
+    def collect_shard(self, interval: str, sink: PageSink = None) -> List[ConversationRecord]:
+        page_size = env.BATCH_SIZE
+        first_page = self.query_conversations_page(interval, 1, page_size)
+
+        # Si el shard tiene demasiadas conversaciones se divide en dos para evitar paginacion profunda
+        max_hits = env.GENESYS_SHARD_MAX_HITS
+        if max_hits and (first_page.total_hits or 0) > max_hits and can_split(interval, env.GENESYS_SHARD_MIN_MINUTES):
+            logger.info(f"[Audio extract] Shard {interval} con {first_page.total_hits} conversaciones, se divide")
+            filtered_conversations = []
+            for sub_interval in split_interval(interval):
+                filtered_conversations.extend(self.collect_shard(sub_interval, sink))
+            return filtered_conversations
+
+        return self.collect_pages(interval, first_page, page_size, sink)
+
+    def collect_pages(self, interval: str, first_page, page_size: int, sink: PageSink = None,
+                      checkpoint: Optional[ExtractionCheckpoint] = None) -> List[ConversationRecord]:
+        if env.GENESYS_PARALLEL_PAGING:
+            conversations = self.collect_pages_parallel(interval, first_page, page_size, sink)
+            if checkpoint:
+                # Las paginas en paralelo terminan en cualquier orden; se guarda el intervalo completo
+                checkpoint.record_shard(interval, conversations)
+            return conversations
+        return self.collect_pages_sequential(interval, first_page, page_size, sink, checkpoint)
+
+    def collect_pages_sequential(self, interval: str, first_page, page_size: int, sink: PageSink = None,
+                                 checkpoint: Optional[ExtractionCheckpoint] = None) -> List[ConversationRecord]:
+        filtered_conversations = []
+        page_number = 1
+        response = first_page
+        if checkpoint and checkpoint.last_page:
+            # Se continua despues de la ultima pagina guardada
+            page_number = checkpoint.last_page + 1
+            response = self.query_conversations_page(interval, page_number, page_size)
+        while True:
+            if not response.conversations:
+                break
+            #Si quieres revisar que campos vienen de genesys, descomenta el siguiente bloque
+            '''
+            for resp in response.conversations:
+                with open('conversation_response_test.txt', 'a') as f:
+                    f.write(f"\n\nConversation ID: {resp.conversation_id}\n")
+                    f.write(str(resp))
+                    f.write("\n" + "="*50 + "\n")
+            '''
+            page_conversations = self.filter_agent_conversations(response.conversations)
+            if sink:
+                sink(page_conversations)
+            else:
+                filtered_conversations.extend(page_conversations)
+            if checkpoint:
+                checkpoint.record_page(page_number, page_conversations)
+            
+            logger.info(f"[Audio extract] Pagina {page_number}: {len(page_conversations)} conversaciones con Agent de {len(response.conversations)} totales")
+            
+            if len(response.conversations) < page_size:
+                break
+            
+            page_number += 1  
+            response = self.query_conversations_page(interval, page_number, page_size)
+
+        return filtered_conversations
+
+    def collect_pages_parallel(self, interval: str, first_page, page_size: int, sink: PageSink = None) -> List[ConversationRecord]:
+        if not first_page.conversations:
+            return []
+
+        total_hits = first_page.total_hits or len(first_page.conversations)
+        total_pages = math.ceil(total_hits / page_size)
+        logger.info(f"[Audio extract] {total_hits} conversaciones en {total_pages} paginas, consulta en paralelo")
+
+        def fetch_and_filter(page_number):
+            response = first_page if page_number == 1 else self.query_conversations_page(interval, page_number, page_size)
+            if not response.conversations:
+                return []
+            page_conversations = self.filter_agent_conversations(response.conversations)
+            logger.info(f"[Audio extract] Pagina {page_number}: {len(page_conversations)} conversaciones con Agent de {len(response.conversations)} totales")
+            if sink:
+                sink(page_conversations)
+                return []
+            return page_conversations
+
+        results = execute_bounded(fetch_and_filter, range(1, total_pages + 1), max_workers=env.GENESYS_PAGE_WORKERS)
+
+        filtered_conversations = []
+        for result in results:
+            if not result.ok:
+                raise result.error
+            filtered_conversations.extend(result.value)
+
+        # Las paginas ya vienen ordenadas, pero se asegura el orden por conversationStart al unirlas
+        filtered_conversations.sort(key=lambda audio: (audio.call_date is None, audio.call_date or datetime.min))
+        return filtered_conversations
+
+    def query_conversations_page(self, interval: str, page_number: int, page_size: int):
+        query = sdk_models.ConversationQuery()
+        query.interval = interval
+        query.paging = {"pageNumber": page_number, "pageSize": page_size}
+        query.order = "asc"
+        query.order_by = "conversationStart"
+        query.segment_filters = self.build_segment_filters()
+        return self.genesys.analytics_api.post_analytics_conversations_details_query(query)
+
+    def build_segment_filters(self) -> list:
+        return [{
+            "type": "and",
+            "predicates": [
+                {
+                    "type": "dimension",
+                    "dimension": "queueId",
+                    "operator": "matches",
+                    "value": env.GENESYS_QUEUE_ID
+                }
+            ]
+        }]
+
+    def filter_agent_conversations(self, conversations) -> List[ConversationRecord]:
+        filtered_conversations = []
+        # Filtrar conversaciones que tengan al menos un participante "agent" 
+        for conv in conversations:
+            has_agent = False
+            if conv.participants:
+                for participant in conv.participants:
+                    if participant.purpose == "agent":
+                        has_agent = True
+                        break
+            
+            if has_agent:
+                #Atributos que se extraen de Genesys
+                duration_milliseconds = self.genesys.get_call_duration(conv)
+                call_date = getattr(conv, 'conversation_start', None)
+
+                # Se guarda un registro compacto; el AudioModel se crea recien al insertar
+                audio = ConversationRecord(
+                    id_conversation=conv.conversation_id,
+                    call_date=call_date,
+                    call_duration=duration_milliseconds
+                )
+                filtered_conversations.append(audio)
+                
+                logger.info(f"[Audio extract] Conversacion {conv.conversation_id} incluida (tiene Agent)")
+            else:
+                logger.info(f"[Audio extract] Conversacion {conv.conversation_id} excluida (no tiene Agent)")     
+
+        return filtered_conversations
@@ -0,0 +1,297 @@
+import json
+import math
+import struct
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import zip_longest
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+import numpy as np
+from src.utils.content_store import ContentStore
+from src.utils.threads import TaskResult
+
+# Codigos de formato del chunk "fmt " de un WAV
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_ALAW = 0x0006
+WAVE_FORMAT_MULAW = 0x0007
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# Piso de rms_dbfs para audio en silencio digital (log10(0) = -inf)
+MIN_DBFS = -120.0
+
+# Frames de analisis que se convierten a float por bloque: acota la memoria en llamadas largas
+BLOCK_FRAMES = 2048
+
+
+class AudioFeatureError(Exception):
+    pass
+
+
+def mulaw_table() -> np.ndarray:
+    # G.711 mu-law: 256 valores posibles, se decodifica con una tabla indexada por byte
+    u = ~np.arange(256, dtype=np.int32) & 0xFF
+    exponent = (u >> 4) & 0x07
+    magnitude = ((((u & 0x0F) << 3) + 0x84) << exponent) - 0x84
+    return np.where(u & 0x80, -magnitude, magnitude).astype(np.float32) / 32124.0
+
+
+def alaw_table() -> np.ndarray:
+    a = np.arange(256, dtype=np.int32) ^ 0x55
+    exponent = (a >> 4) & 0x07
+    mantissa = (a & 0x0F) << 4
+    magnitude = np.where(exponent == 0, mantissa + 8, (mantissa + 0x108) << np.maximum(exponent - 1, 0))
+    return np.where(a & 0x80, magnitude, -magnitude).astype(np.float32) / 32256.0
+
+
+G711_TABLES = {WAVE_FORMAT_MULAW: mulaw_table(), WAVE_FORMAT_ALAW: alaw_table()}
+
+
+class PcmAudio(NamedTuple):
+    """Muestras de un WAV sin copiar: samples es una vista (frames, canales) sobre el buffer."""
+    samples: np.ndarray
+    sample_rate: int
+    audio_format: int
+    bits: int
+
+    @property
+    def channels(self) -> int:
+        return self.samples.shape[1]
+
+    def to_float(self, start: int, stop: int) -> np.ndarray:
+        """Convierte las muestras [start, stop) a float32 en [-1, 1]."""
+        block = self.samples[start:stop]
+        if self.audio_format in G711_TABLES:
+            return G711_TABLES[self.audio_format][block]
+        if self.audio_format == WAVE_FORMAT_IEEE_FLOAT:
+            return block.astype(np.float32, copy=False)
+        if self.bits == 8:
+            # PCM de 8 bits es sin signo, centrado en 128
+            return (block.astype(np.float32) - 128.0) / 128.0
+        if self.bits == 24:
+            # (frames, canales, 3) bytes little-endian -> entero con signo de 24 bits
+            values = block[..., 0].astype(np.int32) | (block[..., 1].astype(np.int32) << 8) \
+                | (block[..., 2].astype(np.int8).astype(np.int32) << 16)
+            return values.astype(np.float32) / float(1 << 23)
+        return block.astype(np.float32) / float(1 << (self.bits - 1))
+
+
+def sample_dtype(audio_format: int, bits: int) -> Tuple[np.dtype, int]:
+    # dtype de cada muestra y bytes que ocupa; 24 bits se lee como 3 uint8
+    if audio_format in G711_TABLES and bits == 8:
+        return np.dtype(np.uint8), 1
+    if audio_format == WAVE_FORMAT_IEEE_FLOAT and bits in (32, 64):
+        return np.dtype(f"<f{bits // 8}"), bits // 8
+    if audio_format == WAVE_FORMAT_PCM:
+        if bits == 8:
+            return np.dtype(np.uint8), 1
+        if bits in (16, 32):
+            return np.dtype(f"<i{bits // 8}"), bits // 8
+        if bits == 24:
+            return np.dtype(np.uint8), 3
+    raise AudioFeatureError(f"Formato WAV no soportado: {audio_format:#06x} de {bits} bits")
+
+
+def decode_wav(data) -> PcmAudio:
+    """Lee los chunks fmt y data de un WAV (bytes o mmap) y devuelve sus muestras sin copiarlas."""
+    if len(data) < 12 or data[0:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise AudioFeatureError("El archivo no es un WAV (RIFF/WAVE)")
+
+    fmt = None
+    offset = 12
+    while offset + 8 <= len(data):
+        chunk_id = data[offset:offset + 4]
+        chunk_size, = struct.unpack_from("<I", data, offset + 4)
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            audio_format, channels, sample_rate, _, _, bits = struct.unpack_from("<HHIIHH", data, body)
+            if audio_format == WAVE_FORMAT_EXTENSIBLE and chunk_size >= 26:
+                # Los dos primeros bytes del GUID de subformato son el codigo de formato real
+                audio_format, = struct.unpack_from("<H", data, body + 24)
+            fmt = (audio_format, channels, sample_rate, bits)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise AudioFeatureError("El chunk data aparece antes que fmt")
+            audio_format, channels, sample_rate, bits = fmt
+            if not channels or not sample_rate:
+                raise AudioFeatureError("WAV sin canales o sin frecuencia de muestreo")
+            dtype, width = sample_dtype(audio_format, bits)
+            # Un WAV escrito en streaming puede declarar un tamano mayor al real
+            size = min(chunk_size, len(data) - body)
+            frames = size // (width * channels)
+            count = frames * channels * (width // dtype.itemsize)
+            samples = np.frombuffer(data, dtype=dtype, count=count, offset=body)
+            shape = (frames, channels, 3) if bits == 24 and audio_format == WAVE_FORMAT_PCM else (frames, channels)
+            return PcmAudio(samples.reshape(shape), sample_rate, audio_format, bits)
+        # Los chunks de tamano impar llevan un byte de relleno
+        offset = body + chunk_size + (chunk_size & 1)
+    raise AudioFeatureError("WAV sin chunk data")
+
+
+class FeatureParams(NamedTuple):
+    frame_ms: float = 20
+    silence_dbfs: float = -45.0
+    clip_level: float = 0.999
+
+
+class AudioStats(NamedTuple):
+    """Acumulados de una o varias grabaciones; se suman para obtener los de la conversacion."""
+    duration_ms: float = 0.0
+    samples: int = 0
+    sum_squares: float = 0.0
+    clipped: int = 0
+    frames: int = 0
+    silent_frames: int = 0
+    talk_ms: Tuple[float, ...] = ()
+
+    def merge(self, other: "AudioStats") -> "AudioStats":
+        talk_ms = tuple(a + b for a, b in zip_longest(self.talk_ms, other.talk_ms, fillvalue=0.0))
+        return AudioStats(self.duration_ms + other.duration_ms, self.samples + other.samples,
+                          self.sum_squares + other.sum_squares, self.clipped + other.clipped,
+                          self.frames + other.frames, self.silent_frames + other.silent_frames, talk_ms)
+
+
+def frame_length(audio: PcmAudio, frame_ms: float) -> int:
+    return max(1, round(audio.sample_rate * frame_ms / 1000))
+
+
+def dbfs_to_energy(dbfs: float) -> float:
+    # Umbral sobre la energia media de un frame (rms^2)
+    return 10 ** (dbfs / 10)
+
+
+def iter_blocks(audio: PcmAudio, frame_len: int) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Recorre el audio por bloques de BLOCK_FRAMES frames y devuelve (muestras float, cuadrados,
+    energia media por frame y canal). El ultimo frame incompleto no tiene fila de energia."""
+    block_len = frame_len * BLOCK_FRAMES
+    for start in range(0, audio.samples.shape[0], block_len):
+        block = audio.to_float(start, start + block_len)
+        squares = np.square(block, dtype=np.float32)
+        whole = (len(block) // frame_len) * frame_len
+        energy = squares[:whole].reshape(-1, frame_len, audio.channels).mean(axis=1)
+        yield block, squares, energy
+
+
+def compute_stats(audio: PcmAudio, params: FeatureParams) -> AudioStats:
+    """Calcula energia, clipping y actividad por frames de params.frame_ms, vectorizado por bloques.
+
+    Un frame es silencio si la energia de todos los canales esta bajo params.silence_dbfs; el
+    tiempo de habla de cada canal cuenta sus frames sobre el umbral. El ultimo frame incompleto
+    cuenta para la duracion y el RMS pero no para los ratios por frame.
+    """
+    total_frames, channels = audio.samples.shape[0], audio.channels
+    frame_len = frame_length(audio, params.frame_ms)
+    threshold = dbfs_to_energy(params.silence_dbfs)
+
+    sum_squares = 0.0
+    clipped = frames = silent_frames = 0
+    active_frames = np.zeros(channels, dtype=np.int64)
+    for block, squares, energy in iter_blocks(audio, frame_len):
+        sum_squares += float(squares.sum(dtype=np.float64))
+        clipped += int(np.count_nonzero(np.abs(block) >= params.clip_level))
+        active = energy >= threshold
+        active_frames += active.sum(axis=0)
+        silent_frames += int(np.count_nonzero(~active.any(axis=1)))
+        frames += energy.shape[0]
+
+    frame_ms = frame_len * 1000 / audio.sample_rate
+    return AudioStats(
+        duration_ms=total_frames * 1000 / audio.sample_rate,
+        samples=total_frames * channels,
+        sum_squares=sum_squares,
+        clipped=clipped,
+        frames=frames,
+        silent_frames=silent_frames,
+        talk_ms=tuple(float(count) * frame_ms for count in active_frames),
+    )
+
+
+class AudioFeatures(NamedTuple):
+    id_conversation: str
+    audio_duration_ms: int
+    silence_ratio: float
+    rms_dbfs: float
+    clipping_ratio: float
+    channel_talk_ms: List[int]
+
+    @classmethod
+    def from_stats(cls, id_conversation: str, stats: AudioStats) -> "AudioFeatures":
+        mean_square = stats.sum_squares / stats.samples if stats.samples else 0.0
+        rms_dbfs = 10 * math.log10(mean_square) if mean_square > 0 else MIN_DBFS
+        return cls(
+            id_conversation=id_conversation,
+            audio_duration_ms=round(stats.duration_ms),
+            silence_ratio=stats.silent_frames / stats.frames if stats.frames else 1.0,
+            rms_dbfs=max(rms_dbfs, MIN_DBFS),
+            clipping_ratio=stats.clipped / stats.samples if stats.samples else 0.0,
+            channel_talk_ms=[round(talk) for talk in stats.talk_ms],
+        )
+
+    def to_row(self) -> dict:
+        row = self._asdict()
+        row["channel_talk_ms"] = json.dumps(self.channel_talk_ms)
+        return row
+
+
+def extract_features(store_root: str, id_conversation: str, blobs: List[str],
+                     params: FeatureParams) -> AudioFeatures:
+    """Calcula las caracteristicas de una conversacion sumando las de todas sus grabaciones.
+
+    Se ejecuta en un proceso del pool: recibe rutas y hashes (baratos de serializar) y lee
+    cada blob con mmap, de modo que el audio no pasa por el pipe entre procesos.
+    """
+    store = ContentStore(store_root)
+    stats = AudioStats()
+    for sha256 in blobs:
+        failure = None
+        with store.open(sha256) as data:
+            try:
+                stats = stats.merge(compute_stats(decode_wav(data), params))
+            except Exception as e:
+                # El traceback retiene vistas sobre el mmap e impediria cerrarlo; solo se conserva el mensaje
+                failure = f"Grabacion {sha256}: {e}"
+        if failure:
+            raise AudioFeatureError(failure)
+    return AudioFeatures.from_stats(id_conversation, stats)
+
+
+class AudioProcessPool:
+    """Pool de procesos para el calculo sobre grabaciones del almacen, que es CPU (por eso
+    procesos y no hilos). El pool se crea al entrar al bloque with y se reutiliza entre llamadas."""
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self):
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.executor.shutdown(cancel_futures=True)
+        self.executor = None
+
+    def run(self, task: Callable[..., Any], items: Dict[Any, tuple]) -> List[TaskResult]:
+        """Ejecuta task(*args) por cada item -> args; los errores se devuelven por item."""
+        futures = {self.executor.submit(task, *args): item for item, args in items.items()}
+        results = []
+        for future in as_completed(futures):
+            try:
+                results.append(TaskResult(futures[future], future.result()))
+            except Exception as e:
+                results.append(TaskResult(futures[future], error=e))
+        return results
+
+
+class AudioFeatureExtractor(AudioProcessPool):
+    """Calcula las caracteristicas de audio de varias conversaciones; cada una es una tarea del pool."""
+
+    def __init__(self, store_root: str, params: FeatureParams, workers: Optional[int] = None):
+        super().__init__(workers)
+        self.store_root = store_root
+        self.params = params
+
+    def extract_all(self, recordings: Dict[str, List[str]]) -> List[TaskResult]:
+        """recordings: id_conversation -> sha256 de sus grabaciones. Los errores se devuelven por item."""
+        return self.run(extract_features, {
+            id_conversation: (self.store_root, id_conversation, blobs, self.params)
+            for id_conversation, blobs in recordings.items()
+        })
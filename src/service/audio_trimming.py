@@ -0,0 +1,171 @@
+import os
+import struct
+from typing import List, NamedTuple, Optional, Tuple
+import numpy as np
+from src.service.audio_features import (
+    AudioFeatureError, AudioProcessPool, PcmAudio, WAVE_FORMAT_PCM, BLOCK_FRAMES,
+    decode_wav, dbfs_to_energy, frame_length, iter_blocks,
+)
+from src.utils.content_store import ContentStore
+from src.utils.threads import TaskResult
+
+# Sufijo del archivo recortado en incoming/ antes de pasar al almacen
+TRIM_SUFFIX = ".trim.wav"
+
+
+class TrimParams(NamedTuple):
+    frame_ms: float = 20
+    silence_dbfs: float = -45.0
+    min_silence_ms: float = 1000
+    padding_ms: float = 200
+
+
+class TrimResult(NamedTuple):
+    sha256: str
+    trimmed_sha256: str
+    size: int
+    trimmed_size: int
+    # [ms en el audio recortado, ms en el original, duracion en ms] por cada segmento conservado
+    offsets: List[List[int]]
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.size - self.trimmed_size
+
+    def to_row(self) -> dict:
+        return {"sha256": self.sha256, "trimmed_sha256": self.trimmed_sha256, "trimmed_size": self.trimmed_size,
+                "trim_bytes_saved": self.bytes_saved, "trim_offsets": self.offsets,
+                "trim_error": None}
+
+
+def frame_activity(audio: PcmAudio, frame_len: int, silence_dbfs: float) -> np.ndarray:
+    """Un bool por frame: True si algun canal supera el umbral. El frame final incompleto es False.
+
+    Solo este arreglo (un byte por frame) crece con la duracion; las muestras se leen por bloques.
+    """
+    threshold = dbfs_to_energy(silence_dbfs)
+    total = -(-audio.samples.shape[0] // frame_len)
+    active = np.zeros(total, dtype=bool)
+    position = 0
+    for _, _, energy in iter_blocks(audio, frame_len):
+        active[position:position + len(energy)] = (energy >= threshold).any(axis=1)
+        position += len(energy)
+    return active
+
+
+def keep_segments(active: np.ndarray, min_silence_frames: int, padding_frames: int) -> List[Tuple[int, int]]:
+    """Segmentos [inicio, fin) de frames que se conservan.
+
+    Se eliminan los silencios de al menos min_silence_frames, dejando padding_frames junto a la
+    voz que los rodea; un silencio al inicio o al final del audio solo conserva el padding del
+    lado de la voz.
+    """
+    total = len(active)
+    if not total:
+        return []
+    edges = np.diff(np.concatenate(([1], active.astype(np.int8), [1])))
+    starts = np.flatnonzero(edges == -1)
+    ends = np.flatnonzero(edges == 1)
+    long_silences = (ends - starts) >= min_silence_frames
+    starts, ends = starts[long_silences], ends[long_silences]
+    cut_starts = np.where(starts == 0, 0, starts + padding_frames)
+    cut_ends = np.where(ends == total, total, ends - padding_frames)
+    valid = cut_ends > cut_starts
+    cut_starts, cut_ends = cut_starts[valid], cut_ends[valid]
+
+    # Marca los cortes con +1/-1 y acumula: cut[i] > 0 si el frame i cae dentro de un corte
+    delta = np.zeros(total + 1, dtype=np.int32)
+    np.add.at(delta, cut_starts, 1)
+    np.add.at(delta, cut_ends, -1)
+    keep = np.cumsum(delta[:-1]) == 0
+
+    edges = np.diff(np.concatenate(([0], keep.astype(np.int8), [0])))
+    return list(zip(np.flatnonzero(edges == 1).tolist(), np.flatnonzero(edges == -1).tolist()))
+
+
+def wav_header(audio: PcmAudio, data_size: int) -> bytes:
+    # Mismo formato de muestra que el original: el recorte copia los bytes sin recodificar
+    width = audio.bits // 8
+    block_align = width * audio.channels
+    fmt = struct.pack("<HHIIHH", audio.audio_format, audio.channels, audio.sample_rate,
+                      audio.sample_rate * block_align, block_align, audio.bits)
+    if audio.audio_format != WAVE_FORMAT_PCM:
+        fmt += struct.pack("<H", 0)
+    body_size = 4 + 8 + len(fmt) + 8 + data_size + (data_size & 1)
+    return (b"RIFF" + struct.pack("<I", body_size) + b"WAVE"
+            + b"fmt " + struct.pack("<I", len(fmt)) + fmt
+            + b"data" + struct.pack("<I", data_size))
+
+
+def write_trimmed(audio: PcmAudio, segments: List[Tuple[int, int]], frame_len: int, path: str) -> None:
+    total = audio.samples.shape[0]
+    ranges = [(start * frame_len, min(end * frame_len, total)) for start, end in segments]
+    frame_bytes = audio.channels * audio.bits // 8
+    data_size = sum(stop - start for start, stop in ranges) * frame_bytes
+    block_len = frame_len * BLOCK_FRAMES
+    with open(path, "wb") as file:
+        file.write(wav_header(audio, data_size))
+        for start, stop in ranges:
+            for offset in range(start, stop, block_len):
+                file.write(audio.samples[offset:min(offset + block_len, stop)].tobytes())
+        if data_size & 1:
+            file.write(b"\x00")
+
+
+def offset_map(segments: List[Tuple[int, int]], frame_ms: float) -> List[List[int]]:
+    offsets = []
+    trimmed = 0
+    for start, end in segments:
+        duration = (end - start) * frame_ms
+        offsets.append([round(trimmed), round(start * frame_ms), round(duration)])
+        trimmed += duration
+    return offsets
+
+
+def trim_to_file(data, path: str, params: TrimParams) -> Tuple[List[Tuple[int, int]], float]:
+    """Escribe en path el audio sin sus silencios largos; devuelve los segmentos y la duracion del frame."""
+    audio = decode_wav(data)
+    frame_len = frame_length(audio, params.frame_ms)
+    frame_ms = frame_len * 1000 / audio.sample_rate
+    active = frame_activity(audio, frame_len, params.silence_dbfs)
+    segments = keep_segments(active, round(params.min_silence_ms / frame_ms), round(params.padding_ms / frame_ms))
+    write_trimmed(audio, segments, frame_len, path)
+    return segments, frame_ms
+
+
+def trim_blob(store_root: str, sha256: str, params: TrimParams) -> TrimResult:
+    """Recorta los silencios largos de un blob y guarda el resultado en el almacen.
+
+    Se ejecuta en un proceso del pool; las muestras se leen del mmap y se escriben por bloques,
+    de modo que la memoria no depende de la duracion de la grabacion.
+    """
+    store = ContentStore(store_root)
+    os.makedirs(store.incoming_dir, exist_ok=True)
+    path = os.path.join(store.incoming_dir, sha256 + TRIM_SUFFIX)
+    failure = None
+    with store.open(sha256) as data:
+        try:
+            segments, frame_ms = trim_to_file(data, path, params)
+        except Exception as e:
+            # El traceback retiene vistas sobre el mmap e impediria cerrarlo; solo se conserva el mensaje
+            failure = f"Grabacion {sha256}: {e}"
+    if failure:
+        if os.path.exists(path):
+            os.remove(path)
+        raise AudioFeatureError(failure)
+
+    size = os.path.getsize(store.blob_path(sha256))
+    blob = store.put_file(path)
+    return TrimResult(sha256, blob.sha256, size, blob.size, offset_map(segments, frame_ms))
+
+
+class AudioTrimmer(AudioProcessPool):
+    """Recorta los silencios de varios blobs; cada blob es una tarea del pool."""
+
+    def __init__(self, store_root: str, params: TrimParams, workers: Optional[int] = None):
+        super().__init__(workers)
+        self.store_root = store_root
+        self.params = params
+
+    def trim_all(self, blobs: List[str]) -> List[TaskResult]:
+        return self.run(trim_blob, {sha256: (self.store_root, sha256, self.params) for sha256 in blobs})
@@ -0,0 +1,86 @@
+import queue
+import threading
+from typing import Callable, List, Optional
+from src.utils.logger import logger
+
+_END = object()
+
+
+class BatchPipeline:
+    """Recibe las conversaciones filtradas pagina a pagina y las envia en batches.
+
+    El productor (la paginacion de analytics) llama put() por cada pagina; un hilo consumidor
+    arma batches de batch_size y llama submit_batch mientras se siguen consultando paginas.
+    La cola es acotada: si el consumidor va atrasado, put() bloquea al productor.
+    """
+
+    def __init__(self, submit_batch: Callable[[List], object], batch_size: int, queue_size: int = 10,
+                 exclude_known: Optional[Callable[[List], List]] = None):
+        self.submit_batch = submit_batch
+        self.exclude_known = exclude_known
+        self.batch_size = batch_size
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.thread: Optional[threading.Thread] = None
+        self.error: Optional[BaseException] = None
+        self.seen = set()
+        self.total = 0
+        self.batches = 0
+
+    def start(self) -> None:
+        self.thread = threading.Thread(target=self.consume, name="batch-pipeline", daemon=True)
+        self.thread.start()
+
+    def put(self, conversations: List) -> None:
+        if self.error:
+            raise RuntimeError("El consumidor del pipeline fallo") from self.error
+        if conversations:
+            self.queue.put(conversations)
+
+    def close(self) -> None:
+        self.queue.put(_END)
+        self.thread.join()
+        if self.error:
+            raise self.error
+
+    def consume(self) -> None:
+        pending = []
+        while True:
+            item = self.queue.get()
+            if item is _END:
+                break
+            if self.error:
+                # Se sigue vaciando la cola para no bloquear al productor
+                continue
+
+            try:
+                if self.exclude_known:
+                    # Las conversaciones ya registradas en base de datos no se vuelven a enviar
+                    item = self.exclude_known(item)
+
+                for conversation in item:
+                    # Los shards pueden repetir conversaciones que cruzan sus limites
+                    if conversation.id_conversation in self.seen:
+                        continue
+                    self.seen.add(conversation.id_conversation)
+                    pending.append(conversation)
+
+                while len(pending) >= self.batch_size:
+                    batch, pending = pending[:self.batch_size], pending[self.batch_size:]
+                    self.flush(batch)
+            except Exception as e:
+                # Cualquier fallo deja el error registrado y el hilo sigue vaciando la cola
+                logger.error(f"[Batch pipeline] Error al procesar la pagina: {e}")
+                self.error = e
+
+        if pending and not self.error:
+            try:
+                self.flush(pending)
+            except Exception as e:
+                logger.error(f"[Batch pipeline] Error al procesar la pagina: {e}")
+                self.error = e
+
+    def flush(self, batch: List) -> None:
+        self.submit_batch(batch)
+        self.total += len(batch)
+        self.batches += 1
+        logger.info(f"[Batch pipeline] Batch {self.batches} enviado con {len(batch)} conversaciones")
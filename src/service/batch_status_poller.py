@@ -0,0 +1,145 @@
+import heapq
+import itertools
+import math
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from src.repository.batch_repository import BatchRepository
+from src.repository.models.batch_model import BatchModel
+from src.utils.logger import logger
+from src.utils.threads import execute_bounded
+
+PENDING_GENESYS = "PENDING GENESYS"
+PENDING_DOWNLOAD = "PENDING DOWNLOAD"
+ERROR_GENESYS = "ERROR GENESYS"
+
+
+def next_poll_delay(progress: float, age_seconds: float, idle_polls: int, min_delay: float,
+                    max_delay: float, age_scale: float) -> float:
+    """Espera hasta la siguiente consulta de un batch.
+
+    - Se duplica por cada consulta seguida sin avance (idle_polls).
+    - Se acorta a medida que el batch avanza: un batch casi terminado se consulta con min_delay.
+    - Se alarga con la edad del batch: cada age_scale segundos suma otra espera base.
+    """
+    remaining = 1 - min(max(progress, 0.0), 1.0)
+    delay = min_delay * (2 ** min(idle_polls, 10)) * (0.25 + remaining) * (1 + age_seconds / age_scale)
+    return max(min_delay, min(max_delay, delay))
+
+
+def batch_progress(status) -> float:
+    expected = status.expected_result_count or 0
+    if expected <= 0:
+        return 0.0
+    return ((status.result_count or 0) + (status.error_count or 0)) / expected
+
+
+def is_finished(status) -> bool:
+    expected = status.expected_result_count or 0
+    return expected > 0 and (status.result_count or 0) + (status.error_count or 0) >= expected
+
+
+class TrackedBatch:
+    __slots__ = ("batch_id", "genesys_batch_id", "started_at", "progress", "idle_polls")
+
+    def __init__(self, batch_id: int, genesys_batch_id: str, started_at: float):
+        self.batch_id = batch_id
+        self.genesys_batch_id = genesys_batch_id
+        self.started_at = started_at
+        self.progress = 0.0
+        self.idle_polls = 0
+
+
+class BatchStatusPoller:
+    """Sigue todos los batch download jobs abiertos de Genesys con un solo heap de vencimientos.
+
+    Cada vuelta toma los batches cuya consulta vencio, los consulta con un pool acotado (no hay
+    un hilo por batch; las llamadas pasan por el rate limiter de recording_api) y los reprograma
+    con next_poll_delay. Los batches terminados se actualizan en bloque con un UPDATE por estado.
+    """
+
+    def __init__(self, recording_api, batch_db: BatchRepository, min_delay: float, max_delay: float,
+                 age_scale: float, max_age: float, workers: int,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.recording_api = recording_api
+        self.batch_db = batch_db
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.age_scale = age_scale
+        self.max_age = max_age
+        self.workers = workers
+        self.clock = clock
+        self.sleep = sleep
+        self.heap = []
+        # Desempate estable del heap cuando dos batches vencen al mismo tiempo
+        self.sequence = itertools.count()
+        self.finished: Dict[str, List[int]] = {}
+
+    def track(self, batches: List[BatchModel]) -> None:
+        now = self.clock()
+        for batch in batches:
+            age = (datetime.now() - batch.start_date).total_seconds() if isinstance(batch.start_date, datetime) else 0
+            tracked = TrackedBatch(batch.id, batch.genesys_batch_id, now - max(age, 0))
+            # Los batches nuevos se consultan de inmediato para conocer su avance
+            heapq.heappush(self.heap, (now, next(self.sequence), tracked))
+
+    def run(self) -> Dict[str, List[int]]:
+        """Consulta hasta que no queden batches abiertos; devuelve los ids actualizados por estado."""
+        logger.info(f"[Batch poller] Siguiendo {len(self.heap)} batches de Genesys")
+        while self.heap:
+            wait = self.heap[0][0] - self.clock()
+            if wait > 0:
+                self.sleep(wait)
+            self.poll_due()
+        return self.finished
+
+    def poll_due(self) -> None:
+        now = self.clock()
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            due.append(heapq.heappop(self.heap)[2])
+
+        results = execute_bounded(self.poll, due, max_workers=self.workers)
+
+        transitions: Dict[str, List[int]] = {}
+        now = self.clock()
+        for result in results:
+            tracked = result.item
+            new_status = result.value if result.ok else None
+            if not result.ok:
+                logger.warning(f"[Batch poller] Error al consultar el batch {tracked.genesys_batch_id}: {result.error}")
+                tracked.idle_polls += 1
+            if new_status is None and now - tracked.started_at > self.max_age:
+                logger.error(f"[Batch poller] El batch {tracked.genesys_batch_id} supero la espera maxima sin terminar")
+                new_status = ERROR_GENESYS
+            if new_status:
+                transitions.setdefault(new_status, []).append(tracked.batch_id)
+                continue
+            delay = next_poll_delay(tracked.progress, now - tracked.started_at, tracked.idle_polls,
+                                    self.min_delay, self.max_delay, self.age_scale)
+            heapq.heappush(self.heap, (now + delay, next(self.sequence), tracked))
+
+        for new_status, batch_ids in transitions.items():
+            updated = self.batch_db.transition_status_by_id(batch_ids, new_status, expected_status=PENDING_GENESYS,
+                                                            end_date=datetime.now())
+            self.finished.setdefault(new_status, []).extend(updated)
+            logger.info(f"[Batch poller] {len(updated)} batches pasan a '{new_status}'")
+
+    def poll(self, tracked: TrackedBatch) -> Optional[str]:
+        """Consulta un batch y devuelve su nuevo estado, o None si sigue en proceso."""
+        status = self.recording_api.get_recording_batchrequest(tracked.genesys_batch_id)
+        progress = batch_progress(status)
+        if progress > tracked.progress:
+            tracked.progress = progress
+            tracked.idle_polls = 0
+        else:
+            tracked.idle_polls += 1
+
+        if not is_finished(status):
+            logger.debug(f"[Batch poller] Batch {tracked.genesys_batch_id}: {math.floor(progress * 100)}% completado")
+            return None
+        if (status.error_count or 0) >= status.expected_result_count:
+            return ERROR_GENESYS
+        if status.error_count:
+            logger.warning(f"[Batch poller] Batch {tracked.genesys_batch_id} termino con {status.error_count} grabaciones con error")
+        return PENDING_DOWNLOAD
@@ -0,0 +1,62 @@
+import threading
+from typing import List, Optional
+from src.repository.checkpoint_repository import CheckpointRepository
+from src.repository.models.conversation_record import ConversationRecord
+
+
+class ExtractionCheckpoint:
+    """Avance de la extraccion de un job: shards completos, ultima pagina y conversaciones obtenidas.
+
+    Cada avance se confirma en la base junto con sus conversaciones, asi una ejecucion con
+    --resume <job_id> continua desde el ultimo shard o pagina guardados.
+    """
+
+    def __init__(self, repository: CheckpointRepository, job_id: int, interval: str, stage: str,
+                 completed_shards: Optional[List[str]] = None, last_page: int = 0):
+        self.repository = repository
+        self.job_id = job_id
+        self.interval = interval
+        self.stage = stage
+        self.completed_shards = set(completed_shards or [])
+        self.last_page = last_page
+        # Los shards se recorren en paralelo
+        self.lock = threading.Lock()
+        # Las escrituras compiten por el bloqueo de la misma fila de job_checkpoint; se serializan
+        # aqui para que los GENESYS_SHARD_WORKERS hilos no retengan una conexion del pool cada uno
+        self.write_lock = threading.Lock()
+
+    @classmethod
+    def start(cls, repository: CheckpointRepository, job_id: int, interval: str) -> "ExtractionCheckpoint":
+        model = repository.start(job_id, interval)
+        return cls(repository, job_id, interval, model.stage)
+
+    @classmethod
+    def load(cls, repository: CheckpointRepository, job_id: int) -> Optional["ExtractionCheckpoint"]:
+        model = repository.get(job_id)
+        if model is None:
+            return None
+        return cls(repository, job_id, model.interval, model.stage, model.completed_shards, model.last_page)
+
+    def shard_done(self, shard: str) -> bool:
+        with self.lock:
+            return shard in self.completed_shards
+
+    def record_shard(self, shard: str, conversations: List[ConversationRecord]) -> None:
+        with self.write_lock:
+            self.repository.save_progress(self.job_id, conversations, shard=shard)
+        with self.lock:
+            self.completed_shards.add(shard)
+
+    def record_page(self, page_number: int, conversations: List[ConversationRecord]) -> None:
+        with self.write_lock:
+            self.repository.save_progress(self.job_id, conversations, last_page=page_number)
+        self.last_page = page_number
+
+    def conversations(self) -> List[ConversationRecord]:
+        return self.repository.load_conversations(self.job_id)
+
+    def mark_stage(self, stage: str, expected_stage: Optional[str] = None) -> bool:
+        changed = self.repository.mark_stage(self.job_id, stage, expected_stage)
+        if changed:
+            self.stage = stage
+        return changed
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+from typing import Iterable, List, Tuple
+
+INTERVAL_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+def parse_interval(interval: str) -> Tuple[datetime, datetime]:
+    start, end = interval.split("/")
+    return datetime.strptime(start, INTERVAL_FORMAT), datetime.strptime(end, INTERVAL_FORMAT)
+
+
+def format_interval(start: datetime, end: datetime) -> str:
+    return f"{start.strftime(INTERVAL_FORMAT)}/{end.strftime(INTERVAL_FORMAT)}"
+
+
+def plan_shards(interval: str, shard_minutes: int) -> List[str]:
+    """Divide el intervalo en sub-intervalos contiguos de shard_minutes minutos"""
+    start, end = parse_interval(interval)
+    step = timedelta(minutes=shard_minutes)
+
+    shards = []
+    shard_start = start
+    while shard_start < end:
+        shard_end = min(shard_start + step, end)
+        shards.append(format_interval(shard_start, shard_end))
+        shard_start = shard_end
+    return shards
+
+
+def split_interval(interval: str, parts: int = 2) -> List[str]:
+    """Divide el intervalo en parts sub-intervalos de igual duracion"""
+    start, end = parse_interval(interval)
+    step = (end - start) / parts
+
+    shards = []
+    for index in range(parts):
+        shard_start = start + step * index
+        shard_end = end if index == parts - 1 else start + step * (index + 1)
+        shards.append(format_interval(shard_start.replace(microsecond=0), shard_end.replace(microsecond=0)))
+    return shards
+
+
+def can_split(interval: str, min_minutes: int) -> bool:
+    start, end = parse_interval(interval)
+    return (end - start) / 2 >= timedelta(minutes=min_minutes)
+
+
+def dedupe_conversations(audios: Iterable) -> List:
+    """Elimina conversaciones repetidas entre shards conservando la primera aparicion"""
+    seen = set()
+    unique = []
+    for audio in audios:
+        if audio.id_conversation in seen:
+            continue
+        seen.add(audio.id_conversation)
+        unique.append(audio)
+    return unique
@@ -0,0 +1,130 @@
+import os
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from src.repository.task_queue_repository import TaskQueueRepository, ClaimedTask, FAILED
+from src.utils.logger import logger
+
+TaskHandler = Callable[[Dict[str, Any]], None]
+
+
+class LeaseLostError(Exception):
+    """Otro worker puede haber reclamado la tarea; este worker no debe seguir ejecutandola."""
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class LeaseHeartbeat:
+    """Renueva el lease de una tarea en segundo plano mientras el handler se ejecuta."""
+
+    def __init__(self, queue: TaskQueueRepository, task_id: int, worker_id: str,
+                 lease_seconds: float, interval: float):
+        self.queue = queue
+        self.task_id = task_id
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.interval = interval
+        self.lost = False
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name=f"heartbeat-{task_id}", daemon=True)
+
+    def __enter__(self) -> "LeaseHeartbeat":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            if not self.queue.heartbeat(self.task_id, self.worker_id, self.lease_seconds):
+                # Otro worker puede reclamar la tarea; el resultado de este worker ya no se registra
+                logger.warning(f"[Task worker] Se perdio el lease de la tarea {self.task_id}")
+                self.lost = True
+                return
+
+    def check(self) -> None:
+        if self.lost:
+            raise LeaseLostError(f"Se perdio el lease de la tarea {self.task_id}")
+
+
+class TaskWorker:
+    """Worker que reclama tareas de la cola en la base y las ejecuta con el handler de su tipo.
+
+    Varios procesos identicos pueden ejecutar TaskWorker sobre la misma cola: cada tarea se
+    reclama con FOR UPDATE SKIP LOCKED, y si un worker cae su tarea vuelve a estar disponible
+    al vencer el lease.
+    """
+
+    def __init__(self, queue: TaskQueueRepository, handlers: Dict[str, TaskHandler],
+                 lease_seconds: float, heartbeat_seconds: float, retry_delay_seconds: float,
+                 poll_seconds: float, worker_id: Optional[str] = None):
+        self.queue = queue
+        self.handlers = handlers
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.retry_delay_seconds = retry_delay_seconds
+        self.poll_seconds = poll_seconds
+        self.worker_id = worker_id or default_worker_id()
+        self.processed = 0
+        self.failed = 0
+        # Heartbeat de la tarea en curso; los handlers lo consultan con check_lease
+        self.lease: Optional[LeaseHeartbeat] = None
+
+    def run(self, max_idle_polls: int = 0) -> int:
+        """Procesa tareas hasta que la cola este vacia max_idle_polls consultas seguidas (0 = sin limite)."""
+        logger.info(f"[Task worker] Worker {self.worker_id} iniciado para {list(self.handlers)}")
+        idle_polls = 0
+        while not max_idle_polls or idle_polls < max_idle_polls:
+            if self.run_once():
+                idle_polls = 0
+                continue
+            idle_polls += 1
+            if not max_idle_polls or idle_polls < max_idle_polls:
+                time.sleep(self.poll_seconds)
+        logger.info(f"[Task worker] Worker {self.worker_id} finalizado: {self.processed} tareas completadas, {self.failed} con error")
+        return self.processed
+
+    def run_once(self) -> bool:
+        tasks = self.queue.claim(self.handlers.keys(), self.worker_id, self.lease_seconds)
+        if not tasks:
+            return False
+        self.process(tasks[0])
+        return True
+
+    def check_lease(self) -> None:
+        """Lanza LeaseLostError si se perdio el lease de la tarea en curso."""
+        if self.lease:
+            self.lease.check()
+
+    def process(self, task: ClaimedTask) -> None:
+        logger.info(f"[Task worker] Tarea {task.id} ({task.kind}) intento {task.attempts}")
+        try:
+            with LeaseHeartbeat(self.queue, task.id, self.worker_id, self.lease_seconds, self.heartbeat_seconds) as lease:
+                self.lease = lease
+                self.handlers[task.kind](task.payload)
+                lease.check()
+        except LeaseLostError as e:
+            # La tarea ya no es de este worker: ni se completa ni se registra el fallo
+            self.failed += 1
+            logger.warning(f"[Task worker] Tarea {task.id} ({task.kind}) abandonada: {e}")
+            return
+        except Exception as e:
+            self.failed += 1
+            status = self.queue.fail(task.id, self.worker_id, str(e), self.retry_delay_seconds)
+            if status == FAILED:
+                logger.error(f"[Task worker] Tarea {task.id} ({task.kind}) fallo sin intentos restantes: {e}")
+            else:
+                logger.warning(f"[Task worker] Tarea {task.id} ({task.kind}) fallo, se reintentara: {e}")
+            return
+        finally:
+            self.lease = None
+
+        if self.queue.complete(task.id, self.worker_id):
+            self.processed += 1
+        else:
+            logger.warning(f"[Task worker] La tarea {task.id} termino despues de perder su lease")
@@ -0,0 +1,116 @@
+import hashlib
+import mmap
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, NamedTuple, Optional
+
+BLOBS_DIR = "blobs"
+INCOMING_DIR = "incoming"
+
+
+class StoredBlob(NamedTuple):
+    sha256: str
+    size: int
+    deduplicated: bool
+
+
+class ContentStore:
+    """Almacen de archivos direccionado por contenido: cada blob se guarda como blobs/<sha[:2]>/<sha>.
+
+    Dos grabaciones identicas ocupan un solo archivo. Las lecturas se hacen con mmap (sin copiar
+    el archivo a memoria) y actualizan el mtime del blob, que es el criterio de evict().
+    """
+
+    def __init__(self, root: str, chunk_size: int = 1024 * 1024):
+        self.root = root
+        self.chunk_size = chunk_size
+
+    @property
+    def incoming_dir(self) -> str:
+        # Las descargas se escriben aqui: mismo filesystem que blobs/, asi put_file es un rename atomico
+        return os.path.join(self.root, INCOMING_DIR)
+
+    def blob_path(self, sha256: str) -> str:
+        return os.path.join(self.root, BLOBS_DIR, sha256[:2], sha256)
+
+    def contains(self, sha256: str) -> bool:
+        return os.path.exists(self.blob_path(sha256))
+
+    def put_file(self, path: str, sha256: Optional[str] = None) -> StoredBlob:
+        """Mueve path al almacen; si el contenido ya existe se elimina path y se reutiliza el blob."""
+        if sha256 is None:
+            sha256 = self.hash_file(path)
+        size = os.path.getsize(path)
+        target = self.blob_path(sha256)
+        if os.path.exists(target):
+            os.remove(path)
+            self.touch(sha256)
+            return StoredBlob(sha256, size, deduplicated=True)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(path, target)
+        return StoredBlob(sha256, size, deduplicated=False)
+
+    @contextmanager
+    def open(self, sha256: str) -> Iterator[mmap.mmap]:
+        """Mapea el blob en modo lectura; memoryview(blob)[a:b] lee un rango sin copiarlo."""
+        path = self.blob_path(sha256)
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                # mmap no admite archivos vacios
+                yield b""
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as blob:
+                self.touch(sha256)
+                yield blob
+
+    def touch(self, sha256: str) -> None:
+        os.utime(self.blob_path(sha256))
+
+    def hash_file(self, path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(self.chunk_size), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def list_blobs(self) -> List[os.DirEntry]:
+        blobs = []
+        blobs_dir = os.path.join(self.root, BLOBS_DIR)
+        if not os.path.isdir(blobs_dir):
+            return blobs
+        for prefix in os.scandir(blobs_dir):
+            if prefix.is_dir():
+                blobs.extend(entry for entry in os.scandir(prefix.path) if entry.is_file())
+        return blobs
+
+    def purge_incoming(self, max_age_seconds: float, now: Optional[float] = None) -> List[str]:
+        """Elimina de incoming/ los archivos sin cambios en max_age_seconds: descargas .part que no
+        se retomaron o recortes interrumpidos. Devuelve los nombres eliminados."""
+        now = time.time() if now is None else now
+        if not max_age_seconds or not os.path.isdir(self.incoming_dir):
+            return []
+        purged = []
+        for entry in os.scandir(self.incoming_dir):
+            if entry.is_file() and now - entry.stat().st_mtime > max_age_seconds:
+                os.remove(entry.path)
+                purged.append(entry.name)
+        return purged
+
+    def evict(self, retention_seconds: float, max_bytes: int = 0, now: Optional[float] = None) -> List[str]:
+        """Elimina los blobs sin uso en retention_seconds y, si el almacen supera max_bytes (0 = sin
+        limite), los menos usados recientemente hasta quedar por debajo. Devuelve los sha256 eliminados."""
+        now = time.time() if now is None else now
+        blobs = sorted(((entry.stat().st_mtime, entry.stat().st_size, entry) for entry in self.list_blobs()),
+                       key=lambda blob: blob[0])
+        total = sum(size for _, size, _ in blobs)
+        evicted = []
+        for mtime, size, entry in blobs:
+            expired = retention_seconds and now - mtime > retention_seconds
+            over_limit = max_bytes and total > max_bytes
+            if not expired and not over_limit:
+                break
+            os.remove(entry.path)
+            total -= size
+            evicted.append(entry.name)
+        return evicted
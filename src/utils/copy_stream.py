@@ -0,0 +1,95 @@
+import io
+import json
+import math
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+# Tamano por defecto del bloque de filas que se serializa en cada lectura de COPY
+DEFAULT_CHUNK_ROWS = 1000
+
+
+def format_csv_value(value: Any) -> str:
+    """Serializa un valor para COPY ... WITH (FORMAT csv).
+
+    En formato csv un campo vacio sin comillas es NULL y un campo entre comillas es texto,
+    por eso los strings siempre van entre comillas (asi '' no se convierte en NULL y las
+    comas, comillas o saltos de linea de summary/reason no rompen la fila). Los dict y list
+    se serializan como JSON, no con su repr de Python.
+    """
+    if value is None or (isinstance(value, float) and math.isnan(value)) or is_missing(value):
+        return ""
+    if isinstance(value, (dict, list, tuple)):
+        value = json.dumps(value, ensure_ascii=False, default=str)
+    if isinstance(value, str):
+        return '"' + value.replace('"', '""') + '"'
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "\\x" + bytes(value).hex()
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def is_missing(value: Any) -> bool:
+    # pd.NA y pd.NaT sin importar pandas: ambos son singletons con estos nombres de tipo
+    return type(value).__name__ in ("NAType", "NaTType")
+
+
+def format_csv_row(row: Sequence[Any]) -> str:
+    return ",".join(format_csv_value(value) for value in row) + "\n"
+
+
+class CsvCopyStream(io.TextIOBase):
+    """Archivo de solo lectura que genera el CSV de COPY a medida que psycopg2 lo lee.
+
+    Las filas se serializan por bloques de chunk_rows, de modo que la memoria usada no
+    depende de la cantidad total de filas. Acepta cualquier iterable de secuencias.
+    """
+
+    def __init__(self, rows: Iterable[Sequence[Any]], chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        self.rows: Iterator[Sequence[Any]] = iter(rows)
+        self.chunk_rows = chunk_rows
+        self.buffer = ""
+        self.row_count = 0
+        self.exhausted = False
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        while not self.exhausted and (size is None or size < 0 or len(self.buffer) < size):
+            self.fill()
+
+        if size is None or size < 0 or size >= len(self.buffer):
+            data, self.buffer = self.buffer, ""
+        else:
+            data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+    def readline(self, size: int = -1) -> str:
+        while not self.exhausted and "\n" not in self.buffer:
+            self.fill()
+        end = self.buffer.find("\n") + 1 or len(self.buffer)
+        if size is not None and 0 <= size < end:
+            end = size
+        data, self.buffer = self.buffer[:end], self.buffer[end:]
+        return data
+
+    def fill(self) -> None:
+        lines = []
+        for row in self.rows:
+            lines.append(format_csv_row(row))
+            if len(lines) >= self.chunk_rows:
+                break
+        if not lines:
+            self.exhausted = True
+            return
+        self.row_count += len(lines)
+        self.buffer += "".join(lines)
+
+
+def copy_statement(table: str, columns: Optional[Sequence[str]] = None):
+    """COPY ... FROM STDIN en formato csv; table puede incluir el esquema ("audios_sac.audio")."""
+    # psycopg2.sql se importa aqui para no cargar el driver al importar el modulo
+    from psycopg2 import sql as pg_sql
+
+    target = pg_sql.Identifier(*table.split("."))
+    if columns:
+        target = pg_sql.SQL("{} ({})").format(target, pg_sql.SQL(", ").join(pg_sql.Identifier(c) for c in columns))
+    return pg_sql.SQL("COPY {} FROM STDIN WITH (FORMAT csv)").format(target)
@@ -1,4 +1,7 @@
+import threading
+from typing import Callable, Dict
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm.session import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from urllib.parse import quote_plus
@@ -7,6 +10,51 @@ import src.utils.environment as env
 class Config:
     PG_URI = f"postgresql://{env.PG_USER}:{quote_plus(env.PG_PASSWORD)}@{env.PG_HOST}:{env.PG_PORT}/{env.PG_DATABASE}"
 
-engine = create_engine(Config.PG_URI)
-#Session = sessionmaker(bind=engine)
-Base = declarative_base()
\ No newline at end of file
+# Nombre del bind principal (esquema audios_sac); database_executes recibe el bind por nombre
+PG_BIND = "postgres"
+
+
+def create_pg_engine(uri: str) -> Engine:
+    """Engine de Postgres con pool acotado a la concurrencia del proceso.
+
+    A la vez pueden tomar conexion: el hilo principal (que tambien registra el poller y las
+    descargas), el consumidor del pipeline, el hilo que renueva el lease de la tarea en curso y
+    la escritura de checkpoints. Los hilos de shards y paginas solo consultan Genesys, y
+    ExtractionCheckpoint serializa sus escrituras, asi que el pool no crece con
+    GENESYS_SHARD_WORKERS; el overflow cubre picos. pre_ping descarta conexiones cerradas por el
+    servidor y recycle las renueva antes de que las corte un firewall o pgbouncer.
+    """
+    return create_engine(
+        uri,
+        pool_size=env.DB_POOL_SIZE,
+        max_overflow=env.DB_MAX_OVERFLOW,
+        pool_timeout=env.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=env.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=True,
+        connect_args={
+            "connect_timeout": env.DB_CONNECT_TIMEOUT_SECONDS,
+            "options": f"-c statement_timeout={env.DB_STATEMENT_TIMEOUT_MS}",
+        },
+    )
+
+
+# Registro de engines por bind; todos los repositorios y helpers toman conexiones de aqui.
+# Los engines se crean en el primer get_engine(), no al importar el modulo.
+engines: Dict[str, Engine] = {}
+engine_factories: Dict[str, Callable[[], Engine]] = {
+    PG_BIND: lambda: create_pg_engine(Config.PG_URI),
+}
+_engines_lock = threading.Lock()
+
+
+def get_engine(bind: str = PG_BIND) -> Engine:
+    engine = engines.get(bind)
+    if engine is None:
+        with _engines_lock:
+            engine = engines.get(bind)
+            if engine is None:
+                engine = engines[bind] = engine_factories[bind]()
+    return engine
+
+#Session = sessionmaker(bind=get_engine())
+Base = declarative_base()
@@ -1,17 +1,58 @@
+import itertools
 from sqlalchemy import text
 import pandas as pd
 from sqlalchemy.orm import sessionmaker
-from io import StringIO
-from .database import engines
+from .database import get_engine, PG_BIND
 from .logger import logger
+from .copy_stream import CsvCopyStream, DEFAULT_CHUNK_ROWS, copy_statement
+from . import environment as env
 
-def execute_query_to_df(query, bind):
-    engine = engines[bind]
+_cursor_ids = itertools.count(1)
+
+def execute_query_to_df(query, bind=PG_BIND, chunksize=None):
+    # Con chunksize se devuelve un iterador de DataFrames leidos con un cursor del lado del servidor
+    if chunksize:
+        return iter_query_to_df(query, bind=bind, itersize=chunksize)
+    engine = get_engine(bind)
     df = pd.read_sql(query, engine)
     return df
 
-def execute_function_with_cursor_to_df(query, bind):
-    engine = engines[bind]
+def iter_query_rows(query, bind=PG_BIND, itersize=None):
+    """Ejecuta query con un cursor con nombre (server-side) y devuelve (columnas, filas) por bloques de itersize.
+
+    El resultado nunca se carga completo en memoria. A diferencia de los demas helpers, los
+    errores se propagan: cortar un export a la mitad en silencio dejaria un archivo incompleto.
+    """
+    itersize = itersize or env.DB_FETCH_SIZE
+    engine = get_engine(bind)
+    conn = engine.raw_connection()
+    cursor = conn.cursor(name=f"audio_extract_cursor_{next(_cursor_ids)}")
+    cursor.itersize = itersize
+    try:
+        cursor.execute(query)
+        while True:
+            rows = cursor.fetchmany(itersize)
+            if not rows:
+                break
+            yield [desc[0] for desc in cursor.description], rows
+        conn.commit()
+    except Exception as error:
+        logger.error(error)
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+def iter_query_to_df(query, bind=PG_BIND, itersize=None):
+    for columns, rows in iter_query_rows(query, bind=bind, itersize=itersize):
+        yield pd.DataFrame(rows, columns=columns)
+
+def execute_function_with_cursor_to_df(query, bind=PG_BIND, chunksize=None):
+    # Con chunksize el refcursor se lee con fetch N en lugar de fetch all
+    if chunksize:
+        return iter_function_cursor_to_df(query, bind=bind, fetch_size=chunksize)
+    engine = get_engine(bind)
     session_make = sessionmaker(bind=engine)
     session = session_make()
     try:
@@ -27,31 +68,64 @@ def execute_function_with_cursor_to_df(query, bind):
     finally:
         session.close()
 
-def bulk_insert_from_df_pg(df, table, bind):
-    buffer = StringIO()
-    df.to_csv(buffer, index=False, header=False)
-    buffer.seek(0)
-    engine = engines[bind]
+def iter_function_cursor_to_df(query, bind=PG_BIND, fetch_size=None):
+    """Lee el refcursor que devuelve la funcion en bloques de fetch_size filas (un DataFrame por bloque)."""
+    fetch_size = int(fetch_size or env.DB_FETCH_SIZE)
+    engine = get_engine(bind)
+    session_make = sessionmaker(bind=engine)
+    session = session_make()
+    try:
+        # El refcursor solo existe dentro de la transaccion que lo abrio
+        results_cursor = session.execute(text(query)).fetchone()
+        fetch = text(f'fetch {fetch_size} in "{results_cursor[0]}"')
+        while True:
+            cur = session.execute(fetch)
+            results = cur.fetchall()
+            if not results:
+                break
+            yield pd.DataFrame(results, columns=[desc for desc in cur.keys()])
+        session.commit()
+    except Exception as error:
+        logger.error(error)
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+def bulk_insert_from_df_pg(df, table, bind=PG_BIND, columns=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    # Las filas del DataFrame se serializan por bloques durante el COPY, sin armar el CSV completo en memoria
+    rows = df.itertuples(index=False, name=None)
+    return copy_rows_pg(rows, table, columns=columns, bind=bind, chunk_rows=chunk_rows)
+
+def copy_rows_pg(rows, table, columns=None, bind=PG_BIND, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """COPY de un iterable de filas (tuplas o listas) con memoria constante.
+
+    table puede incluir el esquema ("audios_sac.audio"). Si no se indican columns, las filas
+    deben seguir el orden de las columnas de la tabla.
+    """
+    stream = CsvCopyStream(rows, chunk_rows=chunk_rows)
+    engine = get_engine(bind)
     conn = engine.raw_connection()
     cursor = conn.cursor()
     try:
-        cursor.copy_from(buffer, table, sep=",")
+        cursor.copy_expert(copy_statement(table, columns), stream)
         conn.commit()
+        logger.debug(f"COPY de {stream.row_count} filas en {table}")
         return True
     except Exception as error:
         logger.error(error)
         conn.rollback()
         return False
     finally:
-        conn.close()
         cursor.close()
+        conn.close()
 
 def bulk_insert_from_df_mssql(df, table, bind):
-    engine = engines[bind]
+    engine = get_engine(bind)
     df.to_sql(table, engine, if_exists="append", index=False)
 
-def execute_query_with_results(query, bind):
-    engine = engines[bind]
+def execute_query_with_results(query, bind=PG_BIND):
+    engine = get_engine(bind)
     conn = engine.raw_connection()
     cursor = conn.cursor()
     try:
@@ -63,11 +137,11 @@ def execute_query_with_results(query, bind):
         logger.error(error)
         conn.rollback()
     finally:
-        conn.close()
         cursor.close()
+        conn.close()
 
 def execute_sp(bind, sp, args):
-    engine = engines[bind]
+    engine = get_engine(bind)
     conn = engine.raw_connection()
     cursor = conn.cursor()
     try:
@@ -81,8 +155,8 @@ def execute_sp(bind, sp, args):
         cursor.close()
         conn.close()
 
-def execute_query_no_results(query, bind):
-    engine = engines[bind]
+def execute_query_no_results(query, bind=PG_BIND):
+    engine = get_engine(bind)
     conn = engine.raw_connection()
     cursor = conn.cursor()
     try:
@@ -6,6 +6,13 @@ PG_PASSWORD = config("PG_PASSWORD", default="test_password")
 PG_HOST = config("PG_HOST", default="localhost")
 PG_PORT = config("PG_PORT", cast=int, default=5432)
 PG_DATABASE = config("PG_DATABASE", default="test_db")
+DB_POOL_SIZE = config("DB_POOL_SIZE", cast=int, default=4)
+DB_MAX_OVERFLOW = config("DB_MAX_OVERFLOW", cast=int, default=4)
+DB_POOL_TIMEOUT_SECONDS = config("DB_POOL_TIMEOUT_SECONDS", cast=float, default=30)
+DB_POOL_RECYCLE_SECONDS = config("DB_POOL_RECYCLE_SECONDS", cast=int, default=1800)
+DB_CONNECT_TIMEOUT_SECONDS = config("DB_CONNECT_TIMEOUT_SECONDS", cast=int, default=10)
+DB_STATEMENT_TIMEOUT_MS = config("DB_STATEMENT_TIMEOUT_MS", cast=int, default=300000)
+DB_FETCH_SIZE = config("DB_FETCH_SIZE", cast=int, default=5000)
 GENESYS_CLOUD_CLIENT_ID = config("GENESYS_CLOUD_CLIENT_ID", default="test_client_id")
 GENESYS_CLOUD_CLIENT_SECRET = config("GENESYS_CLOUD_CLIENT_SECRET", default="test_secret")
 BATCH_SIZE = config("BATCH_SIZE", cast=int, default=100)
@@ -14,3 +21,84 @@ EMAILS = config("EMAILS", default="test@example.com")
 EMAIL_MESSAGE = config("EMAIL_MESSAGE", default="Test message")
 NOTIFY_URL = config("NOTIFY_URL", default="http://localhost:8080")
 LOG_LEVEL = config("LOG_LEVEL", default="DEBUG")
+
+# Resolucion concurrente de metadata de grabaciones
+GENESYS_METADATA_WORKERS = config("GENESYS_METADATA_WORKERS", cast=int, default=8)
+GENESYS_METADATA_TIMEOUT = config("GENESYS_METADATA_TIMEOUT", cast=float, default=30)
+
+# Paginacion de la consulta de conversaciones en analytics
+GENESYS_PARALLEL_PAGING = config("GENESYS_PARALLEL_PAGING", cast=bool, default=False)
+GENESYS_PAGE_WORKERS = config("GENESYS_PAGE_WORKERS", cast=int, default=4)
+
+# Division del dia en shards de tiempo para la consulta de conversaciones
+GENESYS_SHARD_MINUTES = config("GENESYS_SHARD_MINUTES", cast=int, default=0)
+GENESYS_SHARD_WORKERS = config("GENESYS_SHARD_WORKERS", cast=int, default=4)
+GENESYS_SHARD_MAX_HITS = config("GENESYS_SHARD_MAX_HITS", cast=int, default=0)
+GENESYS_SHARD_MIN_MINUTES = config("GENESYS_SHARD_MIN_MINUTES", cast=int, default=5)
+
+# Jobs asincronos de analytics para dias con muchas conversaciones
+GENESYS_ASYNC_JOBS_THRESHOLD = config("GENESYS_ASYNC_JOBS_THRESHOLD", cast=int, default=10000)
+GENESYS_ASYNC_JOBS_POLL_SECONDS = config("GENESYS_ASYNC_JOBS_POLL_SECONDS", cast=float, default=2)
+GENESYS_ASYNC_JOBS_MAX_POLL_SECONDS = config("GENESYS_ASYNC_JOBS_MAX_POLL_SECONDS", cast=float, default=30)
+GENESYS_ASYNC_JOBS_TIMEOUT = config("GENESYS_ASYNC_JOBS_TIMEOUT", cast=float, default=1800)
+GENESYS_ASYNC_JOBS_PAGE_SIZE = config("GENESYS_ASYNC_JOBS_PAGE_SIZE", cast=int, default=1000)
+
+# Limite de peticiones y reintentos hacia Genesys
+GENESYS_ANALYTICS_RATE_PER_SECOND = config("GENESYS_ANALYTICS_RATE_PER_SECOND", cast=float, default=3)
+GENESYS_RECORDING_RATE_PER_SECOND = config("GENESYS_RECORDING_RATE_PER_SECOND", cast=float, default=5)
+GENESYS_CONVERSATIONS_RATE_PER_SECOND = config("GENESYS_CONVERSATIONS_RATE_PER_SECOND", cast=float, default=5)
+GENESYS_MAX_RETRIES = config("GENESYS_MAX_RETRIES", cast=int, default=5)
+GENESYS_BACKOFF_BASE_SECONDS = config("GENESYS_BACKOFF_BASE_SECONDS", cast=float, default=1)
+GENESYS_BACKOFF_MAX_SECONDS = config("GENESYS_BACKOFF_MAX_SECONDS", cast=float, default=60)
+
+# Cache y renovacion del token de Genesys
+GENESYS_TOKEN_CACHE_PATH = config("GENESYS_TOKEN_CACHE_PATH", default="/tmp/genesys_token.json")
+GENESYS_TOKEN_TTL_SECONDS = config("GENESYS_TOKEN_TTL_SECONDS", cast=float, default=86400)
+GENESYS_TOKEN_REFRESH_MARGIN_SECONDS = config("GENESYS_TOKEN_REFRESH_MARGIN_SECONDS", cast=float, default=600)
+
+# Envio de batches en paralelo a la paginacion
+GENESYS_PIPELINE_MODE = config("GENESYS_PIPELINE_MODE", cast=bool, default=False)
+GENESYS_PIPELINE_QUEUE_SIZE = config("GENESYS_PIPELINE_QUEUE_SIZE", cast=int, default=10)
+
+# Particiones mensuales de la tabla audio
+AUDIO_PARTITION_MONTHS_AHEAD = config("AUDIO_PARTITION_MONTHS_AHEAD", cast=int, default=2)
+
+# Checkpoints de extraccion para reanudar jobs con --resume
+JOB_CHECKPOINTS = config("JOB_CHECKPOINTS", cast=bool, default=True)
+
+# Cola de tareas en Postgres para repartir el envio de batches entre varios workers
+TASK_QUEUE_MODE = config("TASK_QUEUE_MODE", cast=bool, default=False)
+TASK_LEASE_SECONDS = config("TASK_LEASE_SECONDS", cast=float, default=300)
+TASK_HEARTBEAT_SECONDS = config("TASK_HEARTBEAT_SECONDS", cast=float, default=60)
+TASK_MAX_ATTEMPTS = config("TASK_MAX_ATTEMPTS", cast=int, default=5)
+TASK_RETRY_DELAY_SECONDS = config("TASK_RETRY_DELAY_SECONDS", cast=float, default=60)
+TASK_POLL_SECONDS = config("TASK_POLL_SECONDS", cast=float, default=5)
+TASK_WORKER_MAX_IDLE_POLLS = config("TASK_WORKER_MAX_IDLE_POLLS", cast=int, default=3)
+
+# Seguimiento de los batch download jobs de Genesys
+GENESYS_BATCH_POLL_MIN_SECONDS = config("GENESYS_BATCH_POLL_MIN_SECONDS", cast=float, default=10)
+GENESYS_BATCH_POLL_MAX_SECONDS = config("GENESYS_BATCH_POLL_MAX_SECONDS", cast=float, default=300)
+GENESYS_BATCH_POLL_AGE_SCALE_SECONDS = config("GENESYS_BATCH_POLL_AGE_SCALE_SECONDS", cast=float, default=1800)
+GENESYS_BATCH_POLL_WORKERS = config("GENESYS_BATCH_POLL_WORKERS", cast=int, default=4)
+GENESYS_BATCH_MAX_AGE_HOURS = config("GENESYS_BATCH_MAX_AGE_HOURS", cast=float, default=24)
+
+# Descarga de las grabaciones de los batches terminados
+AUDIO_STORE_DIR = config("AUDIO_STORE_DIR", default="/tmp/audios_sac")
+DOWNLOAD_WORKERS = config("DOWNLOAD_WORKERS", cast=int, default=8)
+DOWNLOAD_CHUNK_BYTES = config("DOWNLOAD_CHUNK_BYTES", cast=int, default=1048576)
+DOWNLOAD_TIMEOUT_SECONDS = config("DOWNLOAD_TIMEOUT_SECONDS", cast=float, default=60)
+AUDIO_STORE_RETENTION_HOURS = config("AUDIO_STORE_RETENTION_HOURS", cast=float, default=72)
+AUDIO_STORE_MAX_BYTES = config("AUDIO_STORE_MAX_BYTES", cast=int, default=0)
+AUDIO_STORE_INCOMING_MAX_HOURS = config("AUDIO_STORE_INCOMING_MAX_HOURS", cast=float, default=24)
+
+# Caracteristicas de audio de las grabaciones descargadas
+AUDIO_FEATURE_WORKERS = config("AUDIO_FEATURE_WORKERS", cast=int, default=0)
+AUDIO_FEATURE_BATCH_SIZE = config("AUDIO_FEATURE_BATCH_SIZE", cast=int, default=500)
+AUDIO_FEATURE_FRAME_MS = config("AUDIO_FEATURE_FRAME_MS", cast=float, default=20)
+AUDIO_SILENCE_DBFS = config("AUDIO_SILENCE_DBFS", cast=float, default=-45)
+AUDIO_CLIP_LEVEL = config("AUDIO_CLIP_LEVEL", cast=float, default=0.999)
+
+# Recorte de silencios largos de las grabaciones (usa los workers y el frame de las caracteristicas)
+TRIM_SILENCE_DBFS = config("TRIM_SILENCE_DBFS", cast=float, default=-45)
+TRIM_MIN_SILENCE_MS = config("TRIM_MIN_SILENCE_MS", cast=float, default=1000)
+TRIM_PADDING_MS = config("TRIM_PADDING_MS", cast=float, default=200)
@@ -0,0 +1,34 @@
+import importlib
+import threading
+from types import ModuleType
+
+
+class LazyModule:
+    """Modulo que se importa recien en el primer acceso a uno de sus atributos.
+
+    Se usa para el SDK de Genesys, cuya importacion toma ~2s: importar el servicio no paga
+    ese costo hasta que se autentica o se construye el primer modelo del SDK.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "cargado" if self._module is not None else "sin cargar"
+        return f"<LazyModule {self._name} ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    return LazyModule(name)
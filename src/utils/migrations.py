@@ -0,0 +1,58 @@
+from pathlib import Path
+from typing import List, Tuple
+from sqlalchemy import text
+from src.utils.database import get_engine
+from src.utils.logger import logger
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent.parent / "migrations"
+
+# Registro de las migraciones aplicadas; la version es el prefijo numerico del archivo
+CREATE_VERSIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS audios_sac.schema_migrations (
+    version varchar PRIMARY KEY,
+    name varchar NOT NULL,
+    applied_at timestamp NOT NULL DEFAULT now()
+)
+"""
+
+
+def list_migrations(directory: Path = MIGRATIONS_DIR) -> List[Tuple[str, Path]]:
+    """Devuelve (version, archivo) de cada script NNN_descripcion.sql ordenado por version."""
+    migrations = []
+    for path in sorted(directory.glob("*.sql")):
+        version = path.name.split("_", 1)[0]
+        if not version.isdigit():
+            logger.warning(f"[Migrations] Se ignora {path.name}: no empieza con un numero de version")
+            continue
+        migrations.append((version, path))
+    return migrations
+
+
+def apply_migrations(directory: Path = MIGRATIONS_DIR) -> List[str]:
+    """Aplica en orden las migraciones pendientes, cada una en su propia transaccion."""
+    with get_engine().begin() as conn:
+        conn.execute(text(CREATE_VERSIONS_TABLE))
+        applied = set(conn.execute(text("SELECT version FROM audios_sac.schema_migrations")).scalars())
+
+    applied_now = []
+    for version, path in list_migrations(directory):
+        if version in applied:
+            continue
+        logger.info(f"[Migrations] Aplicando {path.name}")
+        with get_engine().begin() as conn:
+            # Las migraciones pueden reescribir tablas grandes; no aplica el statement_timeout del pool
+            conn.exec_driver_sql("SET LOCAL statement_timeout = 0")
+            # exec_driver_sql envia el script tal cual (varias sentencias y bloques plpgsql)
+            conn.exec_driver_sql(path.read_text())
+            conn.execute(
+                text("INSERT INTO audios_sac.schema_migrations (version, name) VALUES (:version, :name)"),
+                {"version": version, "name": path.name}
+            )
+        applied_now.append(version)
+
+    logger.info(f"[Migrations] {len(applied_now)} migraciones aplicadas")
+    return applied_now
+
+
+if __name__ == "__main__":
+    apply_migrations()
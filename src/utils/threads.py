@@ -1,5 +1,6 @@
 import time
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional
 
 def my_task(args):
     print("Inicio task", args[0])
@@ -19,3 +20,87 @@ def execute_threads():
   for result in results:
       print('Respondiendo thread', result)
   print('Fin threads')
+
+
+class TaskResult(NamedTuple):
+    item: Any
+    value: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def execute_bounded(task: Callable[[Any], Any], items: Iterable[Any], max_workers: int,
+                    timeout: Optional[float] = None) -> List[TaskResult]:
+    """Ejecuta task sobre cada item con concurrencia acotada.
+
+    Los resultados se devuelven en el mismo orden que items. Los errores (incluido el
+    timeout por llamada, contado desde que la tarea empieza a ejecutarse) se devuelven
+    en TaskResult.error en lugar de propagarse. Una tarea vencida sigue ocupando su hilo;
+    si todos los hilos quedan ocupados por tareas vencidas, los items que aun no iniciaron
+    se marcan como timeout en lugar de esperar indefinidamente.
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    results: List[Optional[TaskResult]] = [None] * len(items)
+    started = {}
+
+    def run(index):
+        started[index] = time.monotonic()
+        return task(items[index])
+
+    workers = max(1, min(max_workers, len(items)))
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {executor.submit(run, index): index for index in range(len(items))}
+        pending = set(futures)
+        timed_out = []
+        while pending:
+            wait_timeout = None
+            if timeout:
+                now = time.monotonic()
+                deadlines = [started[futures[f]] + timeout - now for f in pending if futures[f] in started]
+                # Si ninguna tarea pendiente ha iniciado aun, se vuelve a revisar en breve
+                wait_timeout = max(0.0, min(deadlines)) if deadlines else min(timeout, 0.5)
+
+            done, pending = wait(pending, timeout=wait_timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = futures[future]
+                error = future.exception()
+                if error is None:
+                    results[index] = TaskResult(items[index], value=future.result())
+                else:
+                    results[index] = TaskResult(items[index], error=error)
+
+            if timeout:
+                now = time.monotonic()
+                for future in list(pending):
+                    index = futures[future]
+                    if index in started and now - started[index] >= timeout:
+                        pending.discard(future)
+                        timed_out.append(future)
+                        results[index] = TaskResult(
+                            items[index],
+                            error=TimeoutError(f"La tarea supero el timeout de {timeout}s")
+                        )
+
+                # Sin hilos libres los items en cola nunca podrian iniciar
+                busy = sum(1 for future in timed_out if not future.done())
+                if busy >= workers:
+                    for future in list(pending):
+                        if future.cancel():
+                            pending.discard(future)
+                            index = futures[future]
+                            results[index] = TaskResult(
+                                items[index],
+                                error=TimeoutError("No hay hilos libres: las tareas anteriores superaron el timeout")
+                            )
+    finally:
+        # Las tareas que vencieron siguen en su hilo; no se espera por ellas
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return results
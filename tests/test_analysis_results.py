@@ -0,0 +1,61 @@
+"""
+Pruebas unitarias para la carga de resultados de analisis
+"""
+import pytest
+from unittest.mock import Mock
+from src.service.analysis_results import read_analysis_results, load_analysis_results
+
+
+class TestAnalysisResults:
+    """Pruebas para read_analysis_results y load_analysis_results"""
+
+    def test_read_jsonl(self, tmp_path):
+        """Verifica la lectura de un archivo JSONL ignorando lineas vacias"""
+        # Arrange
+        path = tmp_path / "resultados.jsonl"
+        path.write_text('{"id_conversation": "conv-1", "summary": "hola"}\n\n{"id_conversation": "conv-2"}\n')
+
+        # Act
+        results = list(read_analysis_results(str(path)))
+
+        # Assert
+        assert results == [{"id_conversation": "conv-1", "summary": "hola"}, {"id_conversation": "conv-2"}]
+
+    def test_read_csv_empty_cells_are_missing(self, tmp_path):
+        """Verifica que en el CSV una celda vacia no sobrescriba el valor existente"""
+        # Arrange
+        path = tmp_path / "resultados.csv"
+        path.write_text('id_conversation,summary,reason\nconv-1,"hola, mundo",\n')
+
+        # Act
+        results = list(read_analysis_results(str(path)))
+
+        # Assert
+        assert results == [{"id_conversation": "conv-1", "summary": "hola, mundo", "reason": None}]
+
+    def test_read_jsonl_invalid_line(self, tmp_path):
+        """Verifica que una linea invalida indique su numero"""
+        # Arrange
+        path = tmp_path / "resultados.jsonl"
+        path.write_text('{"id_conversation": "conv-1"}\n{roto\n')
+
+        # Act & Assert
+        with pytest.raises(ValueError) as exc_info:
+            list(read_analysis_results(str(path)))
+
+        assert "Linea 2" in str(exc_info.value)
+
+    def test_load_analysis_results(self, tmp_path):
+        """Verifica que el archivo se aplique con el estado indicado"""
+        # Arrange
+        path = tmp_path / "resultados.jsonl"
+        path.write_text('{"id_conversation": "conv-1"}\n')
+        audio_db = Mock()
+        audio_db.apply_analysis_results.side_effect = lambda results, status: len(list(results))
+
+        # Act
+        updated = load_analysis_results(str(path), status="ANALYZED", audio_db=audio_db)
+
+        # Assert
+        assert updated == 1
+        assert audio_db.apply_analysis_results.call_args[1]["status"] == "ANALYZED"
@@ -2,13 +2,24 @@
 Pruebas unitarias para AudioExtractService
 """
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import ANY, Mock, patch, MagicMock
 from datetime import datetime, timedelta
 import pytz
 from src.service.audio_extract import AudioExtractService
-from src.repository.models.audio_model import AudioModel
 from src.repository.models.job_model import JobModel
 from PureCloudPlatformClientV2.rest import ApiException
+from src.integrations.genesys_async_jobs import AsyncJobError
+from src.integrations.genesys_integration import BatchSubmitError
+from src.repository.models.conversation_record import ConversationRecord
+from src.repository.models.job_checkpoint_model import JobCheckpointModel
+from src.service.extraction_checkpoint import ExtractionCheckpoint
+from src.repository.models.batch_model import BatchModel
+from src.utils.threads import TaskResult, execute_bounded
+from src.utils.content_store import ContentStore
+from src.integrations.recording_downloader import DownloadResult
+import hashlib
+import os
+import time
 
 
 class TestAudioExtractService:
@@ -37,13 +48,15 @@ class TestAudioExtractService:
         assert service.email_integration is not None
         mock_genesys_instance.authenticate.assert_called_once()
     
+    @patch('src.service.audio_extract.CheckpointRepository')
+    @patch('src.service.audio_extract.PartitionRepository')
     @patch('src.service.audio_extract.EmailIntegration')
     @patch('src.service.audio_extract.AudioRepository')
     @patch('src.service.audio_extract.JobRepository')
     @patch('src.service.audio_extract.BatchRepository')
     @patch('src.service.audio_extract.GenesysIntegration')
     def test_execute_no_conversations(self, mock_genesys, mock_batch_repo, 
-                                     mock_job_repo, mock_audio_repo, mock_email):
+                                     mock_job_repo, mock_audio_repo, mock_email, mock_partition_repo, mock_checkpoint_repo):
         """Verifica la ejecución cuando no hay conversaciones"""
         # Arrange
         mock_genesys_instance = Mock()
@@ -66,14 +79,17 @@ class TestAudioExtractService:
         # Assert
         mock_job_repo_instance.update_status.assert_called_once_with(1, "SUCCESS")
         mock_email_instance.send_email.assert_called_once()
+        mock_partition_repo.return_value.ensure_audio_partitions.assert_called_once()
     
+    @patch('src.service.audio_extract.CheckpointRepository')
+    @patch('src.service.audio_extract.PartitionRepository')
     @patch('src.service.audio_extract.EmailIntegration')
     @patch('src.service.audio_extract.AudioRepository')
     @patch('src.service.audio_extract.JobRepository')
     @patch('src.service.audio_extract.BatchRepository')
     @patch('src.service.audio_extract.GenesysIntegration')
     def test_execute_with_conversations(self, mock_genesys, mock_batch_repo,
-                                       mock_job_repo, mock_audio_repo, mock_email):
+                                       mock_job_repo, mock_audio_repo, mock_email, mock_partition_repo, mock_checkpoint_repo):
         """Verifica la ejecución con conversaciones disponibles"""
         # Arrange
         mock_genesys_instance = Mock()
@@ -83,9 +99,7 @@ class TestAudioExtractService:
         
         job = JobModel(id=1, creation_date=datetime.now(), status="PROCESSING")
         conversations = [
-            AudioModel(id_conversation="conv-1", status="PENDING",
-                      creation_date=datetime.now(), call_date=datetime.now(), 
-                      call_duration=60000)
+            ConversationRecord("conv-1", datetime.now(), 60000)
         ]
         
         service.get_audios_ids_by_date_range = Mock(return_value=(conversations, job))
@@ -95,7 +109,36 @@ class TestAudioExtractService:
         
         # Assert
         mock_genesys_instance.init_batch_download.assert_called_once()
-    
+
+    @patch('src.service.audio_extract.CheckpointRepository')
+    @patch('src.service.audio_extract.PartitionRepository')
+    @patch('src.service.audio_extract.EmailIntegration')
+    @patch('src.service.audio_extract.AudioRepository')
+    @patch('src.service.audio_extract.JobRepository')
+    @patch('src.service.audio_extract.BatchRepository')
+    @patch('src.service.audio_extract.GenesysIntegration')
+    def test_execute_collection_error_skips_submit(self, mock_genesys, mock_batch_repo,
+                                                   mock_job_repo, mock_audio_repo, mock_email,
+                                                   mock_partition_repo, mock_checkpoint_repo):
+        """Verifica que un error al obtener las conversaciones no envie batches, ni correo, ni marque SUCCESS"""
+        # Arrange
+        mock_genesys_instance = Mock()
+        mock_genesys.return_value = mock_genesys_instance
+
+        service = AudioExtractService()
+
+        job = JobModel(id=1, creation_date=datetime.now(), status="PROCESSING")
+        service.get_audios_ids_by_date_range = Mock(return_value=(None, job))
+
+        # Act
+        service.execute()
+
+        # Assert
+        mock_genesys_instance.init_batch_download.assert_not_called()
+        mock_job_repo.return_value.update_status.assert_not_called()
+        mock_email.return_value.send_email.assert_not_called()
+        mock_checkpoint_repo.return_value.mark_stage.assert_not_called()
+
     @patch('src.service.audio_extract.env')
     @patch('src.service.audio_extract.EmailIntegration')
     @patch('src.service.audio_extract.AudioRepository')
@@ -109,7 +152,11 @@ class TestAudioExtractService:
         """Verifica la obtención de IDs de audios por rango de fechas"""
         # Arrange
         mock_env.BATCH_SIZE = 10
+        mock_env.JOB_CHECKPOINTS = False
         mock_env.GENESYS_QUEUE_ID = "test-queue-id"
+        mock_env.GENESYS_PARALLEL_PAGING = False
+        mock_env.GENESYS_SHARD_MINUTES = 0
+        mock_env.GENESYS_ASYNC_JOBS_THRESHOLD = 0
         
         mock_genesys_instance = Mock()
         mock_genesys.return_value = mock_genesys_instance
@@ -150,7 +197,11 @@ class TestAudioExtractService:
         """Verifica que solo se incluyan conversaciones con agente"""
         # Arrange
         mock_env.BATCH_SIZE = 10
+        mock_env.JOB_CHECKPOINTS = False
         mock_env.GENESYS_QUEUE_ID = "test-queue-id"
+        mock_env.GENESYS_PARALLEL_PAGING = False
+        mock_env.GENESYS_SHARD_MINUTES = 0
+        mock_env.GENESYS_ASYNC_JOBS_THRESHOLD = 0
         
         # Crear conversación sin agente
         participant_no_agent = Mock()
@@ -207,10 +258,14 @@ class TestAudioExtractService:
     def test_get_audios_ids_api_exception(self, mock_genesys, mock_batch_repo,
                                           mock_job_repo, mock_audio_repo,
                                           mock_email, mock_env):
-        """Verifica el manejo de excepciones de la API"""
+        """Verifica que un error de la API sin checkpoint deje el job en ERROR y no devuelva conversaciones"""
         # Arrange
         mock_env.BATCH_SIZE = 10
+        mock_env.JOB_CHECKPOINTS = False
         mock_env.GENESYS_QUEUE_ID = "test-queue-id"
+        mock_env.GENESYS_PARALLEL_PAGING = False
+        mock_env.GENESYS_SHARD_MINUTES = 0
+        mock_env.GENESYS_ASYNC_JOBS_THRESHOLD = 0
         
         mock_genesys_instance = Mock()
         mock_genesys.return_value = mock_genesys_instance
@@ -233,9 +288,12 @@ class TestAudioExtractService:
         )
         
         # Assert
-        assert len(conversations) == 0
+        assert conversations is None
         assert returned_job.id == 1
+        mock_job_repo_instance.update_status.assert_called_once_with(1, "ERROR")
     
+    @patch('src.service.audio_extract.CheckpointRepository')
+    @patch('src.service.audio_extract.PartitionRepository')
     @patch('src.service.audio_extract.datetime')
     @patch('src.service.audio_extract.EmailIntegration')
     @patch('src.service.audio_extract.AudioRepository')
@@ -244,7 +302,7 @@ class TestAudioExtractService:
     @patch('src.service.audio_extract.GenesysIntegration')
     def test_execute_sunday_adjustment(self, mock_genesys, mock_batch_repo,
                                       mock_job_repo, mock_audio_repo, 
-                                      mock_email, mock_datetime):
+                                      mock_email, mock_datetime, mock_partition_repo, mock_checkpoint_repo):
         """Verifica que si es domingo, se procese el sábado anterior"""
         # Arrange
         lima_tz = pytz.timezone("America/Lima")
@@ -276,3 +334,988 @@ class TestAudioExtractService:
         # El sábado sería 2024-01-06
         assert "2024-01-06" in call_args[0]
 
+    @patch('src.service.audio_extract.env')
+    @patch('src.service.audio_extract.EmailIntegration')
+    @patch('src.service.audio_extract.AudioRepository')
+    @patch('src.service.audio_extract.JobRepository')
+    @patch('src.service.audio_extract.BatchRepository')
+    @patch('src.service.audio_extract.GenesysIntegration')
+    def test_get_audios_ids_parallel_paging(self, mock_genesys, mock_batch_repo,
+                                            mock_job_repo, mock_audio_repo,
+                                            mock_email, mock_env):
+        """Verifica que el modo paralelo pida todas las paginas y conserve el orden"""
+        # Arrange
+        mock_env.BATCH_SIZE = 2
+        mock_env.JOB_CHECKPOINTS = False
+        mock_env.GENESYS_QUEUE_ID = "test-queue-id"
+        mock_env.GENESYS_PARALLEL_PAGING = True
+        mock_env.GENESYS_SHARD_MINUTES = 0
+        mock_env.GENESYS_ASYNC_JOBS_THRESHOLD = 0
+        mock_env.GENESYS_PAGE_WORKERS = 3
+
+        base_date = datetime(2024, 1, 1, 8, 0, 0)
+
+        def build_page(page_number, size):
+            page = Mock()
+            page.total_hits = 5
+            conversations = []
+            for offset in range(size):
+                position = (page_number - 1) * 2 + offset
+                participant = Mock()
+                participant.purpose = "agent"
+                conv = Mock()
+                conv.conversation_id = f"conv-{position}"
+                conv.conversation_start = base_date + timedelta(minutes=position)
+                conv.participants = [participant]
+                conversations.append(conv)
+            page.conversations = conversations
+            return page
+
+        pages = {1: build_page(1, 2), 2: build_page(2, 2), 3: build_page(3, 1)}
+
+        def query_page(query):
+            return pages[query.paging["pageNumber"]]
+
+        mock_genesys_instance = Mock()
+        mock_genesys.return_value = mock_genesys_instance
+        mock_genesys_instance.analytics_api.post_analytics_conversations_details_query.side_effect = query_page
+        mock_genesys_instance.get_call_duration.return_value = 60000
+
+        mock_job_repo_instance = Mock()
+        mock_job_repo.return_value = mock_job_repo_instance
+        mock_job_repo_instance.insert.return_value = JobModel(id=1, creation_date=datetime.now(), status="PROCESSING")
+
+        service = AudioExtractService()
+
+        # Act
+        conversations, _ = service.get_audios_ids_by_date_range(
+            "2024-01-01T00:00:00",
+            "2024-01-01T23:59:59"
+        )
+
+        # Assert
+        assert [c.id_conversation for c in conversations] == [f"conv-{i}" for i in range(5)]
+        assert mock_genesys_instance.analytics_api.post_analytics_conversations_details_query.call_count == 3
+
+    @patch('src.service.audio_extract.env')
+    @patch('src.service.audio_extract.EmailIntegration')
+    @patch('src.service.audio_extract.AudioRepository')
+    @patch('src.service.audio_extract.JobRepository')
+    @patch('src.service.audio_extract.BatchRepository')
+    @patch('src.service.audio_extract.GenesysIntegration')
+    def test_get_audios_ids_parallel_paging_api_exception(self, mock_genesys, mock_batch_repo,
+                                                          mock_job_repo, mock_audio_repo,
+                                                          mock_email, mock_env,
+                                                          sample_conversation_response):
+        """Verifica que un error en una pagina paralela se maneje como en el modo secuencial"""
+        # Arrange
+        mock_env.BATCH_SIZE = 1
+        mock_env.JOB_CHECKPOINTS = False
+        mock_env.GENESYS_QUEUE_ID = "test-queue-id"
+        mock_env.GENESYS_PARALLEL_PAGING = True
+        mock_env.GENESYS_SHARD_MINUTES = 0
+        mock_env.GENESYS_ASYNC_JOBS_THRESHOLD = 0
+        mock_env.GENESYS_PAGE_WORKERS = 2
+
+        sample_conversation_response.total_hits = 3
+
+        def query_page(query):
+            if query.paging["pageNumber"] == 1:
+                return sample_conversation_response
+            raise ApiException("API Error")
+
+        mock_genesys_instance = Mock()
+        mock_genesys.return_value = mock_genesys_instance
+        mock_genesys_instance.analytics_api.post_analytics_conversations_details_query.side_effect = query_page
+
+        mock_job_repo_instance = Mock()
+        mock_job_repo.return_value = mock_job_repo_instance
+        mock_job_repo_instance.insert.return_value = JobModel(id=1, creation_date=datetime.now(), status="PROCESSING")
+
+        service = AudioExtractService()
+
+        # Act
+        conversations, returned_job = service.get_audios_ids_by_date_range(
+            "2024-01-01T00:00:00",
+            "2024-01-01T23:59:59"
+        )
+
+        # Assert
+        assert conversations is None
+        assert returned_job.id == 1
+
+    @patch('src.service.audio_extract.env')
+    @patch('src.service.audio_extract.EmailIntegration')
+    @patch('src.service.audio_extract.AudioRepository')
+    @patch('src.service.audio_extract.JobRepository')
+    @patch('src.service.audio_extract.BatchRepository')
+    @patch('src.service.audio_extract.GenesysIntegration')
+    def test_get_audios_ids_sharded_dedupes(self, mock_genesys, mock_batch_repo,
+                                            mock_job_repo, mock_audio_repo,
+                                            mock_email, mock_env):
+        """Verifica que el modo por shards consulte cada shard y elimine duplicados"""
+        # Arrange
+        mock_env.BATCH_SIZE = 10
+        mock_env.JOB_CHECKPOINTS = False
+        mock_env.GENESYS_QUEUE_ID = "test-queue-id"
+        mock_env.GENESYS_PARALLEL_PAGING = False
+        mock_env.GENESYS_SHARD_MINUTES = 360
+        mock_env.GENESYS_ASYNC_JOBS_THRESHOLD = 0
+        mock_env.GENESYS_SHARD_WORKERS = 4
+        mock_env.GENESYS_SHARD_MAX_HITS = 0
+
+        def build_conversation(conversation_id, start):
+            participant = Mock()
+            participant.purpose = "agent"
+            conv = Mock()
+            conv.conversation_id = conversation_id
+            conv.conversation_start = start
+            conv.participants = [participant]
+            return conv
+
+        def query_page(query):
+            shard_start = query.interval.split("/")[0]
+            page = Mock()
+            page.total_hits = 1
+            hour = int(shard_start[11:13])
+            # La conversacion "conv-cruce" cruza el limite entre el primer y segundo shard
+            if hour in (0, 6):
+                page.conversations = [build_conversation("conv-cruce", datetime(2024, 1, 1, 5, 59))]
+            else:
+                page.conversations = [build_conversation(f"conv-{hour}", datetime(2024, 1, 1, hour))]
+            return page
+
+        mock_genesys_instance = Mock()
+        mock_genesys.return_value = mock_genesys_instance
+        mock_genesys_instance.analytics_api.post_analytics_conversations_details_query.side_effect = query_page
+        mock_genesys_instance.get_call_duration.return_value = 60000
+
+        mock_job_repo_instance = Mock()
+        mock_job_repo.return_value = mock_job_repo_instance
+        mock_job_repo_instance.insert.return_value = JobModel(id=1, creation_date=datetime.now(), status="PROCESSING")
+
+        service = AudioExtractService()
+
+        # Act
+        conversations, _ = service.get_audios_ids_by_date_range(
+            "2024-01-01T00:00:00",
+            "2024-01-01T23:59:59"
+        )
+
+        # Assert
+        assert [c.id_conversation for c in conversations] == ["conv-cruce", "conv-12", "conv-18"]
+        assert mock_genesys_instance.analytics_api.post_analytics_conversations_details_query.call_count == 4
+
+    @patch('src.service.audio_extract.env')
+    @patch('src.service.audio_extract.EmailIntegration')
+    @patch('src.service.audio_extract.AudioRepository')
+    @patch('src.service.audio_extract.JobRepository')
+    @patch('src.service.audio_extract.BatchRepository')
+    @patch('src.service.audio_extract.GenesysIntegration')
+    def test_collect_shard_splits_when_too_many_hits(self, mock_genesys, mock_batch_repo,
+                                                     mock_job_repo, mock_audio_repo,
+                                                     mock_email, mock_env):
+        """Verifica que un shard con demasiadas conversaciones se divida en dos"""
+        # Arrange
+        mock_env.BATCH_SIZE = 10
+        mock_env.JOB_CHECKPOINTS = False
+        mock_env.GENESYS_PARALLEL_PAGING = False
+        mock_env.GENESYS_SHARD_MAX_HITS = 100
+        mock_env.GENESYS_SHARD_MIN_MINUTES = 30
+
+        intervals = []
+
+        def query_page(query):
+            intervals.append(query.interval)
+            page = Mock()
+            page.total_hits = 500 if query.interval.endswith("T02:00:00") and query.interval.startswith("2024-01-01T00") else 1
+            page.conversations = []
+            return page
+
+        mock_genesys_instance = Mock()
+        mock_genesys.return_value = mock_genesys_instance
+        mock_genesys_instance.analytics_api.post_analytics_conversations_details_query.side_effect = query_page
+
+        service = AudioExtractService()
+
+        # Act
+        service.collect_shard("2024-01-01T00:00:00/2024-01-01T02:00:00")
+
+        # Assert
+        assert intervals == [
+            "2024-01-01T00:00:00/2024-01-01T02:00:00",
+            "2024-01-01T00:00:00/2024-01-01T01:00:00",
+            "2024-01-01T01:00:00/2024-01-01T02:00:00",
+        ]
+
+    @patch('src.service.audio_extract.ConversationDetailsJobExtractor')
+    @patch('src.service.audio_extract.env')
+    @patch('src.service.audio_extract.EmailIntegration')
+    @patch('src.service.audio_extract.AudioRepository')
+    @patch('src.service.audio_extract.JobRepository')
+    @patch('src.service.audio_extract.BatchRepository')
+    @patch('src.service.audio_extract.GenesysIntegration')
+    def test_collect_conversations_uses_async_job_above_threshold(self, mock_genesys, mock_batch_repo,
+                                                                  mock_job_repo, mock_audio_repo,
+                                                                  mock_email, mock_env, mock_extractor,
+                                                                  sample_conversation_response):
+        """Verifica que se use el job asincrono cuando totalHits supera el umbral"""
+        # Arrange
+        mock_env.BATCH_SIZE = 10
+        mock_env.JOB_CHECKPOINTS = False
+        mock_env.GENESYS_ASYNC_JOBS_THRESHOLD = 1000
+        sample_conversation_response.total_hits = 5000
+
+        mock_genesys_instance = Mock()
+        mock_genesys.return_value = mock_genesys_instance
+        mock_genesys_instance.analytics_api.post_analytics_conversations_details_query.return_value = sample_conversation_response
+        mock_genesys_instance.get_call_duration.return_value = 60000
+
+        mock_extractor.return_value.extract.return_value = iter([sample_conversation_response.conversations])
+
+        service = AudioExtractService()
+
+        # Act
+        conversations = service.collect_conversations("2024-01-01T00:00:00/2024-01-01T23:59:59")
+
+        # Assert
+        assert [c.id_conversation for c in conversations] == ["conv-123"]
+        mock_extractor.assert_called_once()
+        assert mock_extractor.call_args[0][0] is mock_genesys_instance.analytics_api
+        mock_genesys_instance.analytics_api.post_analytics_conversations_details_query.assert_called_once()
+
+    @patch('src.service.audio_extract.ConversationDetailsJobExtractor')
+    @patch('src.service.audio_extract.env')
+    @patch('src.service.audio_extract.EmailIntegration')
+    @patch('src.service.audio_extract.AudioRepository')
+    @patch('src.service.audio_extract.JobRepository')
+    @patch('src.service.audio_extract.BatchRepository')
+    @patch('src.service.audio_extract.GenesysIntegration')
+    def test_collect_conversations_falls_back_when_async_job_fails(self, mock_genesys, mock_batch_repo,
+                                                                   mock_job_repo, mock_audio_repo,
+                                                                   mock_email, mock_env, mock_extractor,
+                                                                   sample_conversation_response):
+        """Verifica que si el job asincrono falla se continue con la consulta sincrona"""
+        # Arrange
+        mock_env.BATCH_SIZE = 10
+        mock_env.JOB_CHECKPOINTS = False
+        mock_env.GENESYS_ASYNC_JOBS_THRESHOLD = 1000
+        mock_env.GENESYS_SHARD_MINUTES = 0
+        mock_env.GENESYS_PARALLEL_PAGING = False
+        sample_conversation_response.total_hits = 5000
+
+        mock_genesys_instance = Mock()
+        mock_genesys.return_value = mock_genesys_instance
+        mock_genesys_instance.analytics_api.post_analytics_conversations_details_query.return_value = sample_conversation_response
+        mock_genesys_instance.get_call_duration.return_value = 60000
+
+        mock_extractor.return_value.extract.side_effect = AsyncJobError("El job job-1 termino en estado FAILED")
+
+        service = AudioExtractService()
+
+        # Act
+        conversations = service.collect_conversations("2024-01-01T00:00:00/2024-01-01T23:59:59")
+
+        # Assert
+        assert [c.id_conversation for c in conversations] == ["conv-123"]
+        mock_genesys_instance.analytics_api.post_analytics_conversations_details_query.assert_called_once()
+
+    @patch('src.service.audio_extract.env')
+    @patch('src.service.audio_extract.EmailIntegration')
+    @patch('src.service.audio_extract.AudioRepository')
+    @patch('src.service.audio_extract.JobRepository')
+    @patch('src.service.audio_extract.BatchRepository')
+    @patch('src.service.audio_extract.GenesysIntegration')
+    def test_execute_pipelined_submits_while_paging(self, mock_genesys, mock_batch_repo,
+                                                    mock_job_repo, mock_audio_repo,
+                                                    mock_email, mock_env):
+        """Verifica que en modo pipeline los batches se envien a medida que llegan las paginas"""
+        # Arrange
+        mock_env.BATCH_SIZE = 2
+        mock_env.JOB_CHECKPOINTS = False
+        mock_env.GENESYS_PIPELINE_QUEUE_SIZE = 2
+        mock_env.GENESYS_PARALLEL_PAGING = False
+        mock_env.GENESYS_SHARD_MINUTES = 0
+        mock_env.GENESYS_ASYNC_JOBS_THRESHOLD = 0
+
+        def build_page(ids):
+            page = Mock()
+            page.conversations = []
+            for conversation_id in ids:
+                participant = Mock()
+                participant.purpose = "agent"
+                page.conversations.append(Mock(conversation_id=conversation_id, conversation_start=datetime.now(),
+                                               participants=[participant]))
+            return page
+
+        pages = [build_page(["c1", "c2"]), build_page(["c3", "c4"]), build_page(["c5"])]
+        submitted = []
+
+        mock_genesys_instance = Mock()
+        mock_genesys.return_value = mock_genesys_instance
+        mock_genesys_instance.analytics_api.post_analytics_conversations_details_query.side_effect = pages
+        mock_genesys_instance.get_call_duration.return_value = 60000
+        mock_genesys_instance.submit_batch.side_effect = lambda batch, job, start_date: submitted.append(
+            [c.id_conversation for c in batch])
+        mock_genesys_instance.exclude_known_conversations.side_effect = lambda conversations: conversations
+
+        mock_job_repo_instance = Mock()
+        mock_job_repo.return_value = mock_job_repo_instance
+        mock_job_repo_instance.insert.return_value = JobModel(id=1, creation_date=datetime.now(), status="PROCESSING")
+
+        service = AudioExtractService()
+
+        # Act
+        service.execute_pipelined("2024-01-01T00:00:00", "2024-01-01T23:59:59")
+
+        # Assert
+        assert submitted == [["c1", "c2"], ["c3", "c4"], ["c5"]]
+        mock_job_repo_instance.update_status.assert_not_called()
+        mock_genesys_instance.init_batch_download.assert_not_called()
+
+    @patch('src.service.audio_extract.env')
+    @patch('src.service.audio_extract.EmailIntegration')
+    @patch('src.service.audio_extract.AudioRepository')
+    @patch('src.service.audio_extract.JobRepository')
+    @patch('src.service.audio_extract.BatchRepository')
+    @patch('src.service.audio_extract.GenesysIntegration')
+    def test_execute_pipelined_api_error_marks_job_error(self, mock_genesys, mock_batch_repo,
+                                                         mock_job_repo, mock_audio_repo,
+                                                         mock_email, mock_env):
+        """Verifica que un error de Genesys sin conversaciones enviadas no se informe como ejecucion vacia"""
+        # Arrange
+        mock_env.BATCH_SIZE = 2
+        mock_env.GENESYS_PIPELINE_QUEUE_SIZE = 2
+        mock_env.GENESYS_PARALLEL_PAGING = False
+        mock_env.GENESYS_SHARD_MINUTES = 0
+        mock_env.GENESYS_ASYNC_JOBS_THRESHOLD = 0
+
+        mock_genesys_instance = Mock()
+        mock_genesys.return_value = mock_genesys_instance
+        mock_genesys_instance.analytics_api.post_analytics_conversations_details_query.side_effect = ApiException(status=500)
+
+        mock_job_repo_instance = mock_job_repo.return_value
+        mock_job_repo_instance.insert.return_value = JobModel(id=1, creation_date=datetime.now(), status="PROCESSING")
+
+        service = AudioExtractService()
+
+        # Act
+        service.execute_pipelined("2024-01-01T00:00:00", "2024-01-01T23:59:59")
+
+        # Assert
+        mock_job_repo_instance.update_status.assert_called_once_with(1, "ERROR")
+        mock_email.return_value.send_email.assert_not_called()
+
+    @patch('src.service.audio_extract.env')
+    @patch('src.service.audio_extract.EmailIntegration')
+    @patch('src.service.audio_extract.AudioRepository')
+    @patch('src.service.audio_extract.JobRepository')
+    @patch('src.service.audio_extract.BatchRepository')
+    @patch('src.service.audio_extract.GenesysIntegration')
+    def test_execute_pipelined_consumer_error_marks_job_error(self, mock_genesys, mock_batch_repo,
+                                                              mock_job_repo, mock_audio_repo,
+                                                              mock_email, mock_env):
+        """Verifica que un error al enviar un batch en el consumidor deje el job en ERROR sin propagarse"""
+        # Arrange
+        mock_env.BATCH_SIZE = 1
+        mock_env.GENESYS_PIPELINE_QUEUE_SIZE = 2
+        mock_env.GENESYS_PARALLEL_PAGING = False
+        mock_env.GENESYS_SHARD_MINUTES = 0
+        mock_env.GENESYS_ASYNC_JOBS_THRESHOLD = 0
+
+        participant = Mock()
+        participant.purpose = "agent"
+        page = Mock()
+        page.conversations = [Mock(conversation_id="c1", conversation_start=datetime.now(), participants=[participant])]
+
+        mock_genesys_instance = Mock()
+        mock_genesys.return_value = mock_genesys_instance
+        mock_genesys_instance.analytics_api.post_analytics_conversations_details_query.side_effect = [page, Mock(conversations=[])]
+        mock_genesys_instance.get_call_duration.return_value = 60000
+        mock_genesys_instance.exclude_known_conversations.side_effect = lambda conversations: conversations
+        mock_genesys_instance.submit_batch.side_effect = ApiException(status=500)
+
+        mock_job_repo_instance = mock_job_repo.return_value
+        mock_job_repo_instance.insert.return_value = JobModel(id=1, creation_date=datetime.now(), status="PROCESSING")
+
+        service = AudioExtractService()
+
+        # Act
+        service.execute_pipelined("2024-01-01T00:00:00", "2024-01-01T23:59:59")
+
+        # Assert
+        mock_job_repo_instance.update_status.assert_called_once_with(1, "ERROR")
+        mock_email.return_value.send_email.assert_not_called()
+
+    @patch('src.service.audio_extract.PartitionRepository')
+    @patch('src.service.audio_extract.CheckpointRepository')
+    @patch('src.service.audio_extract.env')
+    @patch('src.service.audio_extract.EmailIntegration')
+    @patch('src.service.audio_extract.AudioRepository')
+    @patch('src.service.audio_extract.JobRepository')
+    @patch('src.service.audio_extract.BatchRepository')
+    @patch('src.service.audio_extract.GenesysIntegration')
+    def test_resume_collection_error_keeps_checkpoint(self, mock_genesys, mock_batch_repo,
+                                                      mock_job_repo, mock_audio_repo, mock_email,
+                                                      mock_env, mock_checkpoint_repo, mock_partition_repo):
+        """Verifica que un error al reanudar la extraccion deje el job en PROCESSING y en COLLECTING"""
+        # Arrange
+        mock_env.BATCH_SIZE = 2
+        mock_env.JOB_CHECKPOINTS = True
+        mock_env.TASK_QUEUE_MODE = False
+        mock_env.GENESYS_QUEUE_ID = "test-queue-id"
+        mock_env.GENESYS_PARALLEL_PAGING = False
+        mock_env.GENESYS_SHARD_MINUTES = 0
+        mock_env.GENESYS_ASYNC_JOBS_THRESHOLD = 0
+
+        mock_genesys_instance = Mock()
+        mock_genesys.return_value = mock_genesys_instance
+        mock_genesys_instance.analytics_api.post_analytics_conversations_details_query.side_effect = ApiException(status=500)
+
+        mock_job_repo.return_value.get.return_value = JobModel(id=7, creation_date=datetime.now(), status="PROCESSING")
+        checkpoint_repo = mock_checkpoint_repo.return_value
+        checkpoint_repo.get.return_value = JobCheckpointModel(
+            job_id=7, interval="2024-01-01T00:00:00/2024-01-01T23:59:59", stage="COLLECTING",
+            completed_shards=[], last_page=2)
+
+        service = AudioExtractService()
+
+        # Act
+        service.resume(7)
+
+        # Assert
+        checkpoint_repo.mark_stage.assert_not_called()
+        mock_job_repo.return_value.update_status.assert_not_called()
+        mock_genesys_instance.init_batch_download.assert_not_called()
+        mock_email.return_value.send_email.assert_not_called()
+
+    @patch('src.service.audio_extract.PartitionRepository')
+    @patch('src.service.audio_extract.CheckpointRepository')
+    @patch('src.service.audio_extract.env')
+    @patch('src.service.audio_extract.EmailIntegration')
+    @patch('src.service.audio_extract.AudioRepository')
+    @patch('src.service.audio_extract.JobRepository')
+    @patch('src.service.audio_extract.BatchRepository')
+    @patch('src.service.audio_extract.GenesysIntegration')
+    def test_resume_continues_after_last_page(self, mock_genesys, mock_batch_repo,
+                                              mock_job_repo, mock_audio_repo,
+                                              mock_email, mock_env, mock_checkpoint_repo, mock_partition_repo):
+        """Verifica que al reanudar se consulten solo las paginas posteriores al checkpoint"""
+        # Arrange
+        mock_env.BATCH_SIZE = 2
+        mock_env.JOB_CHECKPOINTS = True
+        mock_env.TASK_QUEUE_MODE = False
+        mock_env.GENESYS_QUEUE_ID = "test-queue-id"
+        mock_env.GENESYS_PARALLEL_PAGING = False
+        mock_env.GENESYS_SHARD_MINUTES = 0
+        mock_env.GENESYS_ASYNC_JOBS_THRESHOLD = 0
+
+        pages_queried = []
+
+        def query_page(query):
+            pages_queried.append(query.paging["pageNumber"])
+            participant = Mock()
+            participant.purpose = "agent"
+            page = Mock()
+            page.conversations = [Mock(conversation_id=f"conv-{query.paging['pageNumber']}",
+                                       conversation_start=datetime(2024, 1, 1), participants=[participant])]
+            return page
+
+        mock_genesys_instance = Mock()
+        mock_genesys.return_value = mock_genesys_instance
+        mock_genesys_instance.analytics_api.post_analytics_conversations_details_query.side_effect = query_page
+        mock_genesys_instance.get_call_duration.return_value = 60000
+
+        job = JobModel(id=7, creation_date=datetime.now(), status="PROCESSING")
+        mock_job_repo.return_value.get.return_value = job
+
+        stored = [ConversationRecord("conv-a", datetime(2024, 1, 1), 60000)]
+        checkpoint_repo = mock_checkpoint_repo.return_value
+        checkpoint_repo.get.return_value = JobCheckpointModel(
+            job_id=7, interval="2024-01-01T00:00:00/2024-01-01T23:59:59", stage="COLLECTING",
+            completed_shards=[], last_page=2)
+        checkpoint_repo.load_conversations.return_value = stored
+
+        service = AudioExtractService()
+
+        # Act
+        service.resume(7)
+
+        # Assert
+        assert pages_queried == [1, 3]
+        checkpoint_repo.save_progress.assert_called_once()
+        assert checkpoint_repo.save_progress.call_args.kwargs["last_page"] == 3
+        checkpoint_repo.mark_stage.assert_any_call(7, "SUBMITTING", None)
+        mock_genesys_instance.init_batch_download.assert_called_once_with(stored, job, "2024-01-01T00:00:00")
+        checkpoint_repo.mark_stage.assert_called_with(7, "SUBMITTED", expected_stage="SUBMITTING")
+
+    @patch('src.service.audio_extract.PartitionRepository')
+    @patch('src.service.audio_extract.CheckpointRepository')
+    @patch('src.service.audio_extract.EmailIntegration')
+    @patch('src.service.audio_extract.AudioRepository')
+    @patch('src.service.audio_extract.JobRepository')
+    @patch('src.service.audio_extract.BatchRepository')
+    @patch('src.service.audio_extract.GenesysIntegration')
+    def test_resume_submitting_uses_stored_conversations(self, mock_genesys, mock_batch_repo,
+                                                         mock_job_repo, mock_audio_repo,
+                                                         mock_email, mock_checkpoint_repo, mock_partition_repo):
+        """Verifica que un job con la extraccion terminada no vuelva a consultar Genesys"""
+        # Arrange
+        mock_genesys_instance = Mock()
+        mock_genesys.return_value = mock_genesys_instance
+
+        job = JobModel(id=7, creation_date=datetime.now(), status="PROCESSING")
+        mock_job_repo.return_value.get.return_value = job
+
+        stored = [ConversationRecord("conv-a", datetime(2024, 1, 1), 60000)]
+        checkpoint_repo = mock_checkpoint_repo.return_value
+        checkpoint_repo.get.return_value = JobCheckpointModel(
+            job_id=7, interval="2024-01-01T00:00:00/2024-01-01T23:59:59", stage="SUBMITTING",
+            completed_shards=[], last_page=5)
+        checkpoint_repo.load_conversations.return_value = stored
+
+        service = AudioExtractService()
+
+        # Act
+        service.resume(7)
+
+        # Assert
+        mock_genesys_instance.analytics_api.post_analytics_conversations_details_query.assert_not_called()
+        mock_genesys_instance.init_batch_download.assert_called_once_with(stored, job, "2024-01-01T00:00:00")
+
+    @patch('src.service.audio_extract.CheckpointRepository')
+    @patch('src.service.audio_extract.EmailIntegration')
+    @patch('src.service.audio_extract.AudioRepository')
+    @patch('src.service.audio_extract.JobRepository')
+    @patch('src.service.audio_extract.BatchRepository')
+    @patch('src.service.audio_extract.GenesysIntegration')
+    def test_resume_without_checkpoint(self, mock_genesys, mock_batch_repo,
+                                       mock_job_repo, mock_audio_repo,
+                                       mock_email, mock_checkpoint_repo):
+        """Verifica que un job sin checkpoint no se procese"""
+        # Arrange
+        mock_genesys_instance = Mock()
+        mock_genesys.return_value = mock_genesys_instance
+        mock_job_repo.return_value.get.return_value = JobModel(id=7, creation_date=datetime.now(), status="PROCESSING")
+        mock_checkpoint_repo.return_value.get.return_value = None
+
+        service = AudioExtractService()
+
+        # Act
+        service.resume(7)
+
+        # Assert
+        mock_genesys_instance.init_batch_download.assert_not_called()
+        mock_job_repo.return_value.update_status.assert_not_called()
+
+    @patch('src.service.audio_extract.env')
+    @patch('src.service.audio_extract.EmailIntegration')
+    @patch('src.service.audio_extract.AudioRepository')
+    @patch('src.service.audio_extract.JobRepository')
+    @patch('src.service.audio_extract.BatchRepository')
+    @patch('src.service.audio_extract.GenesysIntegration')
+    def test_collect_sharded_skips_completed_shards(self, mock_genesys, mock_batch_repo,
+                                                    mock_job_repo, mock_audio_repo,
+                                                    mock_email, mock_env):
+        """Verifica que los shards guardados en el checkpoint no se vuelvan a consultar"""
+        # Arrange
+        mock_env.BATCH_SIZE = 10
+        mock_env.GENESYS_PARALLEL_PAGING = False
+        mock_env.GENESYS_SHARD_MINUTES = 720
+        mock_env.GENESYS_SHARD_WORKERS = 2
+        mock_env.GENESYS_SHARD_MAX_HITS = 0
+
+        intervals = []
+
+        def query_page(query):
+            intervals.append(query.interval)
+            page = Mock()
+            page.total_hits = 0
+            page.conversations = []
+            return page
+
+        mock_genesys_instance = Mock()
+        mock_genesys.return_value = mock_genesys_instance
+        mock_genesys_instance.analytics_api.post_analytics_conversations_details_query.side_effect = query_page
+
+        checkpoint_repo = Mock()
+        checkpoint = ExtractionCheckpoint(checkpoint_repo, 1, "2024-01-01T00:00:00/2024-01-01T23:59:59", "COLLECTING",
+                                          completed_shards=["2024-01-01T00:00:00/2024-01-01T12:00:00"])
+
+        service = AudioExtractService()
+
+        # Act
+        service.collect_sharded("2024-01-01T00:00:00/2024-01-01T23:59:59", checkpoint=checkpoint)
+
+        # Assert
+        assert intervals == ["2024-01-01T12:00:00/2024-01-01T23:59:59"]
+        checkpoint_repo.save_progress.assert_called_once_with(1, [], shard="2024-01-01T12:00:00/2024-01-01T23:59:59")
+        assert checkpoint.shard_done("2024-01-01T12:00:00/2024-01-01T23:59:59")
+
+    def test_checkpoint_serializes_shard_writes(self):
+        """Verifica que los shards paralelos guarden el checkpoint de a uno (una conexion del pool)"""
+        # Arrange
+        active = []
+        overlaps = []
+
+        def save_progress(*args, **kwargs):
+            active.append(1)
+            overlaps.append(len(active))
+            time.sleep(0.01)
+            active.pop()
+
+        checkpoint_repo = Mock()
+        checkpoint_repo.save_progress.side_effect = save_progress
+        checkpoint = ExtractionCheckpoint(checkpoint_repo, 1, "2024-01-01T00:00:00/2024-01-01T23:59:59", "COLLECTING")
+        shards = [f"shard-{i}" for i in range(8)]
+
+        # Act
+        execute_bounded(lambda shard: checkpoint.record_shard(shard, []), shards, max_workers=4)
+
+        # Assert
+        assert max(overlaps) == 1
+        assert all(checkpoint.shard_done(shard) for shard in shards)
+
+    @patch('src.service.audio_extract.TaskQueueRepository')
+    @patch('src.service.audio_extract.env')
+    @patch('src.service.audio_extract.EmailIntegration')
+    @patch('src.service.audio_extract.AudioRepository')
+    @patch('src.service.audio_extract.JobRepository')
+    @patch('src.service.audio_extract.BatchRepository')
+    @patch('src.service.audio_extract.GenesysIntegration')
+    def test_enqueue_batches(self, mock_genesys, mock_batch_repo, mock_job_repo,
+                             mock_audio_repo, mock_email, mock_env, mock_task_queue):
+        """Verifica que las conversaciones nuevas se encolen como una tarea por batch"""
+        # Arrange
+        mock_env.BATCH_SIZE = 2
+        mock_env.TASK_MAX_ATTEMPTS = 5
+
+        mock_genesys_instance = Mock()
+        mock_genesys.return_value = mock_genesys_instance
+        mock_genesys_instance.exclude_known_conversations.side_effect = lambda conversations: conversations[1:]
+        mock_task_queue.return_value.enqueue.return_value = [1, 2]
+
+        conversations = [ConversationRecord(f"conv-{i}", datetime(2024, 1, 1, i), 60000) for i in range(5)]
+        job = JobModel(id=3, creation_date=datetime.now(), status="PROCESSING")
+        service = AudioExtractService()
+
+        # Act
+        task_ids = service.enqueue_batches(conversations, job, "2024-01-01T00:00:00")
+
+        # Assert
+        assert task_ids == [1, 2]
+        kind, payloads, max_attempts = mock_task_queue.return_value.enqueue.call_args[0]
+        assert kind == "SUBMIT_BATCH"
+        assert max_attempts == 5
+        assert [[c["id_conversation"] for c in p["conversations"]] for p in payloads] == [
+            ["conv-1", "conv-2"], ["conv-3", "conv-4"]
+        ]
+        assert payloads[0]["conversations"][0]["call_date"] == "2024-01-01T01:00:00"
+        assert all(p["job_id"] == 3 and p["start_date"] == "2024-01-01T00:00:00" for p in payloads)
+
+    @patch('src.service.audio_extract.PartitionRepository')
+    @patch('src.service.audio_extract.EmailIntegration')
+    @patch('src.service.audio_extract.AudioRepository')
+    @patch('src.service.audio_extract.JobRepository')
+    @patch('src.service.audio_extract.BatchRepository')
+    @patch('src.service.audio_extract.GenesysIntegration')
+    def test_handle_submit_batch(self, mock_genesys, mock_batch_repo, mock_job_repo,
+                                 mock_audio_repo, mock_email, mock_partition_repo):
+        """Verifica que el handler de la tarea envie a Genesys solo las conversaciones no registradas"""
+        # Arrange
+        mock_genesys_instance = Mock()
+        mock_genesys.return_value = mock_genesys_instance
+        mock_genesys_instance.exclude_known_conversations.side_effect = lambda conversations: conversations[1:]
+
+        payload = {
+            "job_id": 3,
+            "start_date": "2024-01-01T00:00:00",
+            "conversations": [
+                {"id_conversation": "conv-1", "call_date": "2024-01-01T01:00:00", "call_duration": 60000},
+                {"id_conversation": "conv-2", "call_date": None, "call_duration": 0},
+            ]
+        }
+        service = AudioExtractService()
+
+        # Act
+        service.handle_submit_batch(payload)
+
+        # Assert
+        batch, job, start_date = mock_genesys_instance.submit_batch.call_args[0]
+        assert [(c.id_conversation, c.call_date) for c in batch] == [("conv-2", None)]
+        assert job.id == 3
+        assert start_date == "2024-01-01T00:00:00"
+        assert mock_genesys_instance.submit_batch.call_args.kwargs["before_submit"] is None
+        mock_partition_repo.return_value.ensure_audio_partitions.assert_called_once_with(
+            datetime(2024, 1, 1), ANY)
+
+    @patch('src.service.audio_extract.PartitionRepository')
+    @patch('src.service.audio_extract.EmailIntegration')
+    @patch('src.service.audio_extract.AudioRepository')
+    @patch('src.service.audio_extract.JobRepository')
+    @patch('src.service.audio_extract.BatchRepository')
+    @patch('src.service.audio_extract.GenesysIntegration')
+    def test_handle_submit_batch_already_registered(self, mock_genesys, mock_batch_repo, mock_job_repo,
+                                                    mock_audio_repo, mock_email, mock_partition_repo):
+        """Verifica que un reintento de un batch ya registrado no lo vuelva a enviar"""
+        # Arrange
+        mock_genesys_instance = Mock()
+        mock_genesys.return_value = mock_genesys_instance
+        mock_genesys_instance.exclude_known_conversations.return_value = []
+
+        payload = {"job_id": 3, "start_date": "2024-01-01T00:00:00",
+                   "conversations": [{"id_conversation": "conv-1", "call_date": None, "call_duration": 0}]}
+        service = AudioExtractService()
+
+        # Act
+        service.handle_submit_batch(payload)
+
+        # Assert
+        mock_genesys_instance.submit_batch.assert_not_called()
+
+    @patch('src.service.audio_extract.PartitionRepository')
+    @patch('src.service.audio_extract.EmailIntegration')
+    @patch('src.service.audio_extract.AudioRepository')
+    @patch('src.service.audio_extract.JobRepository')
+    @patch('src.service.audio_extract.BatchRepository')
+    @patch('src.service.audio_extract.GenesysIntegration')
+    def test_handle_submit_batch_error_fails_task(self, mock_genesys, mock_batch_repo, mock_job_repo,
+                                                 mock_audio_repo, mock_email, mock_partition_repo):
+        """Verifica que un batch no registrado falle la tarea y que el envio consulte el lease del worker"""
+        # Arrange
+        mock_genesys_instance = Mock()
+        mock_genesys.return_value = mock_genesys_instance
+        mock_genesys_instance.exclude_known_conversations.side_effect = lambda conversations: conversations
+        mock_genesys_instance.submit_batch.side_effect = BatchSubmitError("No se pudo registrar el batch g-1")
+
+        payload = {"job_id": 3, "start_date": "2024-01-01T00:00:00",
+                   "conversations": [{"id_conversation": "conv-1", "call_date": None, "call_duration": 0}]}
+        service = AudioExtractService()
+        service.worker = Mock()
+
+        # Act & Assert
+        with pytest.raises(BatchSubmitError):
+            service.handle_submit_batch(payload)
+        assert mock_genesys_instance.submit_batch.call_args.kwargs["before_submit"] == service.worker.check_lease
+
+    @patch('src.service.audio_extract.RecordingBlobRepository')
+    @patch('src.service.audio_extract.RecordingDownloader')
+    @patch('src.service.audio_extract.env')
+    @patch('src.service.audio_extract.EmailIntegration')
+    @patch('src.service.audio_extract.AudioRepository')
+    @patch('src.service.audio_extract.JobRepository')
+    @patch('src.service.audio_extract.BatchRepository')
+    @patch('src.service.audio_extract.GenesysIntegration')
+    def test_download_batches_stores_and_indexes_recordings(self, mock_genesys, mock_batch_repo, mock_job_repo,
+                                                            mock_audio_repo, mock_email, mock_env,
+                                                            mock_downloader, mock_blob_repo, tmp_path):
+        """Verifica que las grabaciones descargadas pasen al almacen, se indexen y solo los batches completos cambien de estado"""
+        # Arrange
+        mock_env.AUDIO_STORE_DIR = str(tmp_path)
+        mock_env.DOWNLOAD_CHUNK_BYTES = 1024
+        mock_env.AUDIO_STORE_RETENTION_HOURS = 0
+        mock_env.AUDIO_STORE_MAX_BYTES = 0
+        mock_env.AUDIO_STORE_INCOMING_MAX_HOURS = 0
+
+        batch_db = mock_batch_repo.return_value
+        batch_db.get_by_status.return_value = [BatchModel(id=1, genesys_batch_id="g-1"),
+                                               BatchModel(id=2, genesys_batch_id="g-2")]
+        batch_db.transition_status_by_id.return_value = [1]
+
+        # La grabacion rec-known ya esta en el indice y en el almacen local
+        store = ContentStore(str(tmp_path))
+        known_file = tmp_path / "known.ogg"
+        known_file.write_bytes(b"known")
+        known_blob = store.put_file(str(known_file))
+        mock_blob_repo.return_value.get_by_recording_ids.return_value = {"rec-known": known_blob.sha256}
+
+        def batch_status(genesys_batch_id):
+            results = [Mock(conversation_id=f"conv-{genesys_batch_id}", recording_id=f"rec-{genesys_batch_id}",
+                            content_type="audio/ogg", result_url=f"https://genesys/{genesys_batch_id}"),
+                       Mock(conversation_id="conv-known", recording_id="rec-known", content_type="audio/ogg",
+                            result_url="https://genesys/known"),
+                       Mock(conversation_id="sin-url", recording_id="rec", content_type=None, result_url=None)]
+            return Mock(results=results)
+
+        def download_all(items):
+            results = []
+            for item in items:
+                if "g-2" in item.url:
+                    results.append(TaskResult(item, error=Exception("timeout")))
+                    continue
+                with open(item.path, "wb") as file:
+                    file.write(b"audio")
+                results.append(TaskResult(item, DownloadResult(item.path, 5, hashlib.sha256(b"audio").hexdigest())))
+            return results
+
+        mock_genesys_instance = Mock()
+        mock_genesys.return_value = mock_genesys_instance
+        mock_genesys_instance.recording_api.get_recording_batchrequest.side_effect = batch_status
+        mock_downloader.return_value.download_all.side_effect = download_all
+        os.makedirs(store.incoming_dir, exist_ok=True)
+
+        service = AudioExtractService()
+
+        # Act
+        updated = service.download_batches()
+
+        # Assert
+        assert updated == [1]
+        items = mock_downloader.return_value.download_all.call_args[0][0]
+        assert [item.url for item in items] == ["https://genesys/g-1", "https://genesys/g-2"]
+        assert items[0].path == os.path.join(store.incoming_dir, "conv-g-1_rec-g-1.ogg")
+        rows = mock_blob_repo.return_value.upsert.call_args[0][0]
+        assert rows == [{"id_conversation": "conv-g-1", "recording_id": "rec-g-1",
+                         "sha256": hashlib.sha256(b"audio").hexdigest(), "size": 5, "content_type": "audio/ogg"}]
+        assert store.contains(hashlib.sha256(b"audio").hexdigest())
+        batch_db.transition_status_by_id.assert_called_once_with([1], "DOWNLOADED", expected_status="PENDING DOWNLOAD")
+
+    @patch('src.service.audio_extract.RecordingBlobRepository')
+    @patch('src.service.audio_extract.RecordingDownloader')
+    @patch('src.service.audio_extract.env')
+    @patch('src.service.audio_extract.EmailIntegration')
+    @patch('src.service.audio_extract.AudioRepository')
+    @patch('src.service.audio_extract.JobRepository')
+    @patch('src.service.audio_extract.BatchRepository')
+    @patch('src.service.audio_extract.GenesysIntegration')
+    def test_download_batches_requeues_evicted_blobs(self, mock_genesys, mock_batch_repo, mock_job_repo,
+                                                     mock_audio_repo, mock_email, mock_env,
+                                                     mock_downloader, mock_blob_repo, tmp_path):
+        """Verifica que un blob eliminado con caracteristicas pendientes devuelva su batch a PENDING DOWNLOAD"""
+        # Arrange
+        mock_env.AUDIO_STORE_DIR = str(tmp_path)
+        mock_env.DOWNLOAD_CHUNK_BYTES = 1024
+        mock_env.AUDIO_STORE_RETENTION_HOURS = 1
+        mock_env.AUDIO_STORE_MAX_BYTES = 0
+        mock_env.AUDIO_STORE_INCOMING_MAX_HOURS = 1
+
+        store = ContentStore(str(tmp_path))
+        old_file = tmp_path / "old.ogg"
+        old_file.write_bytes(b"old")
+        old_blob = store.put_file(str(old_file))
+        os.utime(store.blob_path(old_blob.sha256), (1000, 1000))
+        os.makedirs(store.incoming_dir)
+        stale_part = os.path.join(store.incoming_dir, "conv-1_rec-1.ogg.part")
+        with open(stale_part, "wb") as file:
+            file.write(b"par")
+        os.utime(stale_part, (1000, 1000))
+
+        batch_db = mock_batch_repo.return_value
+        batch_db.get_by_status.return_value = []
+        batch_db.transition_status_by_id.side_effect = lambda ids, *args, **kwargs: list(ids)
+        mock_audio_repo.return_value.get_batches_pending_features.return_value = [7]
+        mock_blob_repo.return_value.clear_trim.return_value = 0
+        mock_downloader.return_value.download_all.return_value = []
+
+        service = AudioExtractService()
+
+        # Act
+        service.download_batches()
+
+        # Assert
+        assert not store.contains(old_blob.sha256)
+        mock_blob_repo.return_value.clear_trim.assert_called_once_with([old_blob.sha256])
+        mock_audio_repo.return_value.get_batches_pending_features.assert_called_once_with([old_blob.sha256], "DOWNLOADED")
+        batch_db.transition_status_by_id.assert_called_with([7], "PENDING DOWNLOAD", expected_status="DOWNLOADED")
+        assert not os.path.exists(stale_part)
+
+    @patch('src.service.audio_features.AudioFeatureExtractor')
+    @patch('src.service.audio_extract.RecordingBlobRepository')
+    @patch('src.service.audio_extract.env')
+    @patch('src.service.audio_extract.EmailIntegration')
+    @patch('src.service.audio_extract.AudioRepository')
+    @patch('src.service.audio_extract.JobRepository')
+    @patch('src.service.audio_extract.BatchRepository')
+    @patch('src.service.audio_extract.GenesysIntegration')
+    def test_extract_features_pages_and_saves_features(self, mock_genesys, mock_batch_repo, mock_job_repo,
+                                                       mock_audio_repo, mock_email, mock_env, mock_blob_repo,
+                                                       mock_extractor, tmp_path):
+        """Verifica que se procesen las paginas de audios pendientes y se guarden caracteristicas y errores"""
+        # Arrange
+        from src.service.audio_features import AudioFeatures, AudioFeatureError
+        mock_env.AUDIO_STORE_DIR = str(tmp_path)
+        mock_env.AUDIO_FEATURE_BATCH_SIZE = 3
+        mock_env.AUDIO_FEATURE_WORKERS = 0
+
+        store = ContentStore(str(tmp_path))
+        local = tmp_path / "conv-1.wav"
+        local.write_bytes(b"audio")
+        sha256 = store.put_file(str(local)).sha256
+
+        audio_db = mock_audio_repo.return_value
+        audio_db.get_pending_features.side_effect = [["conv-1", "conv-2", "conv-3"], []]
+        audio_db.apply_features.return_value = 2
+        # conv-3 tiene una grabacion que no esta en este nodo
+        mock_blob_repo.return_value.get_by_conversations.return_value = {
+            "conv-1": [sha256], "conv-2": [sha256], "conv-3": [sha256, "f" * 64],
+        }
+        features = AudioFeatures("conv-1", 4000, 0.5, -21.0, 0.0, [1000, 1000])
+        extractor = mock_extractor.return_value.__enter__.return_value
+        extractor.extract_all.return_value = [
+            TaskResult("conv-1", features),
+            TaskResult("conv-2", error=AudioFeatureError("El archivo no es un WAV (RIFF/WAVE)")),
+        ]
+
+        service = AudioExtractService()
+
+        # Act
+        updated = service.extract_features()
+
+        # Assert
+        assert updated == 2
+        assert mock_extractor.call_args.kwargs["workers"] is None
+        assert audio_db.get_pending_features.call_args_list[1][0] == ("DOWNLOADED", 3, "conv-3")
+        assert extractor.extract_all.call_args[0][0] == {"conv-1": [sha256], "conv-2": [sha256]}
+        rows = audio_db.apply_features.call_args[0][0]
+        assert rows == [features.to_row(),
+                        {"id_conversation": "conv-2", "features_error": "El archivo no es un WAV (RIFF/WAVE)"}]
+
+    @patch('src.service.audio_trimming.AudioTrimmer')
+    @patch('src.service.audio_extract.RecordingBlobRepository')
+    @patch('src.service.audio_extract.env')
+    @patch('src.service.audio_extract.EmailIntegration')
+    @patch('src.service.audio_extract.AudioRepository')
+    @patch('src.service.audio_extract.JobRepository')
+    @patch('src.service.audio_extract.BatchRepository')
+    @patch('src.service.audio_extract.GenesysIntegration')
+    def test_trim_silences_records_trims_and_errors(self, mock_genesys, mock_batch_repo, mock_job_repo,
+                                                    mock_audio_repo, mock_email, mock_env, mock_blob_repo,
+                                                    mock_trimmer, tmp_path):
+        """Verifica que solo se recorten los blobs locales y se registren recortes y errores"""
+        # Arrange
+        from src.service.audio_trimming import TrimResult
+        from src.service.audio_features import AudioFeatureError
+        mock_env.AUDIO_STORE_DIR = str(tmp_path)
+        mock_env.AUDIO_FEATURE_BATCH_SIZE = 3
+        mock_env.AUDIO_FEATURE_WORKERS = 2
+
+        store = ContentStore(str(tmp_path))
+        shas = []
+        for name in ("a.wav", "b.ogg"):
+            path = tmp_path / name
+            path.write_bytes(name.encode())
+            shas.append(store.put_file(str(path)).sha256)
+        blob_db = mock_blob_repo.return_value
+        blob_db.get_pending_trim.side_effect = [shas + ["f" * 64], []]
+
+        trim = TrimResult(shas[0], "e" * 64, 100, 40, [[0, 200, 1000]])
+        trimmer = mock_trimmer.return_value.__enter__.return_value
+        trimmer.trim_all.return_value = [
+            TaskResult(shas[0], trim),
+            TaskResult(shas[1], error=AudioFeatureError("El archivo no es un WAV (RIFF/WAVE)")),
+        ]
+
+        service = AudioExtractService()
+
+        # Act
+        trimmed = service.trim_silences()
+
+        # Assert
+        assert trimmed == 1
+        assert mock_trimmer.call_args.kwargs["workers"] == 2
+        assert trimmer.trim_all.call_args[0][0] == shas
+        assert blob_db.get_pending_trim.call_args_list[1][0] == (3, "f" * 64)
+        blob_db.apply_trim.assert_called_once_with([
+            trim.to_row(), {"sha256": shas[1], "trim_error": "El archivo no es un WAV (RIFF/WAVE)"},
+        ])
+        assert trim.bytes_saved == 60
@@ -0,0 +1,219 @@
+"""
+Pruebas del calculo de caracteristicas de audio con NumPy
+"""
+import io
+import math
+import struct
+import wave
+import numpy as np
+import pytest
+from src.service.audio_features import (
+    decode_wav, compute_stats, extract_features, AudioFeatures, AudioFeatureExtractor, AudioFeatureError,
+    AudioStats, FeatureParams, WAVE_FORMAT_MULAW, MIN_DBFS,
+)
+from src.utils.content_store import ContentStore
+
+SAMPLE_RATE = 8000
+
+
+def wav_bytes(samples: np.ndarray, sample_width: int = 2) -> bytes:
+    """WAV PCM a partir de muestras float (frames, canales) en [-1, 1]"""
+    scale = float(1 << (8 * sample_width - 1)) - 1
+    ints = np.round(samples * scale).astype(np.int64)
+    if sample_width == 3:
+        raw = b"".join(int(value).to_bytes(3, "little", signed=True) for value in ints.ravel())
+    else:
+        raw = ints.astype(f"<i{sample_width}").tobytes()
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as file:
+        file.setnchannels(samples.shape[1])
+        file.setsampwidth(sample_width)
+        file.setframerate(SAMPLE_RATE)
+        file.writeframes(raw)
+    return buffer.getvalue()
+
+
+def mulaw_wav_bytes(codes: bytes, channels: int = 1) -> bytes:
+    fmt = struct.pack("<HHIIHH", WAVE_FORMAT_MULAW, channels, SAMPLE_RATE, SAMPLE_RATE * channels, channels, 8)
+    body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"data" + struct.pack("<I", len(codes)) + codes
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def tone(seconds: float, amplitude: float = 0.5) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return amplitude * np.sin(2 * np.pi * 440 * t)
+
+
+def stereo_call() -> np.ndarray:
+    """1 s de tono en el canal 0, 1 s en el canal 1 y 2 s de silencio"""
+    silence = np.zeros(SAMPLE_RATE)
+    channel_0 = np.concatenate([tone(1), silence, silence, silence])
+    channel_1 = np.concatenate([silence, tone(1), silence, silence])
+    return np.stack([channel_0, channel_1], axis=1)
+
+
+class TestDecodeWav:
+    """Pruebas para decode_wav"""
+
+    def test_decode_pcm16_without_copy(self):
+        """Verifica que las muestras sean una vista sobre el buffer original"""
+        # Arrange
+        data = wav_bytes(stereo_call())
+
+        # Act
+        audio = decode_wav(data)
+
+        # Assert
+        assert audio.samples.shape == (4 * SAMPLE_RATE, 2)
+        assert audio.sample_rate == SAMPLE_RATE
+        assert not audio.samples.flags.owndata
+
+    def test_decode_pcm24(self):
+        """Verifica la conversion de muestras de 24 bits con signo"""
+        # Arrange
+        samples = np.array([[0.5], [-0.5], [0.0]])
+
+        # Act
+        audio = decode_wav(wav_bytes(samples, sample_width=3))
+
+        # Assert
+        np.testing.assert_allclose(audio.to_float(0, 3)[:, 0], [0.5, -0.5, 0.0], atol=1e-6)
+
+    def test_decode_mulaw(self):
+        """Verifica la decodificacion G.711 mu-law por tabla"""
+        # Arrange
+        data = mulaw_wav_bytes(bytes([0x80, 0x00, 0xFF]))
+
+        # Act
+        values = decode_wav(data).to_float(0, 3)[:, 0]
+
+        # Assert
+        np.testing.assert_allclose(values, [1.0, -1.0, 0.0])
+
+    def test_not_a_wav_raises(self):
+        """Verifica que un archivo que no es WAV (por ejemplo ogg) se rechace"""
+        with pytest.raises(AudioFeatureError):
+            decode_wav(b"OggS" + b"\x00" * 40)
+
+
+class TestComputeStats:
+    """Pruebas para compute_stats y AudioFeatures"""
+
+    def test_stereo_call_features(self):
+        """Verifica duracion, silencio, volumen y tiempo de habla por canal"""
+        # Arrange
+        audio = decode_wav(wav_bytes(stereo_call()))
+
+        # Act
+        features = AudioFeatures.from_stats("conv-1", compute_stats(audio, FeatureParams()))
+
+        # Assert
+        assert features.audio_duration_ms == 4000
+        assert features.silence_ratio == pytest.approx(0.5)
+        assert features.channel_talk_ms == [1000, 1000]
+        # Seno de amplitud 0.5 (rms^2 = 0.125) en 2 de las 8 senales de 1 s
+        assert features.rms_dbfs == pytest.approx(10 * math.log10(0.125 / 4), abs=0.01)
+        assert features.clipping_ratio == 0.0
+
+    def test_clipping_ratio(self):
+        """Verifica que las muestras a escala completa cuenten como saturadas"""
+        # Arrange
+        samples = np.clip(tone(1, amplitude=2.0), -1, 1)[:, None]
+        audio = decode_wav(wav_bytes(samples))
+
+        # Act
+        features = AudioFeatures.from_stats("conv-1", compute_stats(audio, FeatureParams()))
+
+        # Assert
+        assert 0.5 < features.clipping_ratio < 0.8
+
+    def test_stats_independent_of_block_size(self, monkeypatch):
+        """Verifica que procesar por bloques de frames de el mismo resultado que en un solo bloque"""
+        # Arrange
+        audio = decode_wav(wav_bytes(stereo_call()))
+        whole = compute_stats(audio, FeatureParams())
+        monkeypatch.setattr("src.service.audio_features.BLOCK_FRAMES", 7)
+
+        # Act
+        blocks = compute_stats(audio, FeatureParams())
+
+        # Assert
+        assert blocks.frames == whole.frames
+        assert blocks.silent_frames == whole.silent_frames
+        assert blocks.talk_ms == whole.talk_ms
+        assert blocks.sum_squares == pytest.approx(whole.sum_squares)
+
+    def test_digital_silence_uses_floor(self):
+        """Verifica que el silencio digital tenga rms_dbfs en el piso y silencio total"""
+        # Arrange
+        audio = decode_wav(wav_bytes(np.zeros((SAMPLE_RATE, 1))))
+
+        # Act
+        features = AudioFeatures.from_stats("conv-1", compute_stats(audio, FeatureParams()))
+
+        # Assert
+        assert features.rms_dbfs == MIN_DBFS
+        assert features.silence_ratio == 1.0
+        assert features.channel_talk_ms == [0]
+
+    def test_merge_sums_recordings(self):
+        """Verifica que las grabaciones de una conversacion se sumen por canal"""
+        # Arrange
+        mono = AudioStats(1000.0, 8000, 10.0, 0, 50, 25, (500.0,))
+        stereo = AudioStats(2000.0, 32000, 30.0, 4, 100, 40, (800.0, 300.0))
+
+        # Act
+        merged = mono.merge(stereo)
+
+        # Assert
+        assert merged == AudioStats(3000.0, 40000, 40.0, 4, 150, 65, (1300.0, 300.0))
+
+
+class TestExtractFeatures:
+    """Pruebas para extract_features y AudioFeatureExtractor"""
+
+    def store_wav(self, tmp_path, name, samples):
+        store = ContentStore(str(tmp_path))
+        path = tmp_path / name
+        path.write_bytes(wav_bytes(samples))
+        return store.put_file(str(path)).sha256
+
+    def test_extract_features_reads_blobs_from_store(self, tmp_path):
+        """Verifica que se lean todas las grabaciones de la conversacion desde el almacen"""
+        # Arrange
+        first = self.store_wav(tmp_path, "a.wav", stereo_call())
+        second = self.store_wav(tmp_path, "b.wav", np.zeros((SAMPLE_RATE, 2)))
+
+        # Act
+        features = extract_features(str(tmp_path), "conv-1", [first, second], FeatureParams())
+
+        # Assert
+        assert features.audio_duration_ms == 5000
+        assert features.silence_ratio == pytest.approx(3 / 5)
+        assert features.to_row()["channel_talk_ms"] == "[1000, 1000]"
+
+    def test_extract_features_invalid_recording(self, tmp_path):
+        """Verifica que una grabacion no decodificable se informe con AudioFeatureError"""
+        # Arrange
+        store = ContentStore(str(tmp_path))
+        path = tmp_path / "a.ogg"
+        path.write_bytes(b"OggS" + b"\x00" * 100)
+        sha256 = store.put_file(str(path)).sha256
+
+        # Act & Assert
+        with pytest.raises(AudioFeatureError, match=sha256):
+            extract_features(str(tmp_path), "conv-1", [sha256], FeatureParams())
+
+    def test_extractor_process_pool(self, tmp_path):
+        """Verifica el calculo en el pool de procesos con errores por conversacion"""
+        # Arrange
+        sha256 = self.store_wav(tmp_path, "a.wav", stereo_call())
+        recordings = {"conv-1": [sha256], "conv-2": ["0" * 64]}
+
+        # Act
+        with AudioFeatureExtractor(str(tmp_path), FeatureParams(), workers=2) as extractor:
+            results = {result.item: result for result in extractor.extract_all(recordings)}
+
+        # Assert
+        assert results["conv-1"].value.audio_duration_ms == 4000
+        assert isinstance(results["conv-2"].error, FileNotFoundError)
@@ -4,7 +4,8 @@ Pruebas unitarias para AudioRepository
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 from datetime import datetime
-from src.repository.audio_repository import AudioRepository
+from sqlalchemy.dialects import postgresql
+from src.repository.audio_repository import AudioRepository, RESULTS_STAGE_COLUMNS
 from src.repository.models.audio_model import AudioModel
 
 
@@ -12,7 +13,7 @@ class TestAudioRepository:
     """Pruebas para AudioRepository"""
     
     @patch('src.repository.audio_repository.Session')
-    @patch('src.repository.audio_repository.engine')
+    @patch('src.repository.audio_repository.get_engine')
     def test_get_audio_success(self, mock_engine, mock_session_class, sample_audio_model):
         """Verifica que se pueda obtener un audio por ID de conversación"""
         # Arrange
@@ -31,7 +32,7 @@ class TestAudioRepository:
         mock_session.query.assert_called_once_with(AudioModel)
     
     @patch('src.repository.audio_repository.Session')
-    @patch('src.repository.audio_repository.engine')
+    @patch('src.repository.audio_repository.get_engine')
     def test_get_audio_not_found(self, mock_engine, mock_session_class):
         """Verifica el comportamiento cuando no se encuentra un audio"""
         # Arrange
@@ -48,7 +49,7 @@ class TestAudioRepository:
         assert result is None
     
     @patch('src.repository.audio_repository.Session')
-    @patch('src.repository.audio_repository.engine')
+    @patch('src.repository.audio_repository.get_engine')
     def test_insert_audio_success(self, mock_engine, mock_session_class, sample_audio_model):
         """Verifica que se pueda insertar un audio correctamente"""
         # Arrange
@@ -67,7 +68,7 @@ class TestAudioRepository:
         mock_session.refresh.assert_called_once_with(sample_audio_model)
     
     @patch('src.repository.audio_repository.Session')
-    @patch('src.repository.audio_repository.engine')
+    @patch('src.repository.audio_repository.get_engine')
     def test_insert_audio_exception(self, mock_engine, mock_session_class, sample_audio_model):
         """Verifica el manejo de excepciones al insertar un audio"""
         # Arrange
@@ -84,7 +85,7 @@ class TestAudioRepository:
         assert "Database error" in str(exc_info.value)
     
     @patch('src.repository.audio_repository.Session')
-    @patch('src.repository.audio_repository.engine')
+    @patch('src.repository.audio_repository.get_engine')
     def test_delete_audio_success(self, mock_engine, mock_session_class, sample_audio_model):
         """Verifica que se pueda eliminar un audio correctamente"""
         # Arrange
@@ -102,7 +103,7 @@ class TestAudioRepository:
         mock_session.commit.assert_called_once()
     
     @patch('src.repository.audio_repository.Session')
-    @patch('src.repository.audio_repository.engine')
+    @patch('src.repository.audio_repository.get_engine')
     def test_delete_audio_exception(self, mock_engine, mock_session_class, sample_audio_model):
         """Verifica el manejo de excepciones al eliminar un audio"""
         # Arrange
@@ -118,3 +119,226 @@ class TestAudioRepository:
         # Assert
         assert result is False
 
+
+    @patch('src.repository.audio_repository.Session')
+    @patch('src.repository.audio_repository.get_engine')
+    def test_get_existing_ids_single_query(self, mock_engine, mock_session_class):
+        """Verifica que los ids existentes se obtengan con una sola consulta ANY(array)"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        mock_session.execute.return_value.scalars.return_value = iter(["conv-1"])
+
+        repo = AudioRepository()
+
+        # Act
+        result = repo.get_existing_ids(["conv-1", "conv-2"])
+
+        # Assert
+        assert result == {"conv-1"}
+        mock_session.execute.assert_called_once()
+        statement = str(mock_session.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert "id_conversation = ANY (" in statement
+
+    @patch('src.repository.audio_repository.Session')
+    @patch('src.repository.audio_repository.get_engine')
+    def test_get_existing_ids_empty(self, mock_engine, mock_session_class):
+        """Verifica que una lista vacia no abra sesion"""
+        # Arrange
+        repo = AudioRepository()
+
+        # Act
+        result = repo.get_existing_ids([])
+
+        # Assert
+        assert result == set()
+        mock_session_class.assert_not_called()
+
+    @patch('src.repository.audio_repository.Session')
+    @patch('src.repository.audio_repository.get_engine')
+    def test_apply_analysis_results_single_update(self, mock_engine, mock_session_class):
+        """Verifica que los resultados se carguen con COPY a una tabla temporal y se apliquen con un solo UPDATE"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        cursor = mock_session.connection.return_value.connection.cursor.return_value
+        copied = {}
+        cursor.copy_expert.side_effect = lambda statement, stream: copied.update(data=stream.read())
+        cursor.rowcount = 2
+        results = [
+            {"id_conversation": "conv-1", "summary": "Consulta, sin \"reclamo\"", "reason": "Consulta"},
+            {"id_conversation": "conv-2", "typification": "Venta", "status": "REVIEW"},
+        ]
+
+        repo = AudioRepository()
+
+        # Act
+        updated = repo.apply_analysis_results(results)
+
+        # Assert
+        assert updated == 2
+        statements = [call[0][0] for call in cursor.execute.call_args_list]
+        assert statements[0].startswith("CREATE TEMP TABLE audio_results_stage")
+        assert "ON COMMIT DROP" in statements[0]
+        assert statements[1].startswith("UPDATE audios_sac.audio AS a SET")
+        assert "status = COALESCE(s.status, %(status)s)" in statements[1]
+        assert "WHERE a.id_conversation = s.id_conversation" in statements[1]
+        assert cursor.execute.call_args_list[1][0][1] == {"status": "SUCCESS"}
+        lines = copied["data"].splitlines()
+        assert len(lines) == 2
+        assert lines[0].startswith('"conv-1","Consulta",,"Consulta, sin ""reclamo"""')
+        assert lines[1].endswith('"REVIEW"')
+        mock_session.commit.assert_called_once()
+
+    @patch('src.repository.audio_repository.Session')
+    @patch('src.repository.audio_repository.get_engine')
+    def test_apply_analysis_results_keeps_last_duplicate(self, mock_engine, mock_session_class):
+        """Verifica que un id_conversation repetido en el archivo se aplique una vez, con su ultima linea"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        cursor = mock_session.connection.return_value.connection.cursor.return_value
+        copied = {}
+        cursor.copy_expert.side_effect = lambda statement, stream: copied.update(data=stream.read())
+        cursor.rowcount = 1
+        results = [
+            {"id_conversation": "conv-1", "reason": "Primera"},
+            {"id_conversation": "conv-1", "reason": "Ultima"},
+        ]
+
+        repo = AudioRepository()
+
+        # Act
+        repo.apply_analysis_results(results)
+
+        # Assert
+        create, update = [call[0][0] for call in cursor.execute.call_args_list]
+        assert "line bigint GENERATED ALWAYS AS IDENTITY" in create
+        assert ("FROM (SELECT DISTINCT ON (id_conversation) * FROM audio_results_stage "
+                "ORDER BY id_conversation, line DESC) AS s") in update
+        # line no viaja en el archivo: la numeracion sigue el orden del COPY
+        assert "line" not in RESULTS_STAGE_COLUMNS
+        assert copied["data"].splitlines() == ['"conv-1","Primera",,,,,,,,,', '"conv-1","Ultima",,,,,,,,,']
+
+    @patch('src.repository.audio_repository.Session')
+    @patch('src.repository.audio_repository.get_engine')
+    def test_apply_analysis_results_exception(self, mock_engine, mock_session_class):
+        """Verifica que un error en la carga se propague sin commit"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        cursor = mock_session.connection.return_value.connection.cursor.return_value
+        cursor.copy_expert.side_effect = Exception("Database error")
+
+        repo = AudioRepository()
+
+        # Act & Assert
+        with pytest.raises(Exception):
+            repo.apply_analysis_results([{"id_conversation": "conv-1"}])
+
+        mock_session.commit.assert_not_called()
+
+    @patch('src.repository.audio_repository.Session')
+    @patch('src.repository.audio_repository.get_engine')
+    def test_get_pending_features(self, mock_engine, mock_session_class):
+        """Verifica la consulta paginada por id_conversation de los audios sin caracteristicas"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        mock_session.execute.return_value.scalars.return_value = iter(["conv-3", "conv-4"])
+
+        repo = AudioRepository()
+
+        # Act
+        ids = repo.get_pending_features("DOWNLOADED", limit=2, after="conv-2")
+
+        # Assert
+        assert ids == ["conv-3", "conv-4"]
+        statement = str(mock_session.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert "JOIN audios_sac.batch ON audios_sac.audio.batch_id = audios_sac.batch.id" in statement
+        assert "audios_sac.audio.audio_duration_ms IS NULL" in statement
+        assert "audios_sac.audio.features_error IS NULL" in statement
+        assert "audios_sac.audio.id_conversation > %(id_conversation_1)s" in statement
+        assert "ORDER BY audios_sac.audio.id_conversation" in statement
+
+    @patch('src.repository.audio_repository.Session')
+    @patch('src.repository.audio_repository.get_engine')
+    def test_get_batches_pending_features(self, mock_engine, mock_session_class):
+        """Verifica la consulta de los batches cuyos blobs eliminados aun no tienen caracteristicas"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        mock_session.execute.return_value.scalars.return_value = iter([7])
+
+        repo = AudioRepository()
+
+        # Act
+        batch_ids = repo.get_batches_pending_features(["sha-1", "sha-2"], "DOWNLOADED")
+
+        # Assert
+        assert batch_ids == [7]
+        query = mock_session.execute.call_args[0][0]
+        statement = str(query.compile(dialect=postgresql.dialect()))
+        assert statement.startswith("SELECT DISTINCT audios_sac.audio.batch_id")
+        assert "JOIN audios_sac.recording_blob ON audios_sac.recording_blob.id_conversation = audios_sac.audio.id_conversation" in statement
+        assert "audios_sac.recording_blob.sha256 = ANY (" in statement
+        assert "audios_sac.audio.audio_duration_ms IS NULL" in statement
+        assert query.compile().params["sha256s"] == ["sha-1", "sha-2"]
+
+    def test_get_batches_pending_features_empty(self):
+        """Verifica que sin blobs eliminados no se consulte la base"""
+        assert AudioRepository().get_batches_pending_features([], "DOWNLOADED") == []
+
+    @patch('src.repository.audio_repository.Session')
+    @patch('src.repository.audio_repository.get_engine')
+    def test_apply_features_single_update(self, mock_engine, mock_session_class):
+        """Verifica que las caracteristicas se carguen con COPY y se apliquen con un solo UPDATE"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        cursor = mock_session.connection.return_value.connection.cursor.return_value
+        copied = {}
+        cursor.copy_expert.side_effect = lambda statement, stream: copied.update(data=stream.read())
+        cursor.rowcount = 2
+        features = [
+            {"id_conversation": "conv-1", "audio_duration_ms": 4000, "silence_ratio": 0.5, "rms_dbfs": -21.0,
+             "clipping_ratio": 0.0, "channel_talk_ms": "[1000, 1000]"},
+            {"id_conversation": "conv-2", "features_error": "El archivo no es un WAV (RIFF/WAVE)"},
+        ]
+
+        repo = AudioRepository()
+
+        # Act
+        updated = repo.apply_features(features)
+
+        # Assert
+        assert updated == 2
+        statements = [call[0][0] for call in cursor.execute.call_args_list]
+        assert statements[0].startswith("CREATE TEMP TABLE audio_features_stage")
+        assert "channel_talk_ms = s.channel_talk_ms" in statements[1]
+        assert "WHERE a.id_conversation = s.id_conversation" in statements[1]
+        lines = copied["data"].splitlines()
+        assert lines[0] == '"conv-1","4000","0.5","-21.0","0.0","[1000, 1000]",'
+        assert lines[1] == '"conv-2",,,,,,"El archivo no es un WAV (RIFF/WAVE)"'
+        mock_session.commit.assert_called_once()
+
+    @patch('src.repository.audio_repository.Session')
+    @patch('src.repository.audio_repository.get_engine')
+    def test_transition_status_by_batch(self, mock_engine, mock_session_class):
+        """Verifica que los audios de varios batches cambien de estado en una sola sentencia"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        mock_session.execute.return_value.scalars.return_value = iter([10, 11, 12])
+
+        repo = AudioRepository()
+
+        # Act
+        updated = repo.transition_status_by_batch([1, 2], "DOWNLOADED", expected_status="PENDING")
+
+        # Assert
+        assert updated == [10, 11, 12]
+        statement = str(mock_session.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert "audios_sac.audio.batch_id = ANY (" in statement
+        assert statement.endswith("RETURNING audios_sac.audio.id")
+        mock_session.commit.assert_called_once()
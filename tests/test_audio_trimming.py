@@ -0,0 +1,149 @@
+"""
+Pruebas del recorte de silencios por energia
+"""
+import io
+import wave
+import numpy as np
+import pytest
+from src.service.audio_features import decode_wav, AudioFeatureError
+from src.service.audio_trimming import (
+    keep_segments, frame_activity, offset_map, trim_blob, AudioTrimmer, TrimParams, TRIM_SUFFIX,
+)
+from src.utils.content_store import ContentStore
+
+SAMPLE_RATE = 8000
+
+
+def wav_bytes(samples: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as file:
+        file.setnchannels(samples.shape[1])
+        file.setsampwidth(2)
+        file.setframerate(SAMPLE_RATE)
+        file.writeframes(np.round(samples * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def tone(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return 0.5 * np.sin(2 * np.pi * 440 * t)
+
+
+def silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLE_RATE))
+
+
+def call_with_silences() -> np.ndarray:
+    """2 s de silencio, 1 s de voz, pausa corta de 0.5 s, 1 s de voz, espera de 5 s, 1 s de voz y 3 s de silencio"""
+    return np.concatenate([silence(2), tone(1), silence(0.5), tone(1), silence(5), tone(1), silence(3)])[:, None]
+
+
+def store_wav(tmp_path, samples):
+    store = ContentStore(str(tmp_path))
+    path = tmp_path / "call.wav"
+    path.write_bytes(wav_bytes(samples))
+    return store, store.put_file(str(path)).sha256
+
+
+class TestKeepSegments:
+    """Pruebas para keep_segments y frame_activity"""
+
+    def test_long_silences_are_cut_with_padding(self):
+        """Verifica que solo se corten los silencios largos y se conserve el padding junto a la voz"""
+        # Arrange: 10 frames de silencio, 5 de voz, 3 de pausa corta, 5 de voz y 10 de silencio
+        active = np.array([False] * 10 + [True] * 5 + [False] * 3 + [True] * 5 + [False] * 10)
+
+        # Act
+        segments = keep_segments(active, min_silence_frames=5, padding_frames=2)
+
+        # Assert
+        assert segments == [(8, 25)]
+
+    def test_all_silence_keeps_nothing(self):
+        """Verifica que un audio sin voz quede vacio"""
+        assert keep_segments(np.zeros(100, dtype=bool), min_silence_frames=5, padding_frames=2) == []
+
+    def test_no_long_silence_keeps_everything(self):
+        """Verifica que sin silencios largos se conserve el audio completo"""
+        active = np.array([True, False, False, True])
+
+        assert keep_segments(active, min_silence_frames=5, padding_frames=1) == [(0, 4)]
+
+    def test_frame_activity_independent_of_block_size(self, monkeypatch):
+        """Verifica que la actividad por frame no dependa del tamano de bloque"""
+        # Arrange
+        audio = decode_wav(wav_bytes(call_with_silences()))
+        whole = frame_activity(audio, 160, -45)
+        monkeypatch.setattr("src.service.audio_features.BLOCK_FRAMES", 7)
+
+        # Act
+        blocks = frame_activity(audio, 160, -45)
+
+        # Assert
+        np.testing.assert_array_equal(blocks, whole)
+
+    def test_offset_map(self):
+        """Verifica el mapa de tiempos del audio recortado al original"""
+        assert offset_map([(8, 25), (40, 50)], frame_ms=20) == [[0, 160, 340], [340, 800, 200]]
+
+
+class TestTrimBlob:
+    """Pruebas para trim_blob y AudioTrimmer"""
+
+    def test_trim_blob_writes_compacted_wav(self, tmp_path):
+        """Verifica el WAV recortado, el mapa de tiempos y los bytes ahorrados"""
+        # Arrange
+        store, sha256 = store_wav(tmp_path, call_with_silences())
+
+        # Act
+        result = trim_blob(str(tmp_path), sha256, TrimParams())
+
+        # Assert
+        assert result.offsets == [[0, 1800, 2900], [2900, 9300, 1400]]
+        assert result.bytes_saved == result.size - result.trimmed_size > 0
+        with wave.open(store.blob_path(result.trimmed_sha256)) as file:
+            assert file.getnframes() == 4.3 * SAMPLE_RATE
+            assert file.getnchannels() == 1
+        assert not list((tmp_path / "incoming").glob(f"*{TRIM_SUFFIX}"))
+
+    def test_trimmed_samples_are_copied_unchanged(self, tmp_path):
+        """Verifica que los segmentos conservados tengan los mismos bytes que el original"""
+        # Arrange
+        samples = call_with_silences()
+        store, sha256 = store_wav(tmp_path, samples)
+
+        # Act
+        result = trim_blob(str(tmp_path), sha256, TrimParams())
+
+        # Assert
+        original = np.round(samples[:, 0] * 32767).astype("<i2")
+        with wave.open(store.blob_path(result.trimmed_sha256)) as file:
+            trimmed = np.frombuffer(file.readframes(file.getnframes()), dtype="<i2")
+        start, length = result.offsets[1][1] * 8, result.offsets[1][2] * 8
+        np.testing.assert_array_equal(trimmed[-length:], original[start:start + length])
+
+    def test_trim_blob_invalid_recording(self, tmp_path):
+        """Verifica que una grabacion no decodificable se informe sin dejar archivos temporales"""
+        # Arrange
+        store = ContentStore(str(tmp_path))
+        path = tmp_path / "a.ogg"
+        path.write_bytes(b"OggS" + b"\x00" * 100)
+        sha256 = store.put_file(str(path)).sha256
+
+        # Act & Assert
+        with pytest.raises(AudioFeatureError, match=sha256):
+            trim_blob(str(tmp_path), sha256, TrimParams())
+        assert not list((tmp_path / "incoming").glob(f"*{TRIM_SUFFIX}"))
+
+    def test_trimmer_process_pool(self, tmp_path):
+        """Verifica el recorte en el pool de procesos"""
+        # Arrange
+        _, sha256 = store_wav(tmp_path, call_with_silences())
+
+        # Act
+        with AudioTrimmer(str(tmp_path), TrimParams(), workers=2) as trimmer:
+            results = trimmer.trim_all([sha256])
+
+        # Assert
+        assert results[0].ok
+        assert results[0].value.to_row()["trim_offsets"] == [[0, 1800, 2900], [2900, 9300, 1400]]
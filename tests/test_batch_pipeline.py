@@ -0,0 +1,99 @@
+"""
+Pruebas unitarias para BatchPipeline
+"""
+import pytest
+from unittest.mock import Mock
+from src.service.batch_pipeline import BatchPipeline
+
+
+def conversations(*ids):
+    return [Mock(id_conversation=conversation_id) for conversation_id in ids]
+
+
+class TestBatchPipeline:
+    """Pruebas para BatchPipeline"""
+
+    def test_cuts_batches_across_pages(self):
+        """Verifica que se armen batches del tamano configurado entre paginas"""
+        # Arrange
+        submitted = []
+        pipeline = BatchPipeline(lambda batch: submitted.append([c.id_conversation for c in batch]), batch_size=3)
+
+        # Act
+        pipeline.start()
+        pipeline.put(conversations("c1", "c2"))
+        pipeline.put(conversations("c3", "c4"))
+        pipeline.put(conversations("c5", "c6", "c7"))
+        pipeline.close()
+
+        # Assert
+        assert submitted == [["c1", "c2", "c3"], ["c4", "c5", "c6"], ["c7"]]
+        assert pipeline.total == 7
+        assert pipeline.batches == 3
+
+    def test_skips_repeated_conversations(self):
+        """Verifica que una conversacion repetida entre shards se envie una sola vez"""
+        # Arrange
+        submitted = []
+        pipeline = BatchPipeline(lambda batch: submitted.extend(c.id_conversation for c in batch), batch_size=10)
+
+        # Act
+        pipeline.start()
+        pipeline.put(conversations("c1", "c2"))
+        pipeline.put(conversations("c2", "c3"))
+        pipeline.close()
+
+        # Assert
+        assert submitted == ["c1", "c2", "c3"]
+
+    def test_consumer_error_is_raised_on_close(self):
+        """Verifica que un error del consumidor se propague al cerrar el pipeline"""
+        # Arrange
+        pipeline = BatchPipeline(Mock(side_effect=ValueError("fallo en genesys")), batch_size=1)
+
+        # Act
+        pipeline.start()
+        pipeline.put(conversations("c1"))
+
+        # Assert
+        with pytest.raises(ValueError):
+            pipeline.close()
+
+    def test_malformed_page_does_not_block_producer(self):
+        """Verifica que un error fuera de submit_batch no deje al productor bloqueado"""
+        # Arrange
+        submit_batch = Mock()
+        pipeline = BatchPipeline(submit_batch, batch_size=10, queue_size=1)
+
+        # Act
+        pipeline.start()
+        pipeline.put([object()])
+        # El productor sigue pudiendo entregar paginas mientras el consumidor vacia la cola
+        for _ in range(5):
+            try:
+                pipeline.put(conversations("c1"))
+            except RuntimeError:
+                break
+
+        # Assert
+        with pytest.raises(AttributeError):
+            pipeline.close()
+        submit_batch.assert_not_called()
+
+    def test_exclude_known_runs_before_batching(self):
+        """Verifica que las conversaciones ya registradas se descarten antes de armar batches"""
+        # Arrange
+        submitted = []
+        exclude_known = Mock(side_effect=lambda page: [c for c in page if c.id_conversation != "c2"])
+        pipeline = BatchPipeline(lambda batch: submitted.append([c.id_conversation for c in batch]), batch_size=2,
+                                 exclude_known=exclude_known)
+
+        # Act
+        pipeline.start()
+        pipeline.put(conversations("c1", "c2", "c3"))
+        pipeline.put(conversations("c4"))
+        pipeline.close()
+
+        # Assert
+        assert submitted == [["c1", "c3"], ["c4"]]
+        assert exclude_known.call_count == 2
@@ -12,7 +12,7 @@ class TestBatchRepository:
     """Pruebas para BatchRepository"""
     
     @patch('src.repository.batch_repository.Session')
-    @patch('src.repository.batch_repository.engine')
+    @patch('src.repository.batch_repository.get_engine')
     def test_insert_batch_success(self, mock_engine, mock_session_class, sample_batch_model):
         """Verifica que se pueda insertar un batch correctamente"""
         # Arrange
@@ -31,7 +31,7 @@ class TestBatchRepository:
         mock_session.refresh.assert_called_once_with(sample_batch_model)
     
     @patch('src.repository.batch_repository.Session')
-    @patch('src.repository.batch_repository.engine')
+    @patch('src.repository.batch_repository.get_engine')
     def test_insert_batch_exception(self, mock_engine, mock_session_class, sample_batch_model):
         """Verifica el manejo de excepciones al insertar un batch"""
         # Arrange
@@ -48,7 +48,7 @@ class TestBatchRepository:
         assert result is None
     
     @patch('src.repository.batch_repository.Session')
-    @patch('src.repository.batch_repository.engine')
+    @patch('src.repository.batch_repository.get_engine')
     def test_update_status_success(self, mock_engine, mock_session_class, sample_batch_model):
         """Verifica que se pueda actualizar el estado de un batch"""
         # Arrange
@@ -68,7 +68,7 @@ class TestBatchRepository:
         mock_session.refresh.assert_called_once_with(sample_batch_model)
     
     @patch('src.repository.batch_repository.Session')
-    @patch('src.repository.batch_repository.engine')
+    @patch('src.repository.batch_repository.get_engine')
     def test_update_status_batch_not_found(self, mock_engine, mock_session_class):
         """Verifica el comportamiento cuando el batch no existe"""
         # Arrange
@@ -85,7 +85,7 @@ class TestBatchRepository:
         assert result is False
     
     @patch('src.repository.batch_repository.Session')
-    @patch('src.repository.batch_repository.engine')
+    @patch('src.repository.batch_repository.get_engine')
     def test_update_status_exception(self, mock_engine, mock_session_class, sample_batch_model):
         """Verifica el manejo de excepciones al actualizar el estado"""
         # Arrange
@@ -103,7 +103,7 @@ class TestBatchRepository:
         assert result is False
     
     @patch('src.repository.batch_repository.Session')
-    @patch('src.repository.batch_repository.engine')
+    @patch('src.repository.batch_repository.get_engine')
     def test_delete_batch_success(self, mock_engine, mock_session_class, sample_batch_model):
         """Verifica que se pueda eliminar un batch correctamente"""
         # Arrange
@@ -121,7 +121,7 @@ class TestBatchRepository:
         mock_session.commit.assert_called_once()
     
     @patch('src.repository.batch_repository.Session')
-    @patch('src.repository.batch_repository.engine')
+    @patch('src.repository.batch_repository.get_engine')
     def test_delete_batch_exception(self, mock_engine, mock_session_class, sample_batch_model):
         """Verifica el manejo de excepciones al eliminar un batch"""
         # Arrange
@@ -137,3 +137,133 @@ class TestBatchRepository:
         # Assert
         assert result is False
 
+    @patch('src.repository.batch_repository.UnitOfWork')
+    def test_insert_with_audios_links_batch_id(self, mock_uow_class, sample_batch_model):
+        """Verifica que el batch y sus audios se guarden en la misma unidad de trabajo"""
+        # Arrange
+        uow = MagicMock()
+        mock_uow_class.return_value.__enter__.return_value = uow
+        uow.add_audios.return_value = [10, 11]
+        audios = [{"id_conversation": "conv-1"}, {"id_conversation": "conv-2"}]
+        sample_batch_model.audios_count = 2
+
+        repo = BatchRepository()
+
+        # Act
+        result = repo.insert_with_audios(sample_batch_model, audios)
+
+        # Assert
+        assert result is sample_batch_model
+        uow.add.assert_called_once_with(sample_batch_model)
+        rows = uow.add_audios.call_args[0][0]
+        assert [row["batch_id"] for row in rows] == [1, 1]
+        assert sample_batch_model.audios_count == 2
+
+    @patch('src.repository.batch_repository.UnitOfWork')
+    def test_insert_with_audios_adjusts_count_on_conflict(self, mock_uow_class, sample_batch_model):
+        """Verifica que audios_count refleje solo los audios insertados cuando alguno ya existia"""
+        # Arrange
+        uow = MagicMock()
+        mock_uow_class.return_value.__enter__.return_value = uow
+        uow.add_audios.return_value = [10]
+        sample_batch_model.audios_count = 2
+
+        repo = BatchRepository()
+
+        # Act
+        result = repo.insert_with_audios(sample_batch_model, [{"id_conversation": "conv-1"}, {"id_conversation": "conv-2"}])
+
+        # Assert
+        assert result is sample_batch_model
+        assert sample_batch_model.audios_count == 1
+
+    @patch('src.repository.batch_repository.UnitOfWork')
+    def test_insert_with_audios_exception(self, mock_uow_class, sample_batch_model):
+        """Verifica que un error en la transaccion se propague para reintentar el envio"""
+        # Arrange
+        uow = MagicMock()
+        mock_uow_class.return_value.__enter__.return_value = uow
+        uow.add_audios.side_effect = Exception("Database error")
+
+        repo = BatchRepository()
+
+        # Act & Assert
+        with pytest.raises(Exception, match="Database error"):
+            repo.insert_with_audios(sample_batch_model, [{"id_conversation": "conv-1"}])
+
+
+    @patch('src.repository.batch_repository.Session')
+    @patch('src.repository.batch_repository.get_engine')
+    def test_transition_status_single_statement(self, mock_engine, mock_session_class):
+        """Verifica que varios batches cambien de estado con una sola sentencia y un commit"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        mock_session.execute.return_value.scalars.return_value = iter(["gemini-1"])
+
+        repo = BatchRepository()
+
+        # Act
+        updated = repo.transition_status(["gemini-1", "gemini-2"], "SUCCESS", expected_status="PROCESSING")
+
+        # Assert
+        assert updated == ["gemini-1"]
+        mock_session.execute.assert_called_once()
+        mock_session.query.assert_not_called()
+        mock_session.commit.assert_called_once()
+
+    @patch('src.repository.batch_repository.Session')
+    @patch('src.repository.batch_repository.get_engine')
+    def test_transition_status_exception(self, mock_engine, mock_session_class):
+        """Verifica que un error devuelva una lista vacia"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        mock_session.execute.side_effect = Exception("Database error")
+
+        repo = BatchRepository()
+
+        # Act
+        updated = repo.transition_status_by_id([1], "FAILED")
+
+        # Assert
+        assert updated == []
+
+    @patch('src.repository.batch_repository.Session')
+    @patch('src.repository.batch_repository.get_engine')
+    def test_transition_status_by_id_sets_end_date(self, mock_engine, mock_session_class):
+        """Verifica que la transicion registre end_date en la misma sentencia"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        mock_session.execute.return_value.scalars.return_value = iter([1, 2])
+        end_date = datetime(2024, 1, 1, 12)
+
+        repo = BatchRepository()
+
+        # Act
+        updated = repo.transition_status_by_id([1, 2], "PENDING DOWNLOAD", expected_status="PENDING GENESYS",
+                                               end_date=end_date)
+
+        # Assert
+        assert updated == [1, 2]
+        statement = mock_session.execute.call_args[0][0]
+        assert statement.compile().params["end_date"] == end_date
+        mock_session.commit.assert_called_once()
+
+    @patch('src.repository.batch_repository.Session')
+    @patch('src.repository.batch_repository.get_engine')
+    def test_get_by_status_exception(self, mock_engine, mock_session_class):
+        """Verifica que un error al listar batches devuelva una lista vacia"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        mock_session.query.side_effect = Exception("Database error")
+
+        repo = BatchRepository()
+
+        # Act
+        batches = repo.get_by_status("PENDING GENESYS")
+
+        # Assert
+        assert batches == []
@@ -0,0 +1,143 @@
+"""
+Pruebas unitarias para BatchStatusPoller
+"""
+import pytest
+from unittest.mock import Mock
+from datetime import datetime, timedelta
+from src.repository.models.batch_model import BatchModel
+from src.service.batch_status_poller import (
+    BatchStatusPoller, next_poll_delay, PENDING_DOWNLOAD, ERROR_GENESYS, PENDING_GENESYS
+)
+
+
+class FakeClock:
+    """Reloj manual: sleep avanza el tiempo sin esperar"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def job_status(expected, results, errors=0):
+    return Mock(expected_result_count=expected, result_count=results, error_count=errors)
+
+
+def build_poller(recording_api, batch_db, clock, max_age=3600):
+    return BatchStatusPoller(recording_api, batch_db, min_delay=10, max_delay=300, age_scale=1800,
+                             max_age=max_age, workers=4, clock=clock, sleep=clock.sleep)
+
+
+class TestNextPollDelay:
+    """Pruebas para next_poll_delay"""
+
+    def test_backoff_without_progress(self):
+        """Verifica que la espera crezca mientras el batch no avanza"""
+        delays = [next_poll_delay(0.0, 0, idle, 10, 300, 1800) for idle in range(4)]
+
+        assert delays == sorted(delays)
+        assert delays[1] == 2 * delays[0]
+
+    def test_almost_finished_polls_at_min_delay(self):
+        """Verifica que un batch casi terminado se consulte con la espera minima"""
+        assert next_poll_delay(0.95, 0, 0, 10, 300, 1800) == 10
+
+    def test_older_batches_poll_less_often(self):
+        """Verifica que un batch antiguo se consulte con menos frecuencia"""
+        assert next_poll_delay(0.5, 7200, 0, 10, 300, 1800) > next_poll_delay(0.5, 0, 0, 10, 300, 1800)
+
+    def test_delay_is_capped(self):
+        """Verifica el limite maximo de espera"""
+        assert next_poll_delay(0.0, 86400, 10, 10, 300, 1800) == 300
+
+
+class TestBatchStatusPoller:
+    """Pruebas para BatchStatusPoller"""
+
+    def test_run_moves_finished_batches_in_bulk(self):
+        """Verifica que los batches terminados se actualicen con un UPDATE por estado"""
+        # Arrange
+        clock = FakeClock()
+        statuses = {
+            "g-1": [job_status(2, 2)],
+            "g-2": [job_status(2, 0, 2)],
+            "g-3": [job_status(4, 1), job_status(4, 3), job_status(4, 4)],
+        }
+        recording_api = Mock()
+        recording_api.get_recording_batchrequest.side_effect = lambda batch_id: statuses[batch_id].pop(0)
+        batch_db = Mock()
+        batch_db.transition_status_by_id.side_effect = lambda ids, status, expected_status, end_date: ids
+
+        poller = build_poller(recording_api, batch_db, clock)
+        poller.track([BatchModel(id=i, genesys_batch_id=f"g-{i}", start_date=datetime.now()) for i in (1, 2, 3)])
+
+        # Act
+        finished = poller.run()
+
+        # Assert
+        assert finished == {PENDING_DOWNLOAD: [1, 3], ERROR_GENESYS: [2]}
+        assert recording_api.get_recording_batchrequest.call_count == 5
+        first_update = batch_db.transition_status_by_id.call_args_list[0]
+        assert first_update.args == ([1], PENDING_DOWNLOAD)
+        assert first_update.kwargs["expected_status"] == PENDING_GENESYS
+        assert len(clock.sleeps) == 2
+
+    def test_unfinished_batch_expires(self):
+        """Verifica que un batch que no termina pase a ERROR GENESYS al superar la espera maxima"""
+        # Arrange
+        clock = FakeClock()
+        recording_api = Mock()
+        recording_api.get_recording_batchrequest.return_value = job_status(2, 0)
+        batch_db = Mock()
+        batch_db.transition_status_by_id.side_effect = lambda ids, status, expected_status, end_date: ids
+
+        poller = build_poller(recording_api, batch_db, clock, max_age=600)
+        poller.track([BatchModel(id=1, genesys_batch_id="g-1", start_date=datetime.now())])
+
+        # Act
+        finished = poller.run()
+
+        # Assert
+        assert finished == {ERROR_GENESYS: [1]}
+        assert clock.now > 600
+        # La espera entre consultas crece mientras el batch no avanza
+        assert clock.sleeps == sorted(clock.sleeps)
+
+    def test_api_error_backs_off(self):
+        """Verifica que un error de la API reprograme el batch con una espera mayor"""
+        # Arrange
+        clock = FakeClock()
+        recording_api = Mock()
+        recording_api.get_recording_batchrequest.side_effect = [Exception("Genesys error"), job_status(1, 1)]
+        batch_db = Mock()
+        batch_db.transition_status_by_id.side_effect = lambda ids, status, expected_status, end_date: ids
+
+        poller = build_poller(recording_api, batch_db, clock)
+        poller.track([BatchModel(id=1, genesys_batch_id="g-1", start_date=datetime.now())])
+
+        # Act
+        finished = poller.run()
+
+        # Assert
+        assert finished == {PENDING_DOWNLOAD: [1]}
+        assert clock.sleeps == [pytest.approx(next_poll_delay(0.0, 0, 1, 10, 300, 1800))]
+
+    def test_track_uses_batch_age(self):
+        """Verifica que la antiguedad del batch se tome de start_date"""
+        # Arrange
+        clock = FakeClock()
+        clock.now = 10000
+        poller = build_poller(Mock(), Mock(), clock)
+
+        # Act
+        poller.track([BatchModel(id=1, genesys_batch_id="g-1", start_date=datetime.now() - timedelta(hours=1))])
+
+        # Assert
+        tracked = poller.heap[0][2]
+        assert 3590 <= clock.now - tracked.started_at <= 3610
@@ -0,0 +1,155 @@
+"""
+Pruebas unitarias para CheckpointRepository
+"""
+import pytest
+from unittest.mock import patch, MagicMock
+from datetime import datetime
+from sqlalchemy.dialects import postgresql
+from src.repository.checkpoint_repository import CheckpointRepository, COLLECTING, SUBMITTING, SUBMITTED
+from src.repository.models.job_checkpoint_model import JobCheckpointModel
+from src.repository.models.conversation_record import ConversationRecord
+
+
+class TestCheckpointRepository:
+    """Pruebas para CheckpointRepository"""
+
+    @patch('src.repository.checkpoint_repository.Session')
+    @patch('src.repository.checkpoint_repository.get_engine')
+    def test_start(self, mock_engine, mock_session_class):
+        """Verifica que el checkpoint se cree en la etapa COLLECTING sin avance"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+
+        repo = CheckpointRepository()
+
+        # Act
+        checkpoint = repo.start(1, "2024-01-01T00:00:00/2024-01-01T23:59:59")
+
+        # Assert
+        assert checkpoint.stage == COLLECTING
+        assert checkpoint.completed_shards == []
+        assert checkpoint.last_page == 0
+        mock_session.add.assert_called_once_with(checkpoint)
+        mock_session.commit.assert_called_once()
+
+    @patch('src.repository.checkpoint_repository.Session')
+    @patch('src.repository.checkpoint_repository.get_engine')
+    def test_save_progress_with_shard(self, mock_engine, mock_session_class):
+        """Verifica que las conversaciones y el shard se guarden en la misma transaccion"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        checkpoint = JobCheckpointModel(job_id=1, stage=COLLECTING, completed_shards=["shard-1"], last_page=0)
+        mock_session.get.return_value = checkpoint
+
+        conversations = [ConversationRecord("conv-1", datetime(2024, 1, 1), 60000)]
+        repo = CheckpointRepository()
+
+        # Act
+        repo.save_progress(1, conversations, shard="shard-2")
+
+        # Assert
+        statement, rows = mock_session.execute.call_args[0]
+        compiled = str(statement.compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (job_id, id_conversation) DO NOTHING" in compiled
+        assert rows == [{"job_id": 1, "id_conversation": "conv-1", "call_date": datetime(2024, 1, 1), "call_duration": 60000}]
+        assert checkpoint.completed_shards == ["shard-1", "shard-2"]
+        assert mock_session.get.call_args.kwargs["with_for_update"] is True
+        mock_session.commit.assert_called_once()
+
+    @patch('src.repository.checkpoint_repository.Session')
+    @patch('src.repository.checkpoint_repository.get_engine')
+    def test_save_progress_with_page_and_no_conversations(self, mock_engine, mock_session_class):
+        """Verifica que una pagina sin conversaciones solo actualice el avance"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        checkpoint = JobCheckpointModel(job_id=1, stage=COLLECTING, completed_shards=[], last_page=2)
+        mock_session.get.return_value = checkpoint
+
+        repo = CheckpointRepository()
+
+        # Act
+        repo.save_progress(1, [], last_page=3)
+
+        # Assert
+        mock_session.execute.assert_not_called()
+        assert checkpoint.last_page == 3
+        mock_session.commit.assert_called_once()
+
+    @patch('src.repository.checkpoint_repository.Session')
+    @patch('src.repository.checkpoint_repository.get_engine')
+    def test_save_progress_exception(self, mock_engine, mock_session_class):
+        """Verifica que un error al guardar el avance se propague"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        mock_session.get.side_effect = Exception("Database error")
+
+        repo = CheckpointRepository()
+
+        # Act & Assert
+        with pytest.raises(Exception):
+            repo.save_progress(1, [], last_page=1)
+        mock_session.commit.assert_not_called()
+
+    @patch('src.repository.checkpoint_repository.Session')
+    @patch('src.repository.checkpoint_repository.get_engine')
+    def test_mark_stage_submitted_deletes_conversations(self, mock_engine, mock_session_class):
+        """Verifica que al pasar a SUBMITTED se eliminen las conversaciones del checkpoint"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        checkpoint = JobCheckpointModel(job_id=1, stage=SUBMITTING)
+        mock_session.get.return_value = checkpoint
+
+        repo = CheckpointRepository()
+
+        # Act
+        changed = repo.mark_stage(1, SUBMITTED, expected_stage=SUBMITTING)
+
+        # Assert
+        assert changed is True
+        assert checkpoint.stage == SUBMITTED
+        assert "DELETE FROM audios_sac.job_conversation" in str(mock_session.execute.call_args[0][0])
+        mock_session.commit.assert_called_once()
+
+    @patch('src.repository.checkpoint_repository.Session')
+    @patch('src.repository.checkpoint_repository.get_engine')
+    def test_mark_stage_skips_unexpected_stage(self, mock_engine, mock_session_class):
+        """Verifica que un checkpoint en otra etapa no cambie (extraccion incompleta)"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        checkpoint = JobCheckpointModel(job_id=1, stage=COLLECTING)
+        mock_session.get.return_value = checkpoint
+
+        repo = CheckpointRepository()
+
+        # Act
+        changed = repo.mark_stage(1, SUBMITTED, expected_stage=SUBMITTING)
+
+        # Assert
+        assert changed is False
+        assert checkpoint.stage == COLLECTING
+        mock_session.commit.assert_not_called()
+
+    @patch('src.repository.checkpoint_repository.Session')
+    @patch('src.repository.checkpoint_repository.get_engine')
+    def test_load_conversations(self, mock_engine, mock_session_class):
+        """Verifica que las conversaciones guardadas se devuelvan como ConversationRecord"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        mock_session.execute.return_value = [("conv-1", datetime(2024, 1, 1), 60000)]
+
+        repo = CheckpointRepository()
+
+        # Act
+        conversations = repo.load_conversations(1)
+
+        # Assert
+        assert [(c.id_conversation, c.call_date, c.call_duration) for c in conversations] == [
+            ("conv-1", datetime(2024, 1, 1), 60000)
+        ]
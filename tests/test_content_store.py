@@ -0,0 +1,142 @@
+"""
+Pruebas de ContentStore sobre un directorio temporal
+"""
+import hashlib
+import os
+from src.utils.content_store import ContentStore
+
+
+def write(path, content):
+    with open(path, "wb") as file:
+        file.write(content)
+    return str(path)
+
+
+class TestContentStore:
+    """Pruebas para ContentStore"""
+
+    def test_put_file_moves_file_to_blob_path(self, tmp_path):
+        """Verifica que el archivo se mueva a blobs/<sha[:2]>/<sha>"""
+        # Arrange
+        store = ContentStore(str(tmp_path))
+        path = write(tmp_path / "conv-1.ogg", b"audio-1")
+        sha256 = hashlib.sha256(b"audio-1").hexdigest()
+
+        # Act
+        blob = store.put_file(path)
+
+        # Assert
+        assert blob.sha256 == sha256
+        assert blob.size == 7
+        assert not blob.deduplicated
+        assert store.blob_path(sha256) == os.path.join(str(tmp_path), "blobs", sha256[:2], sha256)
+        assert store.contains(sha256)
+        assert not os.path.exists(path)
+
+    def test_put_file_deduplicates_same_content(self, tmp_path):
+        """Verifica que un contenido repetido reutilice el blob existente"""
+        # Arrange
+        store = ContentStore(str(tmp_path))
+        first = store.put_file(write(tmp_path / "conv-1.ogg", b"audio"))
+        path = write(tmp_path / "conv-2.ogg", b"audio")
+
+        # Act
+        second = store.put_file(path)
+
+        # Assert
+        assert second.sha256 == first.sha256
+        assert second.deduplicated
+        assert not os.path.exists(path)
+        assert len(store.list_blobs()) == 1
+
+    def test_open_maps_blob_read_only(self, tmp_path):
+        """Verifica que el blob se lea por rangos desde el mapeo"""
+        # Arrange
+        store = ContentStore(str(tmp_path))
+        blob = store.put_file(write(tmp_path / "conv-1.ogg", b"0123456789"))
+
+        # Act
+        with store.open(blob.sha256) as data:
+            view = memoryview(data)
+            chunk = bytes(view[2:5])
+            view.release()
+
+        # Assert
+        assert chunk == b"234"
+
+    def test_open_empty_blob(self, tmp_path):
+        """Verifica que un blob vacio se lea sin mmap"""
+        # Arrange
+        store = ContentStore(str(tmp_path))
+        blob = store.put_file(write(tmp_path / "empty.ogg", b""))
+
+        # Act
+        with store.open(blob.sha256) as data:
+            content = bytes(data)
+
+        # Assert
+        assert content == b""
+
+    def test_evict_removes_expired_blobs(self, tmp_path):
+        """Verifica que se eliminen solo los blobs sin uso en el periodo de retencion"""
+        # Arrange
+        store = ContentStore(str(tmp_path))
+        old = store.put_file(write(tmp_path / "old.ogg", b"old"))
+        recent = store.put_file(write(tmp_path / "recent.ogg", b"recent"))
+        os.utime(store.blob_path(old.sha256), (1000, 1000))
+        os.utime(store.blob_path(recent.sha256), (5000, 5000))
+
+        # Act
+        evicted = store.evict(retention_seconds=3600, now=6000)
+
+        # Assert
+        assert evicted == [old.sha256]
+        assert store.contains(recent.sha256)
+
+    def test_evict_least_recently_used_over_limit(self, tmp_path):
+        """Verifica que sobre max_bytes se eliminen primero los blobs usados hace mas tiempo"""
+        # Arrange
+        store = ContentStore(str(tmp_path))
+        blobs = [store.put_file(write(tmp_path / f"conv-{i}.ogg", bytes([i]) * 10)) for i in range(3)]
+        for i, blob in enumerate(blobs):
+            os.utime(store.blob_path(blob.sha256), (1000 + i, 1000 + i))
+
+        # Act
+        evicted = store.evict(retention_seconds=0, max_bytes=20, now=2000)
+
+        # Assert
+        assert evicted == [blobs[0].sha256]
+        assert store.contains(blobs[1].sha256) and store.contains(blobs[2].sha256)
+
+    def test_purge_incoming_removes_stale_files(self, tmp_path):
+        """Verifica que se eliminen de incoming/ solo los archivos abandonados"""
+        # Arrange
+        store = ContentStore(str(tmp_path))
+        os.makedirs(store.incoming_dir)
+        stale = write(os.path.join(store.incoming_dir, "conv-1_rec-1.ogg.part"), b"par")
+        active = write(os.path.join(store.incoming_dir, "conv-2_rec-2.ogg.part"), b"partial")
+        os.utime(stale, (1000, 1000))
+        os.utime(active, (5000, 5000))
+
+        # Act
+        purged = store.purge_incoming(max_age_seconds=3600, now=6000)
+
+        # Assert
+        assert purged == ["conv-1_rec-1.ogg.part"]
+        assert not os.path.exists(stale) and os.path.exists(active)
+        assert store.purge_incoming(max_age_seconds=0, now=10 ** 9) == []
+
+    def test_open_refreshes_blob_for_eviction(self, tmp_path):
+        """Verifica que leer un blob lo proteja de la limpieza por retencion"""
+        # Arrange
+        store = ContentStore(str(tmp_path))
+        blob = store.put_file(write(tmp_path / "conv-1.ogg", b"audio"))
+        os.utime(store.blob_path(blob.sha256), (1000, 1000))
+
+        # Act
+        with store.open(blob.sha256):
+            pass
+        evicted = store.evict(retention_seconds=3600)
+
+        # Assert
+        assert evicted == []
@@ -0,0 +1,73 @@
+"""
+Pruebas unitarias para CsvCopyStream
+"""
+import csv
+import io
+from datetime import datetime
+import pandas as pd
+from src.utils.copy_stream import CsvCopyStream, format_csv_value
+
+
+class TestCsvCopyStream:
+    """Pruebas para la serializacion CSV de COPY"""
+
+    def test_quotes_text_with_commas_quotes_and_newlines(self):
+        """Verifica que el texto libre de summary/reason no rompa la fila"""
+        # Arrange
+        rows = [("conv-1", 'Cliente dijo "no", luego\nllamo otra vez', 60000)]
+
+        # Act
+        data = CsvCopyStream(rows).read()
+
+        # Assert
+        assert list(csv.reader(io.StringIO(data))) == [["conv-1", 'Cliente dijo "no", luego\nllamo otra vez', "60000"]]
+
+    def test_null_and_empty_string_are_different(self):
+        """Verifica que None sea NULL (vacio sin comillas) y '' sea texto vacio"""
+        assert format_csv_value(None) == ""
+        assert format_csv_value(float("nan")) == ""
+        assert format_csv_value(pd.NaT) == ""
+        assert format_csv_value(pd.NA) == ""
+        assert format_csv_value("") == '""'
+        assert format_csv_value(datetime(2024, 1, 1, 8, 30)) == '"2024-01-01 08:30:00"'
+
+    def test_dicts_and_lists_are_json(self):
+        """Verifica que los valores no escalares se serialicen como JSON y no con su repr de Python"""
+        assert format_csv_value({"canal": "voz", "ok": True}) == '"{""canal"": ""voz"", ""ok"": true}"'
+        assert format_csv_value([1200, None]) == '"[1200, null]"'
+
+    def test_reads_in_chunks_without_consuming_everything(self):
+        """Verifica que las filas se generen por bloques a medida que se leen"""
+        # Arrange
+        consumed = []
+
+        def rows():
+            for index in range(10_000):
+                consumed.append(index)
+                yield (index, f"conv-{index}")
+
+        stream = CsvCopyStream(rows(), chunk_rows=100)
+
+        # Act
+        first = stream.read(64)
+
+        # Assert
+        assert first.startswith('"0","conv-0"\n')
+        assert len(consumed) == 100
+
+    def test_read_until_exhausted(self):
+        """Verifica que lecturas sucesivas devuelvan todas las filas y luego vacio"""
+        # Arrange
+        stream = CsvCopyStream(((index,) for index in range(250)), chunk_rows=100)
+
+        # Act
+        chunks = []
+        while True:
+            chunk = stream.read(8192)
+            if not chunk:
+                break
+            chunks.append(chunk)
+
+        # Assert
+        assert "".join(chunks).count("\n") == 250
+        assert stream.row_count == 250
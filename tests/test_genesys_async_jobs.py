@@ -0,0 +1,73 @@
+"""
+Pruebas unitarias para ConversationDetailsJobExtractor
+"""
+import pytest
+from types import SimpleNamespace
+from src.integrations.genesys_async_jobs import ConversationDetailsJobExtractor, AsyncJobError
+
+
+class FakeAnalyticsApi:
+    """Fake local de los endpoints de jobs asincronos de analytics"""
+
+    def __init__(self, states, pages):
+        self.states = list(states)
+        self.pages = pages
+        self.submitted_queries = []
+        self.results_calls = []
+
+    def post_analytics_conversations_details_jobs(self, body):
+        self.submitted_queries.append(body)
+        return SimpleNamespace(job_id="job-1")
+
+    def get_analytics_conversations_details_job(self, job_id):
+        state = self.states.pop(0) if len(self.states) > 1 else self.states[0]
+        return SimpleNamespace(state=state, error_message="fallo en genesys")
+
+    def get_analytics_conversations_details_job_results(self, job_id, cursor=None, page_size=None):
+        self.results_calls.append(cursor)
+        index = int(cursor) if cursor else 0
+        next_cursor = str(index + 1) if index + 1 < len(self.pages) else None
+        return SimpleNamespace(conversations=self.pages[index], cursor=next_cursor)
+
+
+class TestConversationDetailsJobExtractor:
+    """Pruebas para el extractor de jobs asincronos"""
+
+    def test_extract_polls_with_backoff_and_streams_pages(self):
+        """Verifica el envio del job, el backoff y la lectura por cursor"""
+        # Arrange
+        api = FakeAnalyticsApi(["QUEUED", "PENDING", "PENDING", "FULFILLED"], [["c1", "c2"], ["c3"], ["c4"]])
+        sleeps = []
+        extractor = ConversationDetailsJobExtractor(api, poll_interval=1, max_poll_interval=3, sleep=sleeps.append)
+
+        # Act
+        pages = list(extractor.extract("2024-01-01T00:00:00/2024-01-01T23:59:59", [{"type": "and"}]))
+
+        # Assert
+        assert pages == [["c1", "c2"], ["c3"], ["c4"]]
+        assert sleeps == [1, 2, 3]
+        assert api.results_calls == [None, "1", "2"]
+        assert api.submitted_queries[0].interval == "2024-01-01T00:00:00/2024-01-01T23:59:59"
+        assert api.submitted_queries[0].order_by == "conversationStart"
+
+    def test_extract_failed_job(self):
+        """Verifica que un job fallido lance AsyncJobError"""
+        # Arrange
+        api = FakeAnalyticsApi(["QUEUED", "FAILED"], [])
+        extractor = ConversationDetailsJobExtractor(api, sleep=lambda delay: None)
+
+        # Act & Assert
+        with pytest.raises(AsyncJobError) as exc_info:
+            list(extractor.extract("2024-01-01T00:00:00/2024-01-01T23:59:59", []))
+
+        assert "FAILED" in str(exc_info.value)
+
+    def test_extract_timeout(self):
+        """Verifica que se corte la espera al superar el timeout"""
+        # Arrange
+        api = FakeAnalyticsApi(["QUEUED"], [])
+        extractor = ConversationDetailsJobExtractor(api, poll_interval=10, timeout=25, sleep=lambda delay: None)
+
+        # Act & Assert
+        with pytest.raises(AsyncJobError):
+            list(extractor.extract("2024-01-01T00:00:00/2024-01-01T23:59:59", []))
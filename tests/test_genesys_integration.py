@@ -4,8 +4,8 @@ Pruebas unitarias para GenesysIntegration
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 from datetime import datetime
-from src.integrations.genesys_integration import GenesysIntegration
-from src.repository.models.audio_model import AudioModel
+from src.integrations.genesys_integration import GenesysIntegration, BatchSubmitError
+from src.repository.models.conversation_record import ConversationRecord
 from src.repository.models.job_model import JobModel
 from PureCloudPlatformClientV2.rest import ApiException
 
@@ -37,6 +37,9 @@ class TestGenesysIntegration:
         # Arrange
         mock_env.GENESYS_CLOUD_CLIENT_ID = "test-client-id"
         mock_env.GENESYS_CLOUD_CLIENT_SECRET = "test-secret"
+        mock_env.GENESYS_TOKEN_CACHE_PATH = ""
+        mock_env.GENESYS_TOKEN_TTL_SECONDS = 86400
+        mock_env.GENESYS_TOKEN_REFRESH_MARGIN_SECONDS = 600
         
         mock_api_client = Mock()
         mock_genesys_sdk.ApiClient.return_value = mock_api_client
@@ -62,6 +65,9 @@ class TestGenesysIntegration:
         # Arrange
         mock_env.GENESYS_CLOUD_CLIENT_ID = "test-client-id"
         mock_env.GENESYS_CLOUD_CLIENT_SECRET = "test-secret"
+        mock_env.GENESYS_TOKEN_CACHE_PATH = ""
+        mock_env.GENESYS_TOKEN_TTL_SECONDS = 86400
+        mock_env.GENESYS_TOKEN_REFRESH_MARGIN_SECONDS = 600
         
         mock_api_client = Mock()
         mock_api_client.get_client_credentials_token.side_effect = ApiException("Auth failed")
@@ -229,13 +235,16 @@ class TestGenesysIntegration:
         mock_env.GENESYS_CLOUD_CLIENT_ID = "test-id"
         mock_env.GENESYS_CLOUD_CLIENT_SECRET = "test-secret"
         mock_env.BATCH_SIZE = 2
+        mock_env.GENESYS_METADATA_WORKERS = 2
+        mock_env.GENESYS_METADATA_TIMEOUT = 5
         
         mock_batch_repo_instance = Mock()
         mock_batch_repo.return_value = mock_batch_repo_instance
-        mock_batch_repo_instance.insert.return_value = Mock(genesys_batch_id="batch-123")
+        mock_batch_repo_instance.insert_with_audios.return_value = Mock(id=5, genesys_batch_id="batch-123")
         
         mock_audio_repo_instance = Mock()
         mock_audio_repo.return_value = mock_audio_repo_instance
+        mock_audio_repo_instance.get_existing_ids.return_value = set()
         
         integration = GenesysIntegration()
         integration.recording_api = Mock()
@@ -254,10 +263,8 @@ class TestGenesysIntegration:
         integration.recording_api.post_recording_batchrequests.return_value = mock_batch_result
         
         conversations = [
-            AudioModel(id_conversation="conv-1", status="PENDING", 
-                      creation_date=datetime.now(), call_date=datetime.now(), call_duration=60000),
-            AudioModel(id_conversation="conv-2", status="PENDING",
-                      creation_date=datetime.now(), call_date=datetime.now(), call_duration=60000)
+            ConversationRecord("conv-1", datetime.now(), 60000),
+            ConversationRecord("conv-2", datetime.now(), 60000)
         ]
         
         job = JobModel(id=1, creation_date=datetime.now(), status="PROCESSING")
@@ -266,6 +273,229 @@ class TestGenesysIntegration:
         integration.init_batch_download(conversations, job, "2024-01-01T00:00:00")
         
         # Assert
-        assert mock_batch_repo_instance.insert.called
-        assert mock_audio_repo_instance.insert.call_count == 2
+        mock_batch_repo_instance.insert_with_audios.assert_called_once()
+        inserted_batch, audios = mock_batch_repo_instance.insert_with_audios.call_args[0]
+        assert inserted_batch.genesys_batch_id == "genesys-batch-123"
+        assert [audio.id_conversation for audio in audios] == ["conv-1", "conv-2"]
 
+    @patch('src.integrations.genesys_integration.env')
+    def test_resolve_recordings_collects_failures(self, mock_env):
+        """Verifica que los fallos por conversacion se acumulen sin detener el resto"""
+        # Arrange
+        mock_env.GENESYS_CLOUD_CLIENT_ID = "test-id"
+        mock_env.GENESYS_CLOUD_CLIENT_SECRET = "test-secret"
+        mock_env.GENESYS_METADATA_WORKERS = 4
+        mock_env.GENESYS_METADATA_TIMEOUT = 5
+
+        def recordings_by_conversation(conversation_id):
+            if conversation_id == "conv-2":
+                return None
+            recording = Mock()
+            recording.conversation_id = conversation_id
+            recording.id = f"rec-{conversation_id}"
+            return [recording]
+
+        integration = GenesysIntegration()
+        integration.recording_api = Mock()
+        integration.recording_api.get_conversation_recordingmetadata.side_effect = recordings_by_conversation
+
+        # Act
+        batch_requests, failures = integration.resolve_recordings(["conv-1", "conv-2", "conv-3"])
+
+        # Assert
+        assert [request.conversation_id for request in batch_requests] == ["conv-1", "conv-3"]
+        assert [request.recording_id for request in batch_requests] == ["rec-conv-1", "rec-conv-3"]
+        assert list(failures) == ["conv-2"]
+        assert "No se encontraron grabaciones" in failures["conv-2"]
+
+    @patch('src.integrations.genesys_integration.env')
+    @patch('src.integrations.genesys_integration.BatchRepository')
+    @patch('src.integrations.genesys_integration.AudioRepository')
+    def test_init_batch_download_skips_failed_conversations(self, mock_audio_repo, mock_batch_repo, mock_env):
+        """Verifica que una conversacion sin grabaciones no detenga el batch"""
+        # Arrange
+        mock_env.GENESYS_CLOUD_CLIENT_ID = "test-id"
+        mock_env.GENESYS_CLOUD_CLIENT_SECRET = "test-secret"
+        mock_env.BATCH_SIZE = 10
+        mock_env.GENESYS_METADATA_WORKERS = 2
+        mock_env.GENESYS_METADATA_TIMEOUT = 5
+
+        integration = GenesysIntegration()
+        integration.recording_api = Mock()
+        integration.batch_db = Mock()
+        integration.batch_db.insert_with_audios.return_value = Mock(id=5, genesys_batch_id="batch-123")
+        integration.audio_db = Mock()
+        integration.audio_db.get_existing_ids.return_value = set()
+        integration.recording_api.post_recording_batchrequests.return_value = Mock(id="genesys-batch-123")
+
+        def add_conversation(conversation_id):
+            if conversation_id == "conv-2":
+                raise ValueError(f"No se encontraron grabaciones para la conversacion: {conversation_id}")
+            submission = Mock()
+            submission.batch_download_request_list = [Mock(conversation_id=conversation_id)]
+            return submission
+
+        integration.add_conversation_to_batch = Mock(side_effect=add_conversation)
+
+        conversations = [
+            ConversationRecord(f"conv-{i}", datetime.now(), 60000)
+            for i in range(1, 4)
+        ]
+        job = JobModel(id=1, creation_date=datetime.now(), status="PROCESSING")
+
+        # Act
+        integration.init_batch_download(conversations, job, "2024-01-01T00:00:00")
+
+        # Assert
+        submission = integration.recording_api.post_recording_batchrequests.call_args[0][0]
+        assert len(submission.batch_download_request_list) == 2
+        inserted_batch, audios = integration.batch_db.insert_with_audios.call_args[0]
+        assert inserted_batch.audios_count == 2
+        assert [audio.id_conversation for audio in audios] == ["conv-1", "conv-3"]
+
+    @patch('src.integrations.genesys_integration.env')
+    @patch('src.integrations.genesys_integration.BatchRepository')
+    @patch('src.integrations.genesys_integration.AudioRepository')
+    def test_init_batch_download_skips_known_conversations(self, mock_audio_repo, mock_batch_repo, mock_env):
+        """Verifica que las conversaciones ya registradas no se consulten en Genesys"""
+        # Arrange
+        mock_env.GENESYS_CLOUD_CLIENT_ID = "test-id"
+        mock_env.GENESYS_CLOUD_CLIENT_SECRET = "test-secret"
+        mock_env.BATCH_SIZE = 10
+        mock_env.GENESYS_METADATA_WORKERS = 2
+        mock_env.GENESYS_METADATA_TIMEOUT = 5
+
+        integration = GenesysIntegration()
+        integration.recording_api = Mock()
+        integration.batch_db = Mock()
+        integration.batch_db.insert_with_audios.return_value = Mock(id=5, genesys_batch_id="batch-123")
+        integration.audio_db = Mock()
+        integration.audio_db.get_existing_ids.return_value = {"conv-1", "conv-3"}
+        integration.recording_api.post_recording_batchrequests.return_value = Mock(id="genesys-batch-123")
+        integration.add_conversation_to_batch = Mock(
+            side_effect=lambda conversation_id: Mock(batch_download_request_list=[Mock(conversation_id=conversation_id)])
+        )
+
+        conversations = [
+            ConversationRecord(f"conv-{i}", datetime.now(), 60000)
+            for i in range(1, 4)
+        ]
+        job = JobModel(id=1, creation_date=datetime.now(), status="PROCESSING")
+
+        # Act
+        integration.init_batch_download(conversations, job, "2024-01-01T00:00:00")
+
+        # Assert
+        integration.audio_db.get_existing_ids.assert_called_once_with(["conv-1", "conv-2", "conv-3"])
+        integration.add_conversation_to_batch.assert_called_once_with("conv-2")
+        _, audios = integration.batch_db.insert_with_audios.call_args[0]
+        assert [audio.id_conversation for audio in audios] == ["conv-2"]
+
+    @patch('src.integrations.genesys_integration.env')
+    @patch('src.integrations.genesys_integration.BatchRepository')
+    @patch('src.integrations.genesys_integration.AudioRepository')
+    def test_init_batch_download_all_known_makes_no_calls(self, mock_audio_repo, mock_batch_repo, mock_env):
+        """Verifica que una re-ejecucion sin conversaciones nuevas no llame a Genesys"""
+        # Arrange
+        mock_env.GENESYS_CLOUD_CLIENT_ID = "test-id"
+        mock_env.GENESYS_CLOUD_CLIENT_SECRET = "test-secret"
+        mock_env.BATCH_SIZE = 10
+
+        integration = GenesysIntegration()
+        integration.recording_api = Mock()
+        integration.batch_db = Mock()
+        integration.audio_db = Mock()
+        integration.audio_db.get_existing_ids.return_value = {"conv-1", "conv-2"}
+        integration.add_conversation_to_batch = Mock()
+
+        conversations = [
+            ConversationRecord(f"conv-{i}", datetime.now(), 60000)
+            for i in range(1, 3)
+        ]
+        job = JobModel(id=1, creation_date=datetime.now(), status="PROCESSING")
+
+        # Act
+        integration.init_batch_download(conversations, job, "2024-01-01T00:00:00")
+
+        # Assert
+        integration.add_conversation_to_batch.assert_not_called()
+        integration.recording_api.post_recording_batchrequests.assert_not_called()
+        integration.batch_db.insert_with_audios.assert_not_called()
+
+    @patch('src.integrations.genesys_integration.env')
+    @patch('src.integrations.genesys_integration.BatchRepository')
+    @patch('src.integrations.genesys_integration.AudioRepository')
+    def test_submit_batch_errors_raise(self, mock_audio_repo, mock_batch_repo, mock_env):
+        """Verifica que un batch sin resultado de Genesys o sin registrar lance BatchSubmitError"""
+        # Arrange
+        mock_env.GENESYS_METADATA_WORKERS = 2
+        mock_env.GENESYS_METADATA_TIMEOUT = 5
+
+        integration = GenesysIntegration()
+        integration.recording_api = Mock()
+        integration.batch_db = Mock()
+        integration.add_conversation_to_batch = Mock(
+            side_effect=lambda conversation_id: Mock(batch_download_request_list=[Mock(conversation_id=conversation_id)])
+        )
+        batch = [ConversationRecord("conv-1", datetime(2024, 1, 1), 60000)]
+        job = JobModel(id=1, creation_date=datetime.now(), status="PROCESSING")
+
+        # Act & Assert
+        integration.recording_api.post_recording_batchrequests.return_value = None
+        with pytest.raises(BatchSubmitError):
+            integration.submit_batch(batch, job, "2024-01-01T00:00:00")
+        integration.batch_db.insert_with_audios.assert_not_called()
+
+        integration.recording_api.post_recording_batchrequests.return_value = Mock(id="genesys-batch-123")
+        integration.batch_db.insert_with_audios.side_effect = Exception("Database error")
+        with pytest.raises(BatchSubmitError, match="genesys-batch-123"):
+            integration.submit_batch(batch, job, "2024-01-01T00:00:00")
+
+    @patch('src.integrations.genesys_integration.env')
+    @patch('src.integrations.genesys_integration.BatchRepository')
+    @patch('src.integrations.genesys_integration.AudioRepository')
+    def test_submit_batch_without_recordings_returns_none(self, mock_audio_repo, mock_batch_repo, mock_env):
+        """Verifica que un batch sin grabaciones descargables no se envie ni cancele antes de enviar"""
+        # Arrange
+        mock_env.GENESYS_METADATA_WORKERS = 2
+        mock_env.GENESYS_METADATA_TIMEOUT = 5
+
+        integration = GenesysIntegration()
+        integration.recording_api = Mock()
+        integration.batch_db = Mock()
+        integration.add_conversation_to_batch = Mock(side_effect=ValueError("Sin grabaciones"))
+        before_submit = Mock()
+        batch = [ConversationRecord("conv-1", datetime(2024, 1, 1), 60000)]
+        job = JobModel(id=1, creation_date=datetime.now(), status="PROCESSING")
+
+        # Act
+        result = integration.submit_batch(batch, job, "2024-01-01T00:00:00", before_submit=before_submit)
+
+        # Assert
+        assert result is None
+        before_submit.assert_not_called()
+        integration.recording_api.post_recording_batchrequests.assert_not_called()
+
+    @patch('src.integrations.genesys_integration.env')
+    @patch('src.integrations.genesys_integration.BatchRepository')
+    @patch('src.integrations.genesys_integration.AudioRepository')
+    def test_submit_batch_before_submit_cancels(self, mock_audio_repo, mock_batch_repo, mock_env):
+        """Verifica que before_submit pueda cancelar el envio a Genesys"""
+        # Arrange
+        mock_env.GENESYS_METADATA_WORKERS = 2
+        mock_env.GENESYS_METADATA_TIMEOUT = 5
+
+        integration = GenesysIntegration()
+        integration.recording_api = Mock()
+        integration.batch_db = Mock()
+        integration.add_conversation_to_batch = Mock(
+            side_effect=lambda conversation_id: Mock(batch_download_request_list=[Mock(conversation_id=conversation_id)])
+        )
+        batch = [ConversationRecord("conv-1", datetime(2024, 1, 1), 60000)]
+        job = JobModel(id=1, creation_date=datetime.now(), status="PROCESSING")
+
+        # Act & Assert
+        with pytest.raises(RuntimeError):
+            integration.submit_batch(batch, job, "2024-01-01T00:00:00",
+                                     before_submit=Mock(side_effect=RuntimeError("lease perdido")))
+        integration.recording_api.post_recording_batchrequests.assert_not_called()
@@ -0,0 +1,217 @@
+"""
+Pruebas unitarias para el scheduler de peticiones a Genesys
+"""
+import pytest
+from unittest.mock import Mock
+from PureCloudPlatformClientV2.rest import ApiException
+from src.integrations.genesys_rate_limiter import (
+    TokenBucket, GenesysRequestScheduler, RateLimitedApi, ANALYTICS, RECORDING
+)
+
+
+class FakeClock:
+    """Reloj simulado: sleep avanza el tiempo sin esperar"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def api_exception(status, retry_after=None):
+    error = ApiException(status=status, reason="error")
+    if retry_after is not None:
+        error.headers = {"Retry-After": str(retry_after)}
+    return error
+
+
+class TestTokenBucket:
+    """Pruebas para TokenBucket"""
+
+    def test_acquire_waits_when_empty(self):
+        """Verifica que al agotarse los tokens se espere segun la tasa"""
+        # Arrange
+        fake = FakeClock()
+        bucket = TokenBucket(rate=2, capacity=2, clock=fake.clock, sleep=fake.sleep)
+
+        # Act
+        for _ in range(4):
+            bucket.acquire()
+
+        # Assert
+        assert fake.now == pytest.approx(1.0)
+
+    def test_pause_blocks_until_deadline(self):
+        """Verifica que una pausa bloquee la familia aunque haya tokens"""
+        # Arrange
+        fake = FakeClock()
+        bucket = TokenBucket(rate=0, clock=fake.clock, sleep=fake.sleep)
+
+        # Act
+        bucket.pause(7)
+        bucket.acquire()
+
+        # Assert
+        assert fake.now == pytest.approx(7.0)
+
+
+class TestGenesysRequestScheduler:
+    """Pruebas para GenesysRequestScheduler"""
+
+    def build_scheduler(self, fake, max_retries=3):
+        return GenesysRequestScheduler(
+            rates={ANALYTICS: 0, RECORDING: 0},
+            max_retries=max_retries,
+            backoff_base=1,
+            backoff_max=10,
+            clock=fake.clock,
+            sleep=fake.sleep,
+            jitter=lambda low, high: high
+        )
+
+    def test_retries_5xx_with_exponential_backoff(self):
+        """Verifica el reintento con backoff exponencial ante errores 5xx"""
+        # Arrange
+        fake = FakeClock()
+        scheduler = self.build_scheduler(fake)
+        func = Mock(side_effect=[api_exception(503), api_exception(500), "ok"])
+
+        # Act
+        result = scheduler.call(RECORDING, func, "conv-1")
+
+        # Assert
+        assert result == "ok"
+        assert func.call_count == 3
+        assert fake.sleeps == [1, 2]
+
+    def test_honors_retry_after_on_429(self):
+        """Verifica que ante un 429 se respete Retry-After"""
+        # Arrange
+        fake = FakeClock()
+        scheduler = self.build_scheduler(fake)
+        func = Mock(side_effect=[api_exception(429, retry_after=30), "ok"])
+
+        # Act
+        result = scheduler.call(ANALYTICS, func)
+
+        # Assert
+        assert result == "ok"
+        assert fake.now >= 30
+
+    def test_does_not_retry_client_errors(self):
+        """Verifica que un error 4xx distinto de 429 no se reintente"""
+        # Arrange
+        fake = FakeClock()
+        scheduler = self.build_scheduler(fake)
+        func = Mock(side_effect=api_exception(404))
+
+        # Act & Assert
+        with pytest.raises(ApiException):
+            scheduler.call(RECORDING, func)
+        assert func.call_count == 1
+
+    def test_raises_after_max_retries(self):
+        """Verifica que se propague el error al agotar los reintentos"""
+        # Arrange
+        fake = FakeClock()
+        scheduler = self.build_scheduler(fake, max_retries=2)
+        func = Mock(side_effect=api_exception(429))
+
+        # Act & Assert
+        with pytest.raises(ApiException):
+            scheduler.call(ANALYTICS, func)
+        assert func.call_count == 3
+
+    def test_wrapped_api_goes_through_scheduler(self):
+        """Verifica que el proxy envie los metodos de la API al scheduler"""
+        # Arrange
+        fake = FakeClock()
+        scheduler = self.build_scheduler(fake)
+        api = Mock()
+        api.get_conversation_recordingmetadata.side_effect = [api_exception(502), ["rec-1"]]
+
+        # Act
+        wrapped = scheduler.wrap(api, RECORDING)
+        result = wrapped.get_conversation_recordingmetadata("conv-1")
+
+        # Assert
+        assert isinstance(wrapped, RateLimitedApi)
+        assert result == ["rec-1"]
+        assert api.get_conversation_recordingmetadata.call_count == 2
+
+    def test_wrapped_create_is_not_retried_on_5xx(self):
+        """Verifica que una operacion que crea recursos no se reintente ante un 5xx"""
+        # Arrange
+        fake = FakeClock()
+        scheduler = self.build_scheduler(fake)
+        api = Mock()
+        api.post_recording_batchrequests.side_effect = api_exception(502)
+
+        # Act & Assert
+        with pytest.raises(ApiException):
+            scheduler.wrap(api, RECORDING).post_recording_batchrequests("body")
+        assert api.post_recording_batchrequests.call_count == 1
+
+    def test_wrapped_create_is_retried_on_429(self):
+        """Verifica que una operacion que crea recursos si se reintente ante un 429"""
+        # Arrange
+        fake = FakeClock()
+        scheduler = self.build_scheduler(fake)
+        api = Mock()
+        api.post_analytics_conversations_details_jobs.side_effect = [api_exception(429), "job"]
+
+        # Act
+        result = scheduler.wrap(api, ANALYTICS).post_analytics_conversations_details_jobs("body")
+
+        # Assert
+        assert result == "job"
+        assert api.post_analytics_conversations_details_jobs.call_count == 2
+
+    def test_wrapped_query_is_retried_on_5xx(self):
+        """Verifica que las consultas (post_..._query) se reintenten ante un 5xx"""
+        # Arrange
+        fake = FakeClock()
+        scheduler = self.build_scheduler(fake)
+        api = Mock()
+        api.post_analytics_conversations_details_query.side_effect = [api_exception(504), "page"]
+
+        # Act
+        result = scheduler.wrap(api, ANALYTICS).post_analytics_conversations_details_query("query")
+
+        # Assert
+        assert result == "page"
+
+    def test_unauthorized_refreshes_token_once(self):
+        """Verifica que ante un 401 se renueve el token y se reintente una sola vez"""
+        # Arrange
+        fake = FakeClock()
+        scheduler = self.build_scheduler(fake)
+        scheduler.on_unauthorized = Mock()
+        func = Mock(side_effect=[api_exception(401), api_exception(401)])
+
+        # Act & Assert
+        with pytest.raises(ApiException):
+            scheduler.call(RECORDING, func)
+        scheduler.on_unauthorized.assert_called_once()
+        assert func.call_count == 2
+
+    def test_unauthorized_then_success(self):
+        """Verifica que la llamada continue con el token renovado"""
+        # Arrange
+        fake = FakeClock()
+        scheduler = self.build_scheduler(fake)
+        scheduler.on_unauthorized = Mock()
+        func = Mock(side_effect=[api_exception(401), "ok"])
+
+        # Act
+        result = scheduler.call(ANALYTICS, func)
+
+        # Assert
+        assert result == "ok"
+
@@ -0,0 +1,136 @@
+"""
+Pruebas unitarias para GenesysTokenManager
+"""
+import json
+import pytest
+from unittest.mock import Mock
+from src.integrations.genesys_token_manager import GenesysTokenManager
+
+
+class FakeApiClient:
+    """ApiClient simulado que entrega un token distinto en cada solicitud"""
+
+    def __init__(self):
+        self.access_token = ""
+        self.requests = 0
+
+    def get_client_credentials_token(self, client_id, client_secret):
+        self.requests += 1
+        self.access_token = f"token-{self.requests}"
+        return self
+
+
+class TestGenesysTokenManager:
+    """Pruebas para GenesysTokenManager"""
+
+    def test_ensure_token_requests_and_caches(self, tmp_path):
+        """Verifica que se solicite el token y se guarde en cache con su expiracion"""
+        # Arrange
+        cache_path = tmp_path / "token.json"
+        api_client = FakeApiClient()
+        manager = GenesysTokenManager(api_client, "client", "secret", cache_path=str(cache_path),
+                                      ttl_seconds=3600, refresh_margin=60, clock=lambda: 1000.0)
+
+        # Act
+        manager.ensure_token()
+        manager.ensure_token()
+
+        # Assert
+        assert api_client.requests == 1
+        cached = json.loads(cache_path.read_text())
+        assert cached == {"client_id": "client", "access_token": "token-1", "expires_at": 4600.0}
+
+    def test_ensure_token_reuses_cache_between_runs(self, tmp_path):
+        """Verifica que una nueva ejecucion reutilice el token vigente de la cache"""
+        # Arrange
+        cache_path = tmp_path / "token.json"
+        cache_path.write_text(json.dumps({"client_id": "client", "access_token": "cached", "expires_at": 5000.0}))
+        api_client = FakeApiClient()
+        manager = GenesysTokenManager(api_client, "client", "secret", cache_path=str(cache_path),
+                                      ttl_seconds=3600, refresh_margin=60, clock=lambda: 1000.0)
+
+        # Act
+        manager.ensure_token()
+
+        # Assert
+        assert api_client.requests == 0
+        assert api_client.access_token == "cached"
+        assert manager.expires_at == 5000.0
+
+    @pytest.mark.parametrize("cached", [
+        {"client_id": "client", "access_token": "cached", "expires_at": 1030.0},
+        {"client_id": "otro-client", "access_token": "cached", "expires_at": 5000.0},
+    ])
+    def test_ensure_token_ignores_stale_or_foreign_cache(self, tmp_path, cached):
+        """Verifica que no se use un token por expirar o de otras credenciales"""
+        # Arrange
+        cache_path = tmp_path / "token.json"
+        cache_path.write_text(json.dumps(cached))
+        api_client = FakeApiClient()
+        manager = GenesysTokenManager(api_client, "client", "secret", cache_path=str(cache_path),
+                                      ttl_seconds=3600, refresh_margin=60, clock=lambda: 1000.0)
+
+        # Act
+        manager.ensure_token()
+
+        # Assert
+        assert api_client.requests == 1
+        assert api_client.access_token == "token-1"
+
+    def test_background_refresh_replaces_token(self):
+        """Verifica que la renovacion en segundo plano reemplace el token compartido"""
+        # Arrange
+        now = [1000.0]
+        api_client = FakeApiClient()
+        manager = GenesysTokenManager(api_client, "client", "secret", ttl_seconds=3600,
+                                      refresh_margin=60, clock=lambda: now[0])
+        manager.ensure_token()
+        manager.start_background_refresh = Mock()
+
+        # Act
+        now[0] = 4550.0
+        manager.background_refresh()
+
+        # Assert
+        assert api_client.access_token == "token-2"
+        assert manager.expires_at == 8150.0
+        manager.start_background_refresh.assert_called_once()
+
+    def test_start_background_refresh_schedules_before_expiry(self):
+        """Verifica que el timer se programe antes de la expiracion"""
+        # Arrange
+        api_client = FakeApiClient()
+        manager = GenesysTokenManager(api_client, "client", "secret", ttl_seconds=3600,
+                                      refresh_margin=600, clock=lambda: 1000.0)
+        manager.ensure_token()
+
+        # Act
+        manager.start_background_refresh()
+
+        # Assert
+        assert manager.timer.interval == 3000.0
+        assert manager.timer.daemon
+        manager.stop()
+        assert manager.timer is None
+
+    def test_handle_unauthorized_drops_cache_and_refreshes(self, tmp_path):
+        """Verifica que ante un 401 se descarte la cache y se pida un token nuevo"""
+        # Arrange
+        cache_path = tmp_path / "token.json"
+        cache_path.write_text(json.dumps({"client_id": "client", "access_token": "revocado", "expires_at": 5000.0}))
+        now = [1000.0]
+        api_client = FakeApiClient()
+        manager = GenesysTokenManager(api_client, "client", "secret", cache_path=str(cache_path),
+                                      ttl_seconds=3600, refresh_margin=60, clock=lambda: now[0])
+        manager.ensure_token()
+
+        # Act
+        now[0] = 1100.0
+        manager.handle_unauthorized()
+        manager.handle_unauthorized()
+
+        # Assert
+        assert api_client.requests == 1
+        assert api_client.access_token == "token-1"
+        assert json.loads(cache_path.read_text())["access_token"] == "token-1"
+
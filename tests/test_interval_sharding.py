@@ -0,0 +1,51 @@
+"""
+Pruebas unitarias para la division de intervalos en shards
+"""
+from unittest.mock import Mock
+from src.service.interval_sharding import (
+    plan_shards, split_interval, can_split, dedupe_conversations
+)
+
+
+class TestIntervalSharding:
+    """Pruebas para el planificador de shards"""
+
+    def test_plan_shards_hourly(self):
+        """Verifica que el dia se divida en shards de una hora contiguos"""
+        # Act
+        shards = plan_shards("2024-01-01T00:00:00/2024-01-01T23:59:59", 60)
+
+        # Assert
+        assert len(shards) == 24
+        assert shards[0] == "2024-01-01T00:00:00/2024-01-01T01:00:00"
+        assert shards[-1] == "2024-01-01T23:00:00/2024-01-01T23:59:59"
+        for previous, current in zip(shards, shards[1:]):
+            assert previous.split("/")[1] == current.split("/")[0]
+
+    def test_split_interval_in_halves(self):
+        """Verifica la division de un shard en dos mitades"""
+        # Act
+        shards = split_interval("2024-01-01T00:00:00/2024-01-01T02:00:00")
+
+        # Assert
+        assert shards == [
+            "2024-01-01T00:00:00/2024-01-01T01:00:00",
+            "2024-01-01T01:00:00/2024-01-01T02:00:00",
+        ]
+
+    def test_can_split_respects_minimum(self):
+        """Verifica que no se divida un shard por debajo del minimo"""
+        assert can_split("2024-01-01T00:00:00/2024-01-01T00:10:00", 5)
+        assert not can_split("2024-01-01T00:00:00/2024-01-01T00:08:00", 5)
+
+    def test_dedupe_conversations_keeps_first(self):
+        """Verifica que se eliminen conversaciones repetidas entre shards"""
+        # Arrange
+        audios = [Mock(id_conversation=conversation_id) for conversation_id in ["a", "b", "a", "c", "b"]]
+
+        # Act
+        unique = dedupe_conversations(audios)
+
+        # Assert
+        assert [audio.id_conversation for audio in unique] == ["a", "b", "c"]
+        assert unique[0] is audios[0]
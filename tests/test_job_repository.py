@@ -12,7 +12,7 @@ class TestJobRepository:
     """Pruebas para JobRepository"""
     
     @patch('src.repository.job_repository.Session')
-    @patch('src.repository.job_repository.engine')
+    @patch('src.repository.job_repository.get_engine')
     def test_insert_job_success(self, mock_engine, mock_session_class):
         """Verifica que se pueda insertar un job correctamente"""
         # Arrange
@@ -39,7 +39,7 @@ class TestJobRepository:
         mock_session.refresh.assert_called_once_with(job)
     
     @patch('src.repository.job_repository.Session')
-    @patch('src.repository.job_repository.engine')
+    @patch('src.repository.job_repository.get_engine')
     def test_insert_job_exception(self, mock_engine, mock_session_class):
         """Verifica el manejo de excepciones al insertar un job"""
         # Arrange
@@ -61,7 +61,7 @@ class TestJobRepository:
         assert result is None
     
     @patch('src.repository.job_repository.Session')
-    @patch('src.repository.job_repository.engine')
+    @patch('src.repository.job_repository.get_engine')
     def test_update_status_success(self, mock_engine, mock_session_class, sample_job_model):
         """Verifica que se pueda actualizar el estado de un job"""
         # Arrange
@@ -80,7 +80,7 @@ class TestJobRepository:
         mock_session.commit.assert_called_once()
     
     @patch('src.repository.job_repository.Session')
-    @patch('src.repository.job_repository.engine')
+    @patch('src.repository.job_repository.get_engine')
     def test_update_status_job_not_found(self, mock_engine, mock_session_class):
         """Verifica el comportamiento cuando el job no existe"""
         # Arrange
@@ -97,7 +97,7 @@ class TestJobRepository:
         assert result is False
     
     @patch('src.repository.job_repository.Session')
-    @patch('src.repository.job_repository.engine')
+    @patch('src.repository.job_repository.get_engine')
     def test_update_status_exception(self, mock_engine, mock_session_class, sample_job_model):
         """Verifica el manejo de excepciones al actualizar el estado"""
         # Arrange
@@ -114,3 +114,22 @@ class TestJobRepository:
         # Assert
         assert result is False
 
+
+    @patch('src.repository.job_repository.Session')
+    @patch('src.repository.job_repository.get_engine')
+    def test_transition_status(self, mock_engine, mock_session_class):
+        """Verifica la transicion compare-and-set de varios jobs"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        mock_session.execute.return_value.scalars.return_value = iter([1, 3])
+
+        repo = JobRepository()
+
+        # Act
+        updated = repo.transition_status([1, 2, 3], "SUCCESS", expected_status="PROCESSING")
+
+        # Assert
+        assert updated == [1, 3]
+        mock_session.execute.assert_called_once()
+        mock_session.commit.assert_called_once()
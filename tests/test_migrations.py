@@ -0,0 +1,67 @@
+"""
+Pruebas unitarias para el aplicador de migraciones
+"""
+import pytest
+from unittest.mock import patch, MagicMock
+from src.utils.migrations import list_migrations, apply_migrations, MIGRATIONS_DIR
+
+
+class TestMigrations:
+    """Pruebas para list_migrations y apply_migrations"""
+
+    def test_list_migrations_sorted_by_version(self, tmp_path):
+        """Verifica que las migraciones se ordenen por version e ignoren archivos sin version"""
+        # Arrange
+        (tmp_path / "002_indices.sql").write_text("SELECT 2")
+        (tmp_path / "001_inicial.sql").write_text("SELECT 1")
+        (tmp_path / "notas.sql").write_text("SELECT 0")
+
+        # Act
+        migrations = list_migrations(tmp_path)
+
+        # Assert
+        assert [version for version, _ in migrations] == ["001", "002"]
+
+    def test_repository_migrations_have_unique_versions(self):
+        """Verifica que las migraciones del repositorio no repitan version"""
+        versions = [version for version, _ in list_migrations(MIGRATIONS_DIR)]
+
+        assert versions[:3] == ["001", "002", "003"]
+        assert len(versions) == len(set(versions))
+
+    @patch('src.utils.migrations.get_engine')
+    def test_apply_migrations_skips_applied(self, mock_engine, tmp_path):
+        """Verifica que solo se apliquen las migraciones pendientes y queden registradas"""
+        # Arrange
+        (tmp_path / "001_inicial.sql").write_text("SELECT 1")
+        (tmp_path / "002_indices.sql").write_text("CREATE INDEX x ON t (c)")
+        conn = MagicMock()
+        mock_engine.return_value.begin.return_value.__enter__.return_value = conn
+        conn.execute.return_value.scalars.return_value = ["001"]
+
+        # Act
+        applied = apply_migrations(tmp_path)
+
+        # Assert
+        assert applied == ["002"]
+        conn.exec_driver_sql.assert_called_with("CREATE INDEX x ON t (c)")
+        assert conn.exec_driver_sql.call_count == 2
+        assert conn.execute.call_args[0][1] == {"version": "002", "name": "002_indices.sql"}
+
+    @patch('src.utils.migrations.get_engine')
+    def test_apply_migrations_stops_on_error(self, mock_engine, tmp_path):
+        """Verifica que un error detenga las migraciones siguientes"""
+        # Arrange
+        (tmp_path / "001_inicial.sql").write_text("SELECT 1")
+        (tmp_path / "002_indices.sql").write_text("SELECT 2")
+        conn = MagicMock()
+        mock_engine.return_value.begin.return_value.__enter__.return_value = conn
+        conn.execute.return_value.scalars.return_value = []
+        conn.exec_driver_sql.side_effect = [None, Exception("syntax error")]
+
+        # Act & Assert
+        with pytest.raises(Exception):
+            apply_migrations(tmp_path)
+
+        conn.exec_driver_sql.assert_called_with("SELECT 1")
+        assert conn.exec_driver_sql.call_count == 2
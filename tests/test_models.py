@@ -3,9 +3,14 @@ Pruebas unitarias para los modelos de datos
 """
 import pytest
 from datetime import datetime
+from pathlib import Path
 from src.repository.models.audio_model import AudioModel
 from src.repository.models.batch_model import BatchModel
 from src.repository.models.job_model import JobModel
+from src.repository.models.conversation_record import ConversationRecord
+
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
 
 
 class TestAudioModel:
@@ -51,7 +56,29 @@ class TestAudioModel:
     def test_audio_model_tablename(self):
         """Verifica que el nombre de tabla sea correcto"""
         assert AudioModel.__tablename__ == "audio"
-        assert AudioModel.__table_args__["schema"] == "audios_sac"
+        assert AudioModel.__table__.schema == "audios_sac"
+
+    def test_audio_model_unique_id_conversation(self):
+        """Verifica que id_conversation sea unico en el modelo y en la migracion"""
+        migration = (MIGRATIONS_DIR / "001_audio_unique_id_conversation.sql").read_text()
+        # Los duplicados existentes se eliminan antes de crear el indice unico
+        assert migration.index("DELETE FROM audios_sac.audio") < migration.index("CREATE UNIQUE INDEX")
+        assert "ON audios_sac.audio (id_conversation)" in migration
+
+    def test_audio_model_partitioned_by_call_date(self):
+        """Verifica que los indices del modelo coincidan con la tabla particionada de la migracion"""
+        indexes = {index.name: index for index in AudioModel.__table__.indexes}
+        unique_key = indexes["audio_id_conversation_key"]
+
+        # En una tabla particionada la llave unica debe incluir la columna de particion
+        assert unique_key.unique is True
+        assert [column.name for column in unique_key.columns] == ["id_conversation", "call_date"]
+        assert AudioModel.__table__.dialect_options["postgresql"]["partition_by"] == "RANGE (call_date)"
+
+        migration = (MIGRATIONS_DIR / "003_audio_partition_by_call_date.sql").read_text()
+        assert "PARTITION BY RANGE (call_date)" in migration
+        for name in indexes:
+            assert name in migration
 
 
 class TestBatchModel:
@@ -96,6 +123,19 @@ class TestBatchModel:
         assert BatchModel.__tablename__ == "batch"
         assert BatchModel.__table_args__["schema"] == "audios_sac"
 
+    def test_batch_model_indexes(self):
+        """Verifica que los campos de busqueda del batch tengan indice en el modelo y en la migracion"""
+        index_names = {index.name for index in BatchModel.__table__.indexes}
+        migration = (MIGRATIONS_DIR / "002_hot_path_indexes.sql").read_text()
+
+        assert index_names == {
+            "ix_audios_sac_batch_gemini_batch_id",
+            "ix_audios_sac_batch_genesys_batch_id",
+            "ix_audios_sac_batch_job_id",
+        }
+        for name in index_names:
+            assert name in migration
+
 
 class TestJobModel:
     """Pruebas para el modelo JobModel"""
@@ -130,3 +170,25 @@ class TestJobModel:
         assert JobModel.__tablename__ == "job"
         assert JobModel.__table_args__["schema"] == "audios_sac"
 
+
+class TestConversationRecord:
+    """Pruebas para el registro compacto ConversationRecord"""
+
+    def test_conversation_record_has_no_dict(self):
+        """Verifica que el registro use __slots__ y no permita atributos extra"""
+        record = ConversationRecord("conv-1", datetime(2024, 1, 1, 8, 0), 60000)
+
+        assert not hasattr(record, "__dict__")
+        with pytest.raises(AttributeError):
+            record.summary = "no permitido"
+
+    def test_conversation_record_to_row(self):
+        """Verifica la conversion a fila para insercion masiva"""
+        record = ConversationRecord("conv-1", datetime(2024, 1, 1, 8, 0), 60000)
+
+        row = record.to_row()
+
+        assert row["id_conversation"] == "conv-1"
+        assert row["status"] == "PENDING"
+        assert row["batch_id"] is None
+        assert set(row) == {"id_conversation", "status", "creation_date", "call_date", "call_duration", "batch_id"}
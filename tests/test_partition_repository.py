@@ -0,0 +1,51 @@
+"""
+Pruebas unitarias para PartitionRepository
+"""
+import pytest
+from unittest.mock import patch, MagicMock
+from datetime import date, datetime
+from src.repository.partition_repository import PartitionRepository, add_months
+
+
+class TestPartitionRepository:
+    """Pruebas para PartitionRepository"""
+
+    def test_add_months_crosses_year(self):
+        """Verifica el calculo del mes siguiente al cambiar de anio"""
+        assert add_months(date(2024, 11, 1), 2) == date(2025, 1, 1)
+        assert add_months(date(2024, 1, 1), 0) == date(2024, 1, 1)
+
+    @patch('src.repository.partition_repository.Session')
+    @patch('src.repository.partition_repository.get_engine')
+    def test_ensure_audio_partitions(self, mock_engine, mock_session_class):
+        """Verifica que se pidan las particiones desde el mes indicado hasta los meses futuros"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        mock_session.execute.return_value.scalar.return_value = 1
+
+        repo = PartitionRepository()
+
+        # Act
+        created = repo.ensure_audio_partitions(datetime(2024, 12, 15, 10, 30), 2)
+
+        # Assert
+        assert created == 1
+        params = mock_session.execute.call_args[0][1]
+        assert params == {"from_month": date(2024, 12, 1), "to_month": date(2025, 2, 1)}
+        mock_session.commit.assert_called_once()
+
+    @patch('src.repository.partition_repository.Session')
+    @patch('src.repository.partition_repository.get_engine')
+    def test_ensure_audio_partitions_exception(self, mock_engine, mock_session_class):
+        """Verifica que un error al crear particiones se propague antes de enviar batches"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        mock_session.execute.side_effect = Exception("Database error")
+
+        repo = PartitionRepository()
+
+        # Act & Assert
+        with pytest.raises(Exception, match="Database error"):
+            repo.ensure_audio_partitions(datetime(2024, 1, 1), 2)
@@ -0,0 +1,171 @@
+"""
+Pruebas unitarias para RecordingBlobRepository
+"""
+import pytest
+from unittest.mock import patch, MagicMock
+from sqlalchemy.dialects import postgresql
+from src.repository.recording_blob_repository import RecordingBlobRepository
+
+
+class TestRecordingBlobRepository:
+    """Pruebas para RecordingBlobRepository"""
+
+    @patch('src.repository.recording_blob_repository.Session')
+    @patch('src.repository.recording_blob_repository.get_engine')
+    def test_upsert(self, mock_engine, mock_session_class):
+        """Verifica que el registro actualice el blob de una grabacion ya indexada"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        rows = [{"id_conversation": "conv-1", "recording_id": "rec-1", "sha256": "a" * 64, "size": 10,
+                 "content_type": "audio/ogg"}]
+
+        # Act
+        count = RecordingBlobRepository().upsert(rows)
+
+        # Assert
+        statement, params = mock_session.execute.call_args[0]
+        compiled = str(statement.compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (id_conversation, recording_id) DO UPDATE" in compiled
+        assert params == rows
+        assert count == 1
+        mock_session.commit.assert_called_once()
+
+    @patch('src.repository.recording_blob_repository.Session')
+    def test_upsert_empty(self, mock_session_class):
+        """Verifica que sin filas no se abra una sesion"""
+        # Act
+        count = RecordingBlobRepository().upsert([])
+
+        # Assert
+        assert count == 0
+        mock_session_class.assert_not_called()
+
+    @patch('src.repository.recording_blob_repository.Session')
+    @patch('src.repository.recording_blob_repository.get_engine')
+    def test_upsert_error_raises(self, mock_engine, mock_session_class):
+        """Verifica que un error al registrar se propague"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        mock_session.execute.side_effect = Exception("DB Error")
+
+        # Act & Assert
+        with pytest.raises(Exception, match="DB Error"):
+            RecordingBlobRepository().upsert([{"id_conversation": "conv-1"}])
+
+    @patch('src.repository.recording_blob_repository.Session')
+    @patch('src.repository.recording_blob_repository.get_engine')
+    def test_get_by_recording_ids(self, mock_engine, mock_session_class):
+        """Verifica la consulta de hashes por recording_id con un solo parametro array"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        mock_session.execute.return_value = [("rec-1", "a" * 64)]
+
+        # Act
+        result = RecordingBlobRepository().get_by_recording_ids(["rec-1", "rec-2"])
+
+        # Assert
+        assert result == {"rec-1": "a" * 64}
+        compiled = str(mock_session.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert "recording_id = ANY (" in compiled
+
+    @patch('src.repository.recording_blob_repository.Session')
+    @patch('src.repository.recording_blob_repository.get_engine')
+    def test_get_by_conversations_groups_recordings(self, mock_engine, mock_session_class):
+        """Verifica que los hashes se agrupen por conversacion"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        mock_session.execute.return_value = [("conv-1", "a" * 64), ("conv-1", "b" * 64), ("conv-2", "c" * 64)]
+
+        # Act
+        result = RecordingBlobRepository().get_by_conversations(["conv-1", "conv-2"])
+
+        # Assert
+        assert result == {"conv-1": ["a" * 64, "b" * 64], "conv-2": ["c" * 64]}
+
+    @patch('src.repository.recording_blob_repository.Session')
+    @patch('src.repository.recording_blob_repository.get_engine')
+    def test_get_by_conversations_error_returns_empty(self, mock_engine, mock_session_class):
+        """Verifica que un error de consulta devuelva un diccionario vacio"""
+        # Arrange
+        mock_session_class.return_value.__enter__.side_effect = Exception("DB Error")
+
+        # Act
+        result = RecordingBlobRepository().get_by_conversations(["conv-1"])
+
+        # Assert
+        assert result == {}
+
+    @patch('src.repository.recording_blob_repository.Session')
+    @patch('src.repository.recording_blob_repository.get_engine')
+    def test_get_pending_trim(self, mock_engine, mock_session_class):
+        """Verifica la consulta paginada de blobs sin recortar"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        mock_session.execute.return_value.scalars.return_value = iter(["b" * 64])
+
+        # Act
+        result = RecordingBlobRepository().get_pending_trim(10, after="a" * 64)
+
+        # Assert
+        assert result == ["b" * 64]
+        compiled = str(mock_session.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert "SELECT DISTINCT" in compiled
+        assert "trimmed_sha256 IS NULL" in compiled
+        assert "recording_blob.sha256 > %(sha256_1)s" in compiled
+
+    @patch('src.repository.recording_blob_repository.Session')
+    @patch('src.repository.recording_blob_repository.get_engine')
+    def test_apply_trim_updates_by_sha256(self, mock_engine, mock_session_class):
+        """Verifica que el recorte se registre en todas las grabaciones del mismo sha256"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        mock_session.execute.return_value.rowcount = 3
+        rows = [{"sha256": "a" * 64, "trimmed_sha256": "b" * 64, "trimmed_size": 10, "trim_bytes_saved": 90,
+                 "trim_offsets": [[0, 100, 200]]},
+                {"sha256": "c" * 64, "trim_error": "El archivo no es un WAV (RIFF/WAVE)"}]
+
+        # Act
+        updated = RecordingBlobRepository().apply_trim(rows)
+
+        # Assert
+        statement, params = mock_session.execute.call_args[0]
+        compiled = str(statement.compile(dialect=postgresql.dialect()))
+        assert "WHERE audios_sac.recording_blob.sha256 = %(source_sha256)s" in compiled
+        assert params[0]["source_sha256"] == "a" * 64
+        assert params[1] == {"source_sha256": "c" * 64, "trimmed_sha256": None, "trimmed_size": None,
+                             "trim_bytes_saved": None, "trim_offsets": None,
+                             "trim_error": "El archivo no es un WAV (RIFF/WAVE)"}
+        assert updated == 3
+        mock_session.commit.assert_called_once()
+
+    @patch('src.repository.recording_blob_repository.Session')
+    @patch('src.repository.recording_blob_repository.get_engine')
+    def test_clear_trim_of_evicted_blobs(self, mock_engine, mock_session_class):
+        """Verifica que un recorte eliminado del almacen deje sus grabaciones pendientes de recortar"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        mock_session.execute.return_value.rowcount = 2
+
+        # Act
+        cleared = RecordingBlobRepository().clear_trim(["b" * 64])
+
+        # Assert
+        statement = mock_session.execute.call_args[0][0]
+        compiled = str(statement.compile(dialect=postgresql.dialect()))
+        assert "SET trimmed_sha256=NULL, trimmed_size=NULL, trim_bytes_saved=NULL, trim_offsets=NULL, trim_error=NULL" in compiled
+        assert "WHERE audios_sac.recording_blob.trimmed_sha256 = ANY (" in compiled
+        assert cleared == 2
+        mock_session.commit.assert_called_once()
+
+    @patch('src.repository.recording_blob_repository.Session')
+    def test_clear_trim_without_blobs(self, mock_session_class):
+        """Verifica que sin blobs eliminados no se abra una sesion"""
+        assert RecordingBlobRepository().clear_trim([]) == 0
+        mock_session_class.assert_not_called()
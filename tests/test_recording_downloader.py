@@ -0,0 +1,178 @@
+"""
+Pruebas de RecordingDownloader contra un servidor HTTP local
+"""
+import hashlib
+import os
+import threading
+import pytest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from src.integrations.recording_downloader import RecordingDownloader, DownloadItem, DownloadError, PART_SUFFIX
+
+CONTENT = os.urandom(256 * 1024 + 17)
+
+
+class RecordingHandler(BaseHTTPRequestHandler):
+    """Sirve CONTENT en /audio con soporte de Range; /no-range ignora el header"""
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers.get("Range")))
+        range_header = self.headers.get("Range")
+        if self.path == "/audio" and range_header:
+            start = int(range_header.split("=")[1].rstrip("-"))
+            if start >= len(CONTENT):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(CONTENT)}")
+                self.end_headers()
+                return
+            body = CONTENT[start:]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(CONTENT) - 1}/{len(CONTENT)}")
+        elif self.path in ("/audio", "/no-range"):
+            body = CONTENT
+            self.send_response(200)
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RecordingHandler)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def url(server, path):
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+def build_downloader():
+    return RecordingDownloader(workers=4, chunk_size=16 * 1024, timeout=5)
+
+
+class TestRecordingDownloader:
+    """Pruebas para RecordingDownloader"""
+
+    def test_download_writes_file_and_hash(self, http_server, tmp_path):
+        """Verifica la descarga completa con verificacion de tamano y hash"""
+        # Arrange
+        path = str(tmp_path / "batch" / "conv-1.ogg")
+        item = DownloadItem(url(http_server, "/audio"), path, expected_sha256=hashlib.sha256(CONTENT).hexdigest())
+
+        # Act
+        result = build_downloader().download(item)
+
+        # Assert
+        assert result.size == len(CONTENT)
+        assert result.resumed_from == 0
+        with open(path, "rb") as file:
+            assert file.read() == CONTENT
+        assert not os.path.exists(path + PART_SUFFIX)
+
+    def test_resume_partial_file_with_range(self, http_server, tmp_path):
+        """Verifica que un .part existente se continue con un header Range"""
+        # Arrange
+        path = str(tmp_path / "conv-1.ogg")
+        with open(path + PART_SUFFIX, "wb") as file:
+            file.write(CONTENT[:1000])
+
+        # Act
+        result = build_downloader().download(DownloadItem(url(http_server, "/audio"), path))
+
+        # Assert
+        assert http_server.requests == [("/audio", "bytes=1000-")]
+        assert result.resumed_from == 1000
+        assert result.sha256 == hashlib.sha256(CONTENT).hexdigest()
+        with open(path, "rb") as file:
+            assert file.read() == CONTENT
+
+    def test_complete_part_file_is_finalized(self, http_server, tmp_path):
+        """Verifica que un .part completo (416) se renombre sin volver a descargar"""
+        # Arrange
+        path = str(tmp_path / "conv-1.ogg")
+        with open(path + PART_SUFFIX, "wb") as file:
+            file.write(CONTENT)
+
+        # Act
+        result = build_downloader().download(DownloadItem(url(http_server, "/audio"), path))
+
+        # Assert
+        assert result.size == len(CONTENT)
+        assert os.path.exists(path)
+
+    def test_server_without_range_restarts_download(self, http_server, tmp_path):
+        """Verifica que si el servidor ignora Range el archivo se descargue desde el inicio"""
+        # Arrange
+        path = str(tmp_path / "conv-1.ogg")
+        with open(path + PART_SUFFIX, "wb") as file:
+            file.write(b"x" * 500)
+
+        # Act
+        result = build_downloader().download(DownloadItem(url(http_server, "/no-range"), path))
+
+        # Assert
+        assert result.resumed_from == 0
+        with open(path, "rb") as file:
+            assert file.read() == CONTENT
+
+    def test_size_mismatch_keeps_part_file(self, http_server, tmp_path):
+        """Verifica que un archivo incompleto no se renombre y quede para continuar"""
+        # Arrange
+        path = str(tmp_path / "conv-1.ogg")
+        item = DownloadItem(url(http_server, "/audio"), path, expected_size=len(CONTENT) + 1)
+
+        # Act & Assert
+        with pytest.raises(DownloadError):
+            build_downloader().download(item)
+        assert not os.path.exists(path)
+        assert os.path.getsize(path + PART_SUFFIX) == len(CONTENT)
+
+    def test_hash_mismatch_discards_part_file(self, http_server, tmp_path):
+        """Verifica que un archivo con hash distinto se descarte"""
+        # Arrange
+        path = str(tmp_path / "conv-1.ogg")
+        item = DownloadItem(url(http_server, "/audio"), path, expected_sha256="0" * 64)
+
+        # Act & Assert
+        with pytest.raises(DownloadError):
+            build_downloader().download(item)
+        assert not os.path.exists(path)
+        assert not os.path.exists(path + PART_SUFFIX)
+
+    def test_existing_file_is_not_downloaded_again(self, http_server, tmp_path):
+        """Verifica que un archivo ya descargado no se vuelva a pedir"""
+        # Arrange
+        path = str(tmp_path / "conv-1.ogg")
+        with open(path, "wb") as file:
+            file.write(CONTENT)
+
+        # Act
+        result = build_downloader().download(DownloadItem(url(http_server, "/audio"), path))
+
+        # Assert
+        assert http_server.requests == []
+        assert result.size == len(CONTENT)
+
+    def test_download_all_reports_errors_per_item(self, http_server, tmp_path):
+        """Verifica la descarga en paralelo con errores por item"""
+        # Arrange
+        items = [DownloadItem(url(http_server, "/audio"), str(tmp_path / f"conv-{i}.ogg")) for i in range(6)]
+        items.append(DownloadItem(url(http_server, "/missing"), str(tmp_path / "missing.ogg")))
+
+        # Act
+        results = build_downloader().download_all(items)
+
+        # Assert
+        assert [result.ok for result in results] == [True] * 6 + [False]
+        assert all(os.path.getsize(item.path) == len(CONTENT) for item in items[:6])
@@ -0,0 +1,54 @@
+"""
+Pruebas del arranque del proceso: imports diferidos del SDK y del engine
+"""
+import subprocess
+import sys
+from unittest.mock import patch
+from benchmarks.bench_import_time import parse_importtime, ROOT_DIR
+from src.utils.lazy_import import lazy_import
+
+
+class TestStartup:
+    """Pruebas para el arranque en frio"""
+
+    def test_import_main_defers_sdk_and_engine(self):
+        """Verifica que importar main no cargue el SDK de Genesys ni NumPy ni cree el engine"""
+        # Arrange
+        code = (
+            "import sys, main\n"
+            "from src.utils import database\n"
+            "print(any(name.startswith('PureCloudPlatformClientV2') for name in sys.modules))\n"
+            "print(bool(database.engines))\n"
+            "print('numpy' in sys.modules)\n"
+        )
+
+        # Act
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR, capture_output=True, text=True, check=True)
+
+        # Assert
+        assert result.stdout.split() == ["False", "False", "False"]
+
+    def test_lazy_module_imports_on_first_access(self):
+        """Verifica que el modulo se importe en el primer acceso y una sola vez"""
+        # Arrange
+        module = lazy_import("json")
+
+        # Act
+        with patch("src.utils.lazy_import.importlib.import_module", wraps=__import__("importlib").import_module) as mock_import:
+            dumps = module.dumps
+            loads = module.loads
+
+        # Assert
+        assert dumps({"a": 1}) == '{"a": 1}'
+        assert loads("[1]") == [1]
+        mock_import.assert_called_once_with("json")
+
+    def test_parse_importtime(self):
+        """Verifica la lectura de la salida de -X importtime"""
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   json.decoder\n"
+            "import time:       300 |        420 | json\n"
+        )
+
+        assert parse_importtime(output) == {"json.decoder": 120, "json": 420}
@@ -0,0 +1,76 @@
+"""
+Pruebas unitarias para las transiciones de estado set-based
+"""
+from unittest.mock import MagicMock
+from datetime import datetime
+from sqlalchemy.dialects import postgresql
+from src.repository.models.audio_model import AudioModel
+from src.repository.models.batch_model import BatchModel
+from src.repository.status_transitions import status_transition_statement, transition_status
+
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class TestStatusTransitions:
+    """Pruebas para status_transition_statement y transition_status"""
+
+    def test_compare_and_set_statement(self):
+        """Verifica un solo UPDATE con ANY(keys), estado esperado y RETURNING"""
+        statement = status_transition_statement(BatchModel, BatchModel.gemini_batch_id, ["g-1", "g-2"],
+                                                "SUCCESS", expected_status="PROCESSING")
+
+        sql = compile_sql(statement)
+
+        assert sql.startswith("UPDATE audios_sac.batch SET status=")
+        assert "audios_sac.batch.gemini_batch_id = ANY (" in sql
+        assert "audios_sac.batch.status IN (" in sql
+        assert sql.endswith("RETURNING audios_sac.batch.gemini_batch_id")
+
+    def test_statement_without_expected_status(self):
+        """Verifica que sin estado esperado no se filtre por estado"""
+        statement = status_transition_statement(AudioModel, AudioModel.batch_id, [1], "DOWNLOADED",
+                                                returning=AudioModel.id)
+
+        sql = compile_sql(statement)
+
+        assert "status IN" not in sql
+        assert sql.endswith("RETURNING audios_sac.audio.id")
+
+    def test_statement_with_extra_values(self):
+        """Verifica que values agregue columnas al SET de la transicion"""
+        statement = status_transition_statement(BatchModel, BatchModel.id, [1], "PENDING DOWNLOAD",
+                                                expected_status="PENDING GENESYS",
+                                                values={"end_date": datetime(2024, 1, 1)})
+
+        sql = compile_sql(statement)
+
+        assert "end_date=%(end_date)s" in sql and "status=%(status)s" in sql
+        assert statement.compile().params["end_date"] == datetime(2024, 1, 1)
+
+    def test_expected_status_accepts_several(self):
+        """Verifica que se acepten varios estados de origen"""
+        statement = status_transition_statement(BatchModel, BatchModel.id, [1], "FAILED",
+                                                expected_status=["PENDING", "PROCESSING"])
+
+        params = statement.compile(dialect=postgresql.dialect()).params
+
+        assert params["status_1"] == ["PENDING", "PROCESSING"]
+
+    def test_transition_status_empty_keys(self):
+        """Verifica que sin llaves no se ejecute ninguna sentencia"""
+        db = MagicMock()
+
+        assert transition_status(db, BatchModel, BatchModel.id, [], "SUCCESS") == []
+        db.execute.assert_not_called()
+
+    def test_transition_status_returns_updated_keys(self):
+        """Verifica que se devuelvan solo las llaves que cambiaron de estado"""
+        db = MagicMock()
+        db.execute.return_value.scalars.return_value = iter([2])
+
+        updated = transition_status(db, BatchModel, BatchModel.id, [1, 2], "SUCCESS", expected_status="PROCESSING")
+
+        assert updated == [2]
+        db.execute.assert_called_once()
@@ -0,0 +1,140 @@
+"""
+Pruebas unitarias para TaskQueueRepository
+"""
+import pytest
+from unittest.mock import patch, MagicMock
+from sqlalchemy.dialects import postgresql
+from src.repository.task_queue_repository import (
+    TaskQueueRepository, ClaimedTask, claim_statement, expire_exhausted_statement, FAILED, PENDING
+)
+
+
+def compile_pg(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class TestTaskQueueRepository:
+    """Pruebas para TaskQueueRepository"""
+
+    def test_claim_statement_skips_locked_rows(self):
+        """Verifica que el reclamo salte las tareas bloqueadas y considere los leases vencidos"""
+        # Act
+        sql = compile_pg(claim_statement(["SUBMIT_BATCH"], "worker-1", 300, 1))
+
+        # Assert
+        assert "FOR UPDATE SKIP LOCKED" in sql
+        assert "work_task.lease_expires_at < now()" in sql
+        assert "work_task.attempts < audios_sac.work_task.max_attempts" in sql
+        assert "attempts=(audios_sac.work_task.attempts +" in sql
+        assert "RETURNING audios_sac.work_task.id" in sql
+
+    def test_expire_exhausted_statement(self):
+        """Verifica que las tareas de workers caidos sin intentos restantes pasen a FAILED"""
+        # Act
+        statement = expire_exhausted_statement(["SUBMIT_BATCH"])
+        sql = compile_pg(statement)
+
+        # Assert
+        assert "work_task.attempts >= audios_sac.work_task.max_attempts" in sql
+        assert statement.compile().params["status"] == FAILED
+
+    @patch('src.repository.task_queue_repository.Session')
+    @patch('src.repository.task_queue_repository.get_engine')
+    def test_enqueue(self, mock_engine, mock_session_class):
+        """Verifica que cada payload se inserte como tarea PENDING"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        mock_session.execute.return_value.scalars.return_value = [10, 11]
+
+        repo = TaskQueueRepository()
+
+        # Act
+        task_ids = repo.enqueue("SUBMIT_BATCH", [{"a": 1}, {"a": 2}], max_attempts=5, job_id=3)
+
+        # Assert
+        assert task_ids == [10, 11]
+        rows = mock_session.execute.call_args[0][1]
+        assert [row["payload"] for row in rows] == [{"a": 1}, {"a": 2}]
+        assert all(row["status"] == PENDING and row["job_id"] == 3 and row["max_attempts"] == 5 for row in rows)
+        mock_session.commit.assert_called_once()
+
+    @patch('src.repository.task_queue_repository.Session')
+    @patch('src.repository.task_queue_repository.get_engine')
+    def test_enqueue_empty(self, mock_engine, mock_session_class):
+        """Verifica que no se consulte la base sin tareas"""
+        # Act
+        task_ids = TaskQueueRepository().enqueue("SUBMIT_BATCH", [], max_attempts=5)
+
+        # Assert
+        assert task_ids == []
+        mock_session_class.assert_not_called()
+
+    @patch('src.repository.task_queue_repository.Session')
+    @patch('src.repository.task_queue_repository.get_engine')
+    def test_claim(self, mock_engine, mock_session_class):
+        """Verifica que el reclamo devuelva las tareas asignadas al worker"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        mock_session.execute.side_effect = [MagicMock(), [(1, "SUBMIT_BATCH", 3, {"a": 1}, 1)]]
+
+        repo = TaskQueueRepository()
+
+        # Act
+        tasks = repo.claim(["SUBMIT_BATCH"], "worker-1", 300)
+
+        # Assert
+        assert tasks == [ClaimedTask(1, "SUBMIT_BATCH", 3, {"a": 1}, 1)]
+        assert mock_session.execute.call_count == 2
+        mock_session.commit.assert_called_once()
+
+    @patch('src.repository.task_queue_repository.Session')
+    @patch('src.repository.task_queue_repository.get_engine')
+    def test_claim_exception(self, mock_engine, mock_session_class):
+        """Verifica que un error al reclamar devuelva una lista vacia"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        mock_session.execute.side_effect = Exception("Database error")
+
+        # Act
+        tasks = TaskQueueRepository().claim(["SUBMIT_BATCH"], "worker-1", 300)
+
+        # Assert
+        assert tasks == []
+
+    @patch('src.repository.task_queue_repository.Session')
+    @patch('src.repository.task_queue_repository.get_engine')
+    def test_heartbeat_lost_lease(self, mock_engine, mock_session_class):
+        """Verifica que el heartbeat indique cuando la tarea ya no pertenece al worker"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        mock_session.execute.return_value.rowcount = 0
+
+        # Act
+        renewed = TaskQueueRepository().heartbeat(1, "worker-1", 300)
+
+        # Assert
+        assert renewed is False
+        sql = compile_pg(mock_session.execute.call_args[0][0])
+        assert "work_task.lease_owner = %(lease_owner_1)s" in sql
+
+    @patch('src.repository.task_queue_repository.Session')
+    @patch('src.repository.task_queue_repository.get_engine')
+    def test_fail_returns_new_status(self, mock_engine, mock_session_class):
+        """Verifica que al fallar se devuelva el estado calculado segun los intentos"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__.return_value = mock_session
+        mock_session.execute.return_value.scalar.return_value = PENDING
+
+        # Act
+        status = TaskQueueRepository().fail(1, "worker-1", "Genesys error", 60)
+
+        # Assert
+        assert status == PENDING
+        sql = compile_pg(mock_session.execute.call_args[0][0])
+        assert "CASE WHEN (audios_sac.work_task.attempts >= audios_sac.work_task.max_attempts)" in sql
+        mock_session.commit.assert_called_once()
@@ -0,0 +1,185 @@
+"""
+Pruebas unitarias para TaskWorker
+"""
+import threading
+import time
+import pytest
+from unittest.mock import Mock, patch
+from src.repository.task_queue_repository import ClaimedTask, FAILED, PENDING
+from src.service.task_worker import TaskWorker, LeaseHeartbeat, LeaseLostError
+
+
+class FakeQueue:
+    """Cola en memoria: cada tarea se entrega a un solo worker"""
+
+    def __init__(self, tasks):
+        self.pending = list(tasks)
+        self.lock = threading.Lock()
+        self.completed = []
+        self.failed = []
+        self.heartbeats = 0
+
+    def claim(self, kinds, worker_id, lease_seconds, limit=1):
+        with self.lock:
+            claimed, self.pending = self.pending[:limit], self.pending[limit:]
+        return claimed
+
+    def heartbeat(self, task_id, worker_id, lease_seconds):
+        self.heartbeats += 1
+        return True
+
+    def complete(self, task_id, worker_id):
+        with self.lock:
+            self.completed.append((task_id, worker_id))
+        return True
+
+    def fail(self, task_id, worker_id, error, retry_delay_seconds):
+        self.failed.append((task_id, error))
+        return PENDING
+
+
+def build_worker(queue, handlers, worker_id="worker-1"):
+    return TaskWorker(queue, handlers, lease_seconds=30, heartbeat_seconds=0.01,
+                      retry_delay_seconds=0, poll_seconds=0, worker_id=worker_id)
+
+
+class TestTaskWorker:
+    """Pruebas para TaskWorker"""
+
+    def test_run_processes_until_queue_is_empty(self):
+        """Verifica que el worker procese todas las tareas y termine al vaciarse la cola"""
+        # Arrange
+        queue = FakeQueue([ClaimedTask(i, "SUBMIT_BATCH", 1, {"n": i}, 1) for i in range(3)])
+        handled = []
+        worker = build_worker(queue, {"SUBMIT_BATCH": lambda payload: handled.append(payload["n"])})
+
+        # Act
+        processed = worker.run(max_idle_polls=1)
+
+        # Assert
+        assert processed == 3
+        assert handled == [0, 1, 2]
+        assert [task_id for task_id, _ in queue.completed] == [0, 1, 2]
+
+    def test_handler_error_releases_task(self):
+        """Verifica que un error en el handler libere la tarea para reintentarla"""
+        # Arrange
+        queue = FakeQueue([ClaimedTask(1, "SUBMIT_BATCH", 1, {}, 1)])
+        worker = build_worker(queue, {"SUBMIT_BATCH": Mock(side_effect=Exception("Genesys error"))})
+
+        # Act
+        processed = worker.run(max_idle_polls=1)
+
+        # Assert
+        assert processed == 0
+        assert worker.failed == 1
+        assert queue.failed == [(1, "Genesys error")]
+        assert queue.completed == []
+
+    def test_workers_split_tasks_without_duplicates(self):
+        """Verifica que varios workers sobre la misma cola no procesen una tarea dos veces"""
+        # Arrange
+        queue = FakeQueue([ClaimedTask(i, "SUBMIT_BATCH", 1, {"n": i}, 1) for i in range(20)])
+        workers = [build_worker(queue, {"SUBMIT_BATCH": lambda payload: time.sleep(0.001)}, f"worker-{i}")
+                   for i in range(3)]
+        threads = [threading.Thread(target=worker.run, args=(1,)) for worker in workers]
+
+        # Act
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Assert
+        assert sorted(task_id for task_id, _ in queue.completed) == list(range(20))
+        assert sum(worker.processed for worker in workers) == 20
+
+    def test_heartbeat_renews_lease_while_handler_runs(self):
+        """Verifica que el lease se renueve durante una tarea larga"""
+        # Arrange
+        queue = FakeQueue([ClaimedTask(1, "SUBMIT_BATCH", 1, {}, 1)])
+        worker = build_worker(queue, {"SUBMIT_BATCH": lambda payload: time.sleep(0.1)})
+
+        # Act
+        worker.run_once()
+
+        # Assert
+        assert queue.heartbeats >= 2
+
+    def test_heartbeat_stops_when_lease_is_lost(self):
+        """Verifica que el heartbeat se detenga si otro worker tomo la tarea"""
+        # Arrange
+        queue = Mock()
+        queue.heartbeat.return_value = False
+
+        # Act
+        with LeaseHeartbeat(queue, 1, "worker-1", 30, 0.01) as heartbeat:
+            time.sleep(0.05)
+
+        # Assert
+        assert heartbeat.lost is True
+        queue.heartbeat.assert_called_once_with(1, "worker-1", 30)
+
+    @patch('src.service.task_worker.logger')
+    def test_failed_without_attempts_logs_error(self, mock_logger):
+        """Verifica que una tarea sin intentos restantes se registre como error"""
+        # Arrange
+        queue = FakeQueue([ClaimedTask(1, "SUBMIT_BATCH", 1, {}, 5)])
+        queue.fail = Mock(return_value=FAILED)
+        worker = build_worker(queue, {"SUBMIT_BATCH": Mock(side_effect=Exception("Genesys error"))})
+
+        # Act
+        worker.run_once()
+
+        # Assert
+        mock_logger.error.assert_called_once()
+
+    def test_lost_lease_is_not_completed(self):
+        """Verifica que una tarea cuyo lease se perdio no se complete ni se registre como fallida"""
+        # Arrange
+        queue = FakeQueue([ClaimedTask(1, "SUBMIT_BATCH", 1, {}, 1)])
+        queue.heartbeat = Mock(return_value=False)
+        worker = build_worker(queue, {"SUBMIT_BATCH": lambda payload: time.sleep(0.05)})
+
+        # Act
+        processed = worker.run(max_idle_polls=1)
+
+        # Assert
+        assert processed == 0
+        assert worker.failed == 1
+        assert queue.completed == []
+        assert queue.failed == []
+
+    def test_check_lease_stops_handler(self):
+        """Verifica que el handler pueda detenerse antes de enviar si otro worker tomo la tarea"""
+        # Arrange
+        queue = FakeQueue([ClaimedTask(1, "SUBMIT_BATCH", 1, {}, 1)])
+        queue.heartbeat = Mock(return_value=False)
+        submitted = []
+
+        def handler(payload):
+            time.sleep(0.05)
+            worker.check_lease()
+            submitted.append(payload)
+
+        worker = build_worker(queue, {"SUBMIT_BATCH": handler})
+
+        # Act
+        worker.run_once()
+
+        # Assert
+        assert submitted == []
+        assert queue.completed == [] and queue.failed == []
+        assert worker.lease is None
+
+    def test_check_lease_without_task(self):
+        """Verifica que check_lease no falle fuera de una tarea y que un heartbeat perdido lance LeaseLostError"""
+        # Arrange
+        worker = build_worker(FakeQueue([]), {})
+        heartbeat = LeaseHeartbeat(Mock(), 1, "worker-1", 30, 1)
+        heartbeat.lost = True
+
+        # Act & Assert
+        worker.check_lease()
+        with pytest.raises(LeaseLostError):
+            heartbeat.check()
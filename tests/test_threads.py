@@ -0,0 +1,75 @@
+"""
+Pruebas unitarias para las utilidades de hilos
+"""
+import time
+from src.utils.threads import execute_bounded
+
+
+class TestExecuteBounded:
+    """Pruebas para execute_bounded"""
+
+    def test_preserves_input_order(self):
+        """Verifica que los resultados respeten el orden de entrada"""
+        # Arrange
+        delays = [0.05, 0.0, 0.02, 0.01]
+
+        def task(delay):
+            time.sleep(delay)
+            return delay
+
+        # Act
+        results = execute_bounded(task, delays, max_workers=4)
+
+        # Assert
+        assert [result.value for result in results] == delays
+        assert all(result.ok for result in results)
+
+    def test_collects_errors(self):
+        """Verifica que un error no detenga las demas tareas"""
+        # Arrange
+        def task(value):
+            if value == 2:
+                raise ValueError("fallo")
+            return value * 10
+
+        # Act
+        results = execute_bounded(task, [1, 2, 3], max_workers=2)
+
+        # Assert
+        assert [result.value for result in results] == [10, None, 30]
+        assert isinstance(results[1].error, ValueError)
+        assert results[1].item == 2
+
+    def test_timeout_per_call(self):
+        """Verifica que una tarea lenta se marque como timeout"""
+        # Arrange
+        def task(delay):
+            time.sleep(delay)
+            return delay
+
+        # Act
+        results = execute_bounded(task, [0.0, 1.0], max_workers=2, timeout=0.1)
+
+        # Assert
+        assert results[0].ok
+        assert isinstance(results[1].error, TimeoutError)
+
+    def test_timeout_bounds_wall_time_when_workers_hang(self):
+        """Verifica que una tarea colgada no bloquee a las que esperan en cola"""
+        # Arrange
+        def task(delay):
+            time.sleep(delay)
+            return delay
+
+        # Act
+        started = time.monotonic()
+        results = execute_bounded(task, [1.0, 0.0, 0.0], max_workers=1, timeout=0.1)
+        elapsed = time.monotonic() - started
+
+        # Assert
+        assert elapsed < 0.8
+        assert all(isinstance(result.error, TimeoutError) for result in results)
+
+    def test_empty_items(self):
+        """Verifica que una lista vacia no cree hilos"""
+        assert execute_bounded(lambda item: item, [], max_workers=4) == []
@@ -0,0 +1,95 @@
+"""
+Pruebas unitarias para UnitOfWork
+"""
+import pytest
+from unittest.mock import patch, MagicMock
+from sqlalchemy.dialects import postgresql
+from src.repository.unit_of_work import UnitOfWork
+
+
+class TestUnitOfWork:
+    """Pruebas para UnitOfWork"""
+
+    @patch('src.repository.unit_of_work.Session')
+    @patch('src.repository.unit_of_work.get_engine')
+    def test_commit_once_on_success(self, mock_engine, mock_session_class, sample_batch_model):
+        """Verifica que todas las escrituras terminen en un solo commit"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value = mock_session
+        mock_session.execute.return_value.all.return_value = [("conv-1", 1), ("conv-2", 2)]
+
+        # Act
+        with UnitOfWork() as uow:
+            uow.add(sample_batch_model)
+            ids = uow.add_audios([{"id_conversation": "conv-1"}, {"id_conversation": "conv-2"}])
+
+        # Assert
+        assert ids == [1, 2]
+        mock_session.add.assert_called_once_with(sample_batch_model)
+        mock_session.flush.assert_called_once()
+        mock_session.commit.assert_called_once()
+        mock_session.rollback.assert_not_called()
+        mock_session.close.assert_called_once()
+
+    @patch('src.repository.unit_of_work.Session')
+    @patch('src.repository.unit_of_work.get_engine')
+    def test_rollback_on_error(self, mock_engine, mock_session_class, sample_batch_model):
+        """Verifica que ante un error no quede nada escrito"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value = mock_session
+        mock_session.execute.side_effect = Exception("Database error")
+
+        # Act & Assert
+        with pytest.raises(Exception):
+            with UnitOfWork() as uow:
+                uow.add(sample_batch_model)
+                uow.add_audios([{"id_conversation": "conv-1"}])
+
+        mock_session.commit.assert_not_called()
+        mock_session.rollback.assert_called_once()
+        mock_session.close.assert_called_once()
+
+    @patch('src.repository.unit_of_work.Session')
+    @patch('src.repository.unit_of_work.get_engine')
+    def test_add_audios_flushes_in_chunks(self, mock_engine, mock_session_class):
+        """Verifica que los audios se escriban en bloques de flush_size"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value = mock_session
+        mock_session.execute.side_effect = [
+            MagicMock(all=MagicMock(return_value=[("conv-0", 1), ("conv-1", 2)])),
+            MagicMock(all=MagicMock(return_value=[("conv-2", 3), ("conv-3", 4)])),
+            MagicMock(all=MagicMock(return_value=[("conv-4", 5)])),
+        ]
+        rows = [{"id_conversation": f"conv-{i}"} for i in range(5)]
+
+        # Act
+        with UnitOfWork(flush_size=2) as uow:
+            ids = uow.add_audios(rows)
+
+        # Assert
+        assert ids == [1, 2, 3, 4, 5]
+        assert mock_session.execute.call_count == 3
+        mock_session.commit.assert_called_once()
+
+    @patch('src.repository.unit_of_work.Session')
+    @patch('src.repository.unit_of_work.get_engine')
+    def test_add_audios_keeps_input_order_and_skips_conflicts(self, mock_engine, mock_session_class):
+        """Verifica que los ids sigan el orden de entrada y omitan los audios ya existentes"""
+        # Arrange
+        mock_session = MagicMock()
+        mock_session_class.return_value = mock_session
+        # RETURNING no garantiza orden y no devuelve las filas omitidas por ON CONFLICT
+        mock_session.execute.return_value.all.return_value = [("conv-3", 12), ("conv-1", 10)]
+        rows = [{"id_conversation": f"conv-{i}"} for i in range(1, 4)]
+
+        # Act
+        with UnitOfWork() as uow:
+            ids = uow.add_audios(rows)
+
+        # Assert
+        assert ids == [10, 12]
+        statement = str(mock_session.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (id_conversation, call_date) DO NOTHING" in statement